@@ -21,8 +21,43 @@ class Settings:
     world_model_endpoint: str | None = os.getenv("WORLD_MODEL_ENDPOINT")
     azure_openai_api_key: str | None = os.getenv("AZURE_OPENAI_API_KEY")
     azure_openai_endpoint: str = os.getenv("AZURE_OPENAI_ENDPOINT", "https://aritraintelligence.cognitiveservices.azure.com/")
-    # Inference mode: "local" (stubs), "cloud" (Modal/HTTP), "anthropic" (Claude Vision), "openai" (Azure GPT-5-mini)
+    # Max concurrent Azure OpenAI requests per process (rate-limited ones back off outside the limit)
+    azure_openai_max_concurrency: int = int(os.getenv("AZURE_OPENAI_MAX_CONCURRENCY", "8"))
+    # Max concurrent requests to the cloud (Modal HTTP) endpoint per process
+    cloud_max_concurrency: int = int(os.getenv("ORCA_CLOUD_MAX_CONCURRENCY", "8"))
+    # Inference mode: "local" (stubs), "cloud" (Modal/HTTP), "anthropic" (Claude Vision), "openai" (Azure GPT-5-mini),
+    # "routed" (fastest healthy of inference_backends, hedged on the critical path)
     inference_mode: str = os.getenv("ORCA_INFERENCE_MODE", "local")
+    # Comma-separated backends the "routed" mode chooses between
+    inference_backends: str = os.getenv("ORCA_INFERENCE_BACKENDS", "cloud,openai,anthropic")
+    # Comma-separated team types whose instances each call the backend (no
+    # single-flight sharing), e.g. when sampling with temperature > 0. Teams
+    # with a quorum (below) always do.
+    diverse_sample_teams: str = os.getenv("ORCA_DIVERSE_SAMPLE_TEAMS", "")
+    # "frames": pipeline each frame through the teams as a (frame, team) DAG;
+    # "teams": each team analyzes all frames, then hands over to the next
+    pipeline_mode: str = os.getenv("ORCA_PIPELINE_MODE", "frames")
+    # Max (frame, team) nodes in progress at once in the frames pipeline
+    pipeline_concurrency: int = int(os.getenv("ORCA_PIPELINE_CONCURRENCY", "8"))
+    # Early quorum per team, e.g. "fire_severity=2,structural=2": the team
+    # publishes once that many instances have finished with agreeing results
+    # instead of waiting for the slowest; teams not listed wait for all
+    team_quorum: str = os.getenv("ORCA_TEAM_QUORUM", "")
+    # Minimum consensus agreement_score among the finished instances
+    quorum_min_agreement: float = float(os.getenv("ORCA_QUORUM_MIN_AGREEMENT", "0.8"))
+    # Instances still running at quorum: "cancel" them, or "update" to let
+    # them finish and republish the team consensus with their results
+    quorum_laggards: str = os.getenv("ORCA_QUORUM_LAGGARDS", "cancel")
+    # Worker processes for CPU-bound work (metrics, evacuation, personnel,
+    # fire spread); 0 runs it on a thread in the API process instead
+    compute_workers: int = int(os.getenv("ORCA_COMPUTE_WORKERS", str(min(4, os.cpu_count() or 1))))
+    # Max dHash Hamming distance (of 64 bits) for a frame to reuse a recent
+    # frame's results; -1 analyzes every frame
+    frame_dedup_distance: int = int(os.getenv("ORCA_FRAME_DEDUP_DISTANCE", "6"))
+    # Memory-mapped per-edge speed profiles for vehicle ETAs (see packages/routing/src/traffic.py)
+    traffic_profiles_path: str | None = os.getenv("ORCA_TRAFFIC_PROFILES")
+    # IANA timezone of the road network; speed profiles are bucketed by local time of week
+    traffic_timezone: str = os.getenv("ORCA_TRAFFIC_TIMEZONE", "America/Chicago")
 
 
 @lru_cache(maxsize=1)
@@ -15,6 +15,9 @@ from .routers.metrics import router as metrics_router
 from .ws import ws_router
 from .db import supabase
 from .redis_client import redis_client
+from .services.analysis import _vision
+from .services.compute_pool import compute_pool
+from .services.openai_inference import close_client as close_openai_client
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -68,8 +71,14 @@ async def startup() -> None:
     except Exception as e:
         logger.warning(f"Redis unavailable — running without real-time features: {e}")
 
+    # Warm the CPU worker processes before the first analysis needs them
+    compute_pool.start()
+
 
 @app.on_event("shutdown")
 async def shutdown() -> None:
     await redis_client.close()
     logger.info("Redis connection closed")
+    await _vision.close_http_client()
+    await close_openai_client()
+    compute_pool.shutdown()
@@ -4,13 +4,42 @@ Manages inter-team communication, consensus aggregation, and result pub/sub.
 """
 from __future__ import annotations
 
+import asyncio
+import copy
 import json
+import logging
+import math
+import struct
+import time
+from datetime import datetime, timezone
 from typing import Any
 
+import numpy as np
 import redis.asyncio as redis
 
 from .config import get_settings
 
+logger = logging.getLogger(__name__)
+
+METRICS_TTL_SECONDS = 3600
+METRICS_STATS_KEY = "orca:metrics_cache:stats"
+# Safety net for waiters: re-read missing team results this often in case a
+# pub/sub message was lost (pub/sub is at-most-once)
+UPSTREAM_RECHECK_INTERVAL = 5.0
+
+# Per-frame metrics ring buffer: fixed-size packed records in one Redis string
+METRICS_SERIES_CAPACITY = 1024
+# seq, timestamp, path cost, survivability min, heat exposure, frame index (-1: none)
+_SERIES_RECORD = struct.Struct("<Idfffi")
+_SERIES_DTYPE = np.dtype([
+    ("seq", "<u4"),
+    ("timestamp", "<f8"),
+    ("path_cost", "<f4"),
+    ("survivability_min", "<f4"),
+    ("heat_exposure", "<f4"),
+    ("frame", "<i4"),
+])
+
 
 class RedisClient:
     """Async Redis client for simulation state management."""
@@ -18,7 +47,17 @@ class RedisClient:
     def __init__(self) -> None:
         self._pool: redis.ConnectionPool | None = None
         self._client: redis.Redis | None = None
+        # Binary-safe client (no response decoding) for packed data
+        self._binary_pool: redis.ConnectionPool | None = None
+        self._binary: redis.Redis | None = None
         self._pubsub: redis.client.PubSub | None = None
+        # Team readiness: futures resolved with the result when it lands,
+        # either from this process or via the simulation's updates channel
+        self._team_waiters: dict[tuple[str, str], list[asyncio.Future]] = {}
+        self._watched: dict[str, int] = {}  # simulation -> waiters subscribed
+        self._events: redis.client.PubSub | None = None
+        self._events_task: asyncio.Task | None = None
+        self._events_loop: asyncio.AbstractEventLoop | None = None
 
     async def connect(self) -> None:
         """Initialize Redis connection pool."""
@@ -29,16 +68,26 @@ class RedisClient:
             max_connections=20,
         )
         self._client = redis.Redis(connection_pool=self._pool)
+        self._binary_pool = redis.ConnectionPool.from_url(settings.redis_url, max_connections=5)
+        self._binary = redis.Redis(connection_pool=self._binary_pool)
         await self._client.ping()
 
     async def close(self) -> None:
         """Close Redis connection."""
         if self._pubsub:
             await self._pubsub.close()
+        if self._events_task:
+            self._events_task.cancel()
+        if self._events:
+            await self._events.close()
         if self._client:
             await self._client.close()
+        if self._binary:
+            await self._binary.close()
         if self._pool:
             await self._pool.disconnect()
+        if self._binary_pool:
+            await self._binary_pool.disconnect()
 
     async def ping(self) -> bool:
         """Check Redis connectivity."""
@@ -80,6 +129,8 @@ class RedisClient:
     # ─────────────────────────────────────────────────────────────────
 
     TEAM_TYPES = ["fire_severity", "structural", "evacuation", "personnel"]
+    # Team results that feed the observability metrics
+    METRICS_SOURCE_TEAMS = ("fire_severity", "structural")
 
     async def set_team_result(
         self,
@@ -87,14 +138,21 @@ class RedisClient:
         team: str,
         result: dict[str, Any]
     ) -> None:
-        """Store consensus result for a team. Other teams read this."""
+        """Store consensus result for a team. Other teams read this.
+
+        Fire severity and structural results also invalidate the cached
+        metrics; recomputing them is the caller's job (services.metrics_refresh).
+        """
         if team not in self.TEAM_TYPES:
             raise ValueError(f"Invalid team type: {team}")
         await self._client.set(
             self._key(simulation_id, team),
             json.dumps(result)
         )
+        self._notify_team(simulation_id, team, result)
         await self._publish_update(simulation_id, team, result)
+        if team in self.METRICS_SOURCE_TEAMS:
+            await self._invalidate_metrics(simulation_id)
 
     async def get_team_result(
         self,
@@ -105,6 +163,91 @@ class RedisClient:
         data = await self._client.get(self._key(simulation_id, team))
         return json.loads(data) if data else None
 
+    async def wait_for_team_results(
+        self,
+        simulation_id: str,
+        teams: list[str],
+        timeout: float,
+    ) -> dict[str, dict[str, Any]]:
+        """Results of ``teams`` as soon as all have landed, or whatever landed within ``timeout``.
+
+        Pushed rather than polled: results stored by this process resolve the
+        wait directly, results from other processes arrive on the
+        simulation's updates channel. Results stored before the wait began
+        are read once up front.
+        """
+        loop = asyncio.get_running_loop()
+        self._ensure_events_loop()
+        futures: dict[str, asyncio.Future] = {}
+        for team in teams:
+            futures[team] = loop.create_future()
+            self._team_waiters.setdefault((simulation_id, team), []).append(futures[team])
+
+        results: dict[str, dict[str, Any]] = {}
+        watching = False
+        try:
+            try:
+                await self._watch(simulation_id)
+                watching = True
+            except Exception as e:
+                logger.warning(f"Updates channel unavailable ({e}), re-checking results every {UPSTREAM_RECHECK_INTERVAL}s")
+
+            deadline = loop.time() + timeout
+            while True:
+                missing = [t for t in teams if t not in results]
+                stored = await self._client.mget([self._key(simulation_id, t) for t in missing])
+                for team, raw in zip(missing, stored):
+                    if raw:
+                        results[team] = json.loads(raw)
+                for team, future in futures.items():
+                    if team not in results and future.done():
+                        results[team] = future.result()
+
+                pending = [futures[t] for t in teams if t not in results]
+                remaining = deadline - loop.time()
+                if not pending or remaining <= 0:
+                    return results
+                await asyncio.wait(pending, timeout=min(remaining, UPSTREAM_RECHECK_INTERVAL))
+        finally:
+            for team, future in futures.items():
+                waiters = self._team_waiters.get((simulation_id, team))
+                if waiters and future in waiters:
+                    waiters.remove(future)
+                    if not waiters:
+                        del self._team_waiters[(simulation_id, team)]
+            if watching:
+                await self._unwatch(simulation_id)
+
+    def _notify_team(self, simulation_id: str, team: str, result: Any) -> None:
+        """Resolve this process's waiters for a team result."""
+        for future in self._team_waiters.pop((simulation_id, team), []):
+            if not future.done():
+                future.set_result(copy.deepcopy(result))
+
+    async def set_team_partial(
+        self,
+        simulation_id: str,
+        team: str,
+        fields: dict[str, Any]
+    ) -> None:
+        """Record fields a team's model has already streamed, before its final result.
+
+        Published as ``team_partial:{team}`` so the dashboard and downstream
+        teams can act on e.g. an early severity estimate.
+        """
+        if team not in self.TEAM_TYPES:
+            raise ValueError(f"Invalid team type: {team}")
+        await self._client.hset(
+            self._key(simulation_id, f"partial:{team}"),
+            mapping={k: json.dumps(v) for k, v in fields.items()},
+        )
+        await self._publish_update(simulation_id, f"team_partial:{team}", fields)
+
+    async def get_team_partial(self, simulation_id: str, team: str) -> dict[str, Any]:
+        """Fields streamed so far for a team (empty if none)."""
+        data = await self._client.hgetall(self._key(simulation_id, f"partial:{team}"))
+        return {k: json.loads(v) for k, v in data.items()}
+
     async def get_all_team_results(
         self,
         simulation_id: str
@@ -115,6 +258,137 @@ class RedisClient:
             results[team] = await self.get_team_result(simulation_id, team)
         return results
 
+    # ─────────────────────────────────────────────────────────────────
+    # Metrics Cache (write-through, versioned by result revision)
+    # ─────────────────────────────────────────────────────────────────
+
+    async def _invalidate_metrics(self, simulation_id: str) -> int:
+        """Bump the result revision and drop the cached metrics; returns the new revision."""
+        revision = await self._client.incr(self._key(simulation_id, "result_rev"))
+        await self._client.delete(self._key(simulation_id, "metrics"))
+        await self._publish_update(simulation_id, "metrics_invalidated", {"revision": revision})
+        return revision
+
+    async def get_result_revision(self, simulation_id: str) -> int:
+        """Current fire/structural result revision (0 = no results yet)."""
+        return int(await self._client.get(self._key(simulation_id, "result_rev")) or 0)
+
+    async def set_cached_metrics(
+        self,
+        simulation_id: str,
+        revision: int,
+        metrics: dict[str, Any],
+    ) -> bool:
+        """Store a metrics snapshot computed at ``revision``.
+
+        Skipped (returns False) if newer results landed while it was computed.
+        """
+        if await self.get_result_revision(simulation_id) != revision:
+            return False
+        entry = {
+            "revision": revision,
+            "computed_at": datetime.now(timezone.utc).isoformat(),
+            "metrics": metrics,
+        }
+        await self._client.set(
+            self._key(simulation_id, "metrics"),
+            json.dumps(entry),
+            ex=METRICS_TTL_SECONDS,
+        )
+        await self._publish_update(simulation_id, "metrics", entry)
+        return True
+
+    async def get_cached_metrics(self, simulation_id: str) -> dict[str, Any] | None:
+        """Return the cached snapshot if it matches the current revision, counting hits/misses."""
+        raw, revision = await self._client.mget(
+            self._key(simulation_id, "metrics"),
+            self._key(simulation_id, "result_rev"),
+        )
+        entry = json.loads(raw) if raw else None
+        hit = entry is not None and entry.get("revision") == int(revision or 0)
+        await self._client.hincrby(METRICS_STATS_KEY, "hits" if hit else "misses", 1)
+        return entry if hit else None
+
+    async def get_metrics_cache_stats(self) -> dict[str, int]:
+        """Process-independent metrics cache hit/miss counters."""
+        data = await self._client.hgetall(METRICS_STATS_KEY)
+        return {"hits": int(data.get("hits", 0)), "misses": int(data.get("misses", 0))}
+
+    # ─────────────────────────────────────────────────────────────────
+    # Metrics Time Series (per-frame ring buffer of packed floats)
+    # ─────────────────────────────────────────────────────────────────
+
+    async def append_metrics_point(
+        self,
+        simulation_id: str,
+        metrics: dict[str, Any],
+        frame: int | None = None,
+    ) -> int:
+        """Append one analyzed frame's metrics to the ring buffer and stream it.
+
+        ``frame`` is the frame's index in the simulation, if it has one; points
+        are stored in the order they are appended, which need not be frame order.
+        Returns the point's sequence number (1-based, monotonically increasing).
+        """
+        minutes = metrics["survivability"]["minutes_remaining"]
+        point = {
+            "path_cost": metrics["optimized_path"]["total_cost"],
+            "survivability_min": math.nan if minutes is None else minutes,
+            "heat_exposure": metrics["heat_exposure"]["total_score"],
+        }
+        seq = await self._client.incr(self._key(simulation_id, "metrics_series:head"))
+        timestamp = time.time()
+        record = _SERIES_RECORD.pack(
+            seq, timestamp, point["path_cost"], point["survivability_min"], point["heat_exposure"],
+            -1 if frame is None else frame,
+        )
+        offset = (seq - 1) % METRICS_SERIES_CAPACITY * _SERIES_RECORD.size
+        await self._binary.setrange(self._key(simulation_id, "metrics_series"), offset, record)
+        await self._publish_update(
+            simulation_id,
+            "metrics_point",
+            _series_json({
+                "seq": [seq], "timestamp": [timestamp], **{k: [v] for k, v in point.items()}, "frame": [frame],
+            }),
+        )
+        return seq
+
+    async def get_metrics_series(
+        self,
+        simulation_id: str,
+        since: int = 0,
+        limit: int | None = None,
+    ) -> dict[str, list]:
+        """Points with seq > ``since`` still held in the ring, as parallel arrays.
+
+        With ``limit``, only the oldest ``limit`` of those, so a client pages
+        forward by passing the last seq it saw. Costs O(points returned).
+        """
+        head = int(await self._client.get(self._key(simulation_id, "metrics_series:head")) or 0)
+        lo = max(since + 1, head - METRICS_SERIES_CAPACITY + 1, 1)
+        hi = head if limit is None else min(head, lo + limit - 1)
+        if lo > hi:
+            return _series_json({name: [] for name in _SERIES_DTYPE.names})
+
+        key = self._key(simulation_id, "metrics_series")
+        size = _SERIES_RECORD.size
+        first, last = (lo - 1) % METRICS_SERIES_CAPACITY, (hi - 1) % METRICS_SERIES_CAPACITY
+        if first <= last:
+            raw = await self._binary.getrange(key, first * size, (last + 1) * size - 1)
+        else:  # wrapped around the end of the ring
+            tail = await self._binary.getrange(key, first * size, METRICS_SERIES_CAPACITY * size - 1)
+            raw = tail + await self._binary.getrange(key, 0, (last + 1) * size - 1)
+
+        records = np.frombuffer(raw[: len(raw) // size * size], dtype=_SERIES_DTYPE)
+        # Drop slots whose writer reserved a seq but has not written yet
+        expected = np.arange(lo, lo + len(records), dtype=np.uint32)
+        valid = records["seq"] == expected
+        if not valid.all():
+            records = records[: int(np.argmin(valid))]
+        columns = {name: records[name].tolist() for name in _SERIES_DTYPE.names}
+        columns["frame"] = [None if f < 0 else f for f in columns["frame"]]
+        return _series_json(columns)
+
     # ─────────────────────────────────────────────────────────────────
     # Consensus Tracking (Per-instance results before aggregation)
     # ─────────────────────────────────────────────────────────────────
@@ -194,6 +468,64 @@ class RedisClient:
         })
         await self._client.publish(channel, message)
 
+    def _ensure_events_loop(self) -> None:
+        # Waiter futures and the listener task belong to one event loop
+        loop = asyncio.get_running_loop()
+        if self._events_loop is not loop:
+            self._team_waiters.clear()
+            self._watched.clear()
+            self._events = None
+            self._events_task = None
+            self._events_loop = loop
+
+    async def _watch(self, simulation_id: str) -> None:
+        """Listen on a simulation's updates channel while anyone waits on it."""
+        count = self._watched.get(simulation_id, 0)
+        self._watched[simulation_id] = count + 1
+        if count:
+            return
+        try:
+            if self._events is None:
+                self._events = self._client.pubsub()
+            await self._events.subscribe(f"simulation:{simulation_id}:updates")
+        except Exception:
+            self._watched.pop(simulation_id, None)
+            raise
+        if self._events_task is None or self._events_task.done():
+            self._events_task = asyncio.create_task(self._listen_for_results())
+
+    async def _unwatch(self, simulation_id: str) -> None:
+        count = self._watched.get(simulation_id, 0) - 1
+        if count > 0:
+            self._watched[simulation_id] = count
+            return
+        self._watched.pop(simulation_id, None)
+        try:
+            await self._events.unsubscribe(f"simulation:{simulation_id}:updates")
+        except Exception as e:
+            logger.debug(f"Unsubscribe from {simulation_id} updates failed: {e}")
+
+    async def _listen_for_results(self) -> None:
+        """Route team results published by any process to this process's waiters."""
+        while self._watched:
+            try:
+                message = await self._events.get_message(ignore_subscribe_messages=True, timeout=1.0)
+            except Exception as e:
+                # Waiters keep re-checking Redis on their own until we're back
+                logger.warning(f"Updates listener error: {e}")
+                await asyncio.sleep(1.0)
+                continue
+            if message is None or message.get("type") != "message":
+                continue
+            channel = message["channel"]
+            simulation_id = channel.removeprefix("simulation:").removesuffix(":updates")
+            try:
+                update = json.loads(message["data"])
+            except (TypeError, ValueError):
+                continue
+            if update.get("event") in self.TEAM_TYPES:
+                self._notify_team(simulation_id, update["event"], update.get("data"))
+
     async def subscribe_simulation(self, simulation_id: str):
         """Subscribe to simulation updates. Returns async generator of messages."""
         if not self._pubsub:
@@ -276,5 +608,16 @@ class RedisClient:
                 break
 
 
+def _series_json(columns: dict[str, list]) -> dict[str, list]:
+    """Round packed float32 values and map NaN/inf (beyond horizon, blocked path) to null."""
+    return {
+        name: [
+            (round(v, 4) if math.isfinite(v) else None) if isinstance(v, float) else v
+            for v in values
+        ]
+        for name, values in columns.items()
+    }
+
+
 # Singleton instance
 redis_client = RedisClient()
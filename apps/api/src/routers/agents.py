@@ -24,6 +24,7 @@ from fastapi import APIRouter, BackgroundTasks
 from pydantic import BaseModel
 
 from ..redis_client import redis_client
+from ..services.metrics_refresh import schedule_metrics_refresh
 from ..services.orchestrator import TeamType, orchestrator
 
 logger = logging.getLogger(__name__)
@@ -152,6 +153,8 @@ async def submit_result(
         # Store result as the team consensus in Redis (orchestrator reads this)
         await redis_client.set_team_result(sim_id, team_type, payload.result)
         await redis_client.set_team_status(sim_id, team_type, "complete")
+        if team_type in redis_client.METRICS_SOURCE_TEAMS:
+            schedule_metrics_refresh(sim_id)
 
         # Check if downstream teams can now be queued
         background_tasks.add_task(_maybe_queue_downstream, sim_id, team_type)
@@ -4,7 +4,11 @@ from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import Any
 
-from ..services.analysis import run_full_analysis, run_single_team, _load_wm_module
+from ..services.analysis import context_stats, extraction_stats, get_inference_cache, run_full_analysis, run_single_team, _load_wm_module
+from ..services.compute_pool import compute_pool
+from ..services.inference_router import inference_router
+from ..services.inference_scheduler import Priority, inference_context, inference_scheduler
+from ..services.openai_inference import openai_stats
 
 router = APIRouter(prefix="/analysis", tags=["analysis"])
 
@@ -38,9 +42,10 @@ async def run_analysis(request: FullAnalysisRequest):
     1. Fire Severity -> 2. Structural Analysis -> 3. Evacuation Routes -> 4. Personnel Rec
     """
     try:
-        result = await run_full_analysis(
-            request.simulation_id, request.frame_path, request.frame_id,
-        )
+        with inference_context(Priority.INTERACTIVE, tenant=request.simulation_id):
+            result = await run_full_analysis(
+                request.simulation_id, request.frame_path, request.frame_id,
+            )
         return result
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail=f"Frame not found: {request.frame_path}")
@@ -61,17 +66,63 @@ async def run_team(request: SingleTeamRequest):
             detail=f"Invalid team_type: {request.team_type}. Must be one of {valid_types}",
         )
     try:
-        result = await run_single_team(
-            request.frame_path,
-            request.team_type,
-            request.context,
-            request.frame_id,
-        )
+        with inference_context(Priority.INTERACTIVE):
+            result = await run_single_team(
+                request.frame_path,
+                request.team_type,
+                request.context,
+                request.frame_id,
+            )
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/cache/stats")
+async def inference_cache_stats() -> dict[str, Any]:
+    """Hit/miss counters and tier sizes for the shared vision inference cache."""
+    cache = get_inference_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
+
+@router.get("/router/stats")
+async def inference_router_stats() -> dict[str, Any]:
+    """Rolling latency, error rate and hedge counts per inference backend."""
+    return inference_router.stats()
+
+
+@router.get("/scheduler/stats")
+async def inference_scheduler_stats() -> dict[str, Any]:
+    """Slots in use, queue depth by priority and simulation, and queue waits per backend."""
+    return inference_scheduler.stats()
+
+
+@router.get("/compute/stats")
+async def compute_pool_stats() -> dict[str, Any]:
+    """Worker count, jobs in flight and queued, saturation, and per-job timings of the CPU pool."""
+    return compute_pool.stats()
+
+
+@router.get("/openai/stats")
+async def azure_openai_stats() -> dict[str, Any]:
+    """Request, retry, token and latency counters for the pooled Azure OpenAI client."""
+    return openai_stats()
+
+
+@router.get("/parse/stats")
+async def json_extraction_stats() -> dict[str, Any]:
+    """How many model responses parsed directly, needed repair, or were unrecoverable."""
+    return extraction_stats()
+
+
+@router.get("/context/stats")
+async def prompt_context_stats() -> dict[str, Any]:
+    """Render-cache hits and estimated tokens saved by upstream context compaction."""
+    return context_stats()
+
+
 @router.get("/demo")
 async def demo_analysis(frame_id: str = "siebel_demo_001"):
     """Return a complete demo analysis using pre-computed fallback data.
@@ -3,15 +3,10 @@ from __future__ import annotations
 
 from typing import Any
 
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, Field
 
-from ..services.metrics import (
-    compute_all_metrics,
-    compute_heat_exposure,
-    compute_optimized_path,
-    compute_survivability_window,
-)
+from ..services.compute_pool import atlas_job, compute_pool, cua_batch_job, cua_path_job, metrics_job
 
 router = APIRouter(prefix="/metrics", tags=["metrics"])
 
@@ -28,6 +23,12 @@ class ComputeMetricsRequest(BaseModel):
     structural_data: dict[str, Any] | None = None
 
 
+class AtlasRequest(BaseModel):
+    simulation_id: str = "demo"
+    fire_data: dict[str, Any] | None = None
+    structural_data: dict[str, Any] | None = None
+
+
 class CuaPathRequest(BaseModel):
     simulation_id: str = "demo"
     cua_path: list[str] = Field(..., min_length=1)
@@ -35,6 +36,15 @@ class CuaPathRequest(BaseModel):
     destination: str | None = None
 
 
+class CuaBatchRequest(BaseModel):
+    simulation_id: str = "demo"
+    paths: list[list[str]] = Field(..., min_length=1)
+    origin: str | None = None
+    destination: str | None = None
+    fire_data: dict[str, Any] | None = None
+    structural_data: dict[str, Any] | None = None
+
+
 # ---------------------------------------------------------------------------
 # Endpoints
 # ---------------------------------------------------------------------------
@@ -55,38 +65,119 @@ async def compute_metrics(req: ComputeMetricsRequest) -> dict[str, Any]:
         if structural_data is None:
             structural_data = _fallback.get_fallback_structural(req.simulation_id)
 
-    snapshot = compute_all_metrics(
+    computed = await compute_pool.run(
+        metrics_job,
         fire_data,
         structural_data,
         origin=req.origin,
         destination=req.destination,
     )
-    return {"simulation_id": req.simulation_id, "metrics": snapshot.to_dict()}
+    return {"simulation_id": req.simulation_id, "metrics": computed["metrics"]}
+
+
+@router.post("/atlas")
+async def survivability_atlas(req: AtlasRequest) -> dict[str, Any]:
+    """Building-wide survivability heatmap from a single spread simulation.
+
+    Returns parallel per-room arrays (time to danger/flashover, egress time,
+    nearest exit, latest safe departure) so the dashboard can shade every
+    room from one call.
+    """
+    fire_data = req.fire_data
+    structural_data = req.structural_data
+
+    if fire_data is None:
+        from ..services.analysis import _load_wm_module
+        _fallback = _load_wm_module("fallback")
+        fire_data = _fallback.get_fallback_fire_severity(req.simulation_id)
+        if structural_data is None:
+            structural_data = _fallback.get_fallback_structural(req.simulation_id)
+
+    atlas = await compute_pool.run(atlas_job, fire_data, structural_data)
+    return {"simulation_id": req.simulation_id, "atlas": atlas.to_dict()}
+
+
+@router.get("/cache/stats")
+async def metrics_cache_stats() -> dict[str, Any]:
+    """Hit/miss counters for the write-through metrics cache."""
+    from ..redis_client import redis_client
+
+    try:
+        stats = await redis_client.get_metrics_cache_stats()
+    except Exception:
+        stats = {"hits": 0, "misses": 0}
+    total = stats["hits"] + stats["misses"]
+    return {**stats, "hit_rate": round(stats["hits"] / total, 3) if total else 0.0}
+
+
+@router.get("/{simulation_id}/series")
+async def get_metrics_series(
+    simulation_id: str,
+    since: int = 0,
+    limit: int | None = None,
+) -> dict[str, Any]:
+    """Per-frame metrics time series as parallel arrays.
+
+    Pass the last ``seq`` you received as ``since`` to fetch only new points,
+    and ``limit`` to page through them oldest first; new points are also pushed live as ``metrics_point`` events on
+    /ws/simulation/{simulation_id}.
+    """
+    from ..redis_client import redis_client
+
+    try:
+        series = await redis_client.get_metrics_series(simulation_id, since=since, limit=limit)
+    except Exception:
+        raise HTTPException(status_code=503, detail="metrics series unavailable")
+    return {"simulation_id": simulation_id, "series": series}
 
 
 @router.get("/{simulation_id}")
 async def get_cached_metrics(simulation_id: str) -> dict[str, Any]:
-    """Return cached metrics from Redis. Falls back to computing fresh if uncached."""
+    """Return the cached metrics snapshot for the current result revision.
+
+    Snapshots are written through when fire_severity/structural results land.
+    On a miss, recomputes from the stored team results (or demo fallback data
+    when the simulation has none) and writes the result back.
+    """
     from ..redis_client import redis_client
 
-    cached = None
     try:
-        cached = await redis_client.client.get(f"metrics:{simulation_id}")
+        cached = await redis_client.get_cached_metrics(simulation_id)
     except Exception:
-        pass
+        cached = None
 
     if cached:
-        import json
-        return {"simulation_id": simulation_id, "metrics": json.loads(cached), "cached": True}
+        return {
+            "simulation_id": simulation_id,
+            "metrics": cached["metrics"],
+            "revision": cached["revision"],
+            "cached": True,
+        }
 
-    # Compute fresh with fallback data
-    from ..services.analysis import _load_wm_module
-    _fallback = _load_wm_module("fallback")
-    fire_data = _fallback.get_fallback_fire_severity(simulation_id)
-    structural_data = _fallback.get_fallback_structural(simulation_id)
+    fire_data = structural_data = None
+    revision = 0
+    try:
+        revision = await redis_client.get_result_revision(simulation_id)
+        fire_data = await redis_client.get_team_result(simulation_id, "fire_severity")
+        structural_data = await redis_client.get_team_result(simulation_id, "structural")
+    except Exception:
+        pass
+
+    if fire_data is None:
+        # Compute fresh with fallback data
+        from ..services.analysis import _load_wm_module
+        _fallback = _load_wm_module("fallback")
+        fire_data = _fallback.get_fallback_fire_severity(simulation_id)
+        structural_data = _fallback.get_fallback_structural(simulation_id)
+        computed = await compute_pool.run(metrics_job, fire_data, structural_data)
+        return {"simulation_id": simulation_id, "metrics": computed["metrics"], "cached": False}
 
-    snapshot = compute_all_metrics(fire_data, structural_data)
-    return {"simulation_id": simulation_id, "metrics": snapshot.to_dict(), "cached": False}
+    metrics = (await compute_pool.run(metrics_job, fire_data, structural_data))["metrics"]
+    try:
+        await redis_client.set_cached_metrics(simulation_id, revision, metrics)
+    except Exception:
+        pass
+    return {"simulation_id": simulation_id, "metrics": metrics, "revision": revision, "cached": False}
 
 
 @router.post("/cua/path")
@@ -106,15 +197,13 @@ async def compare_cua_path(req: CuaPathRequest) -> dict[str, Any]:
     origin = req.origin or req.cua_path[0]
     destination = req.destination or req.cua_path[-1]
 
-    # Compute optimal metrics
-    optimal = compute_all_metrics(fire_data, structural_data, origin=origin, destination=destination)
-
-    # Compute CUA path metrics (use the CUA path directly)
-    cua_survivability = compute_survivability_window(req.cua_path, fire_data)
-    cua_heat = compute_heat_exposure(req.cua_path, fire_data, structural_data)
+    # Optimal and CUA metrics from one hazard graph + spread simulation, in a worker
+    optimal, cua_survivability, cua_heat = await compute_pool.run(
+        cua_path_job, fire_data, structural_data, req.cua_path, origin, destination,
+    )
 
     # Efficiency ratio: lower is better for CUA (1.0 = as good as optimal)
-    optimal_score = optimal.heat_exposure.total_score
+    optimal_score = optimal["heat_exposure"]["total_score"]
     cua_score = cua_heat.total_score
     if optimal_score > 0:
         efficiency_ratio = round(cua_score / optimal_score, 3)
@@ -123,7 +212,7 @@ async def compare_cua_path(req: CuaPathRequest) -> dict[str, Any]:
 
     return {
         "simulation_id": req.simulation_id,
-        "optimal": optimal.to_dict(),
+        "optimal": optimal,
         "cua": {
             "path": req.cua_path,
             "room_count": len(req.cua_path),
@@ -137,7 +226,53 @@ async def compare_cua_path(req: CuaPathRequest) -> dict[str, Any]:
                 "total_score": cua_heat.total_score,
                 "classification": cua_heat.classification,
                 "per_room": cua_heat.per_room,
+                "dose": cua_heat.dose,
             },
         },
         "efficiency_ratio": efficiency_ratio,
     }
+
+
+@router.post("/cua/batch")
+async def compare_cua_paths_batch(req: CuaBatchRequest) -> dict[str, Any]:
+    """Score many CUA paths against one scenario (leaderboards, RL rollouts).
+
+    Hazard state and the optimal path are computed once; every candidate is
+    then scored with vectorized gathers. Results are parallel arrays in the
+    order of ``paths``. Unbounded efficiency ratios are returned as null.
+    """
+    fire_data = req.fire_data
+    structural_data = req.structural_data
+    if fire_data is None:
+        from ..services.analysis import _load_wm_module
+        _fallback = _load_wm_module("fallback")
+        fire_data = _fallback.get_fallback_fire_severity(req.simulation_id)
+        if structural_data is None:
+            structural_data = _fallback.get_fallback_structural(req.simulation_id)
+
+    first = next((p for p in req.paths if p), ["Lobby"])
+    origin = req.origin or first[0]
+    destination = req.destination or first[-1]
+
+    optimal, scores = await compute_pool.run(
+        cua_batch_job, fire_data, structural_data, req.paths, origin, destination,
+    )
+
+    optimal_score = optimal["heat_exposure"]["total_score"]
+    heat = scores["heat_exposure"]
+    if optimal_score > 0:
+        ratios = [round(v, 3) for v in (heat / optimal_score).tolist()]
+    else:
+        ratios = [1.0 if v == 0 else None for v in heat.tolist()]
+
+    return {
+        "simulation_id": req.simulation_id,
+        "optimal": optimal,
+        "count": len(req.paths),
+        "room_count": [len(p) for p in req.paths],
+        "heat_exposure": heat.tolist(),
+        "heat_dose": scores["heat_dose"].tolist(),
+        "minutes_remaining": [m if m >= 0 else None for m in scores["minutes_remaining"].tolist()],
+        "viable": scores["viable"].tolist(),
+        "efficiency_ratio": ratios,
+    }
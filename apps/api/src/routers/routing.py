@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from datetime import datetime
+
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from ..services.routing import optimize_vehicle_route
@@ -12,11 +14,14 @@ class RoutingRequest(BaseModel):
     origin: dict[str, float]
     destination: dict[str, float]
     vehicle_type: str
+    departure_time: datetime | None = None
 
 
 @router.post("/optimize")
 async def optimize(payload: RoutingRequest):
-    route = await optimize_vehicle_route(payload.origin, payload.destination, payload.vehicle_type)
+    route = await optimize_vehicle_route(
+        payload.origin, payload.destination, payload.vehicle_type, payload.departure_time,
+    )
     if not route:
         raise HTTPException(status_code=500, detail="routing failed")
     return route
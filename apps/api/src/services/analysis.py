@@ -19,6 +19,10 @@ _wm_src = _repo_root / "packages" / "world-models" / "src"
 
 import importlib.util as _ilu  # noqa: E402
 
+from .compute_pool import compute_pool, evacuation_job, personnel_job, spread_timeline_job  # noqa: E402
+from .frame_store import frame_store  # noqa: E402
+from .inference_scheduler import inference_scheduler  # noqa: E402
+
 
 def _load_wm_module(name: str):
     """Load a module from packages/world-models/src/ by name."""
@@ -35,8 +39,54 @@ def _load_wm_module(name: str):
 _vision = _load_wm_module("vision")
 _fire_sim = _load_wm_module("fire_sim")
 
-analyze_frame = _vision.analyze_frame
+# Ollama/Modal calls queue in the app-wide scheduler with every other backend
+_vision.set_slot_provider(inference_scheduler.slot)
+
 build_spread_timeline = _fire_sim.build_spread_timeline
+# Shared with vision.py so every backend reads and fills the same cache
+get_inference_cache = _vision.get_inference_cache
+inference_key = _vision.inference_key
+StreamingJSONObject = _vision.StreamingJSONObject
+PartialCallback = _vision.PartialCallback
+# CPU fire pre-screen, for backends that don't go through vision.py
+PRESCREEN_ENABLED = _vision.PRESCREEN_ENABLED
+prescreen_frame = _vision.prescreen_frame
+fire_free_result = _vision.fire_free_result
+crop_to_box = _vision.crop_to_box
+remap_fire_locations = _vision.remap_fire_locations
+# One schema-guided parser for every backend's model output
+extract_json = _vision.extract_json
+coerce_to_schema = _vision.coerce_to_schema
+load_schema = _vision.load_schema
+extraction_stats = _vision.extraction_stats
+JSONExtractionError = _vision.JSONExtractionError
+# Token-budgeted upstream context for downstream prompts
+compact_context = _vision.compact_context
+context_stats = _vision.context_stats
+
+
+async def analyze_frame(
+    frame_path: str,
+    team_type: str,
+    context: dict[str, Any] | None = None,
+    frame_id: str = "unknown",
+    on_partial: PartialCallback | None = None,
+    use_fallback: bool = True,
+) -> dict[str, Any]:
+    """``vision.analyze_frame``, with the rule-based evacuation and personnel teams run in the compute pool.
+
+    A frame prepared in the frame store is sent as is, skipping the read and encode.
+    """
+    if team_type == "evacuation":
+        fire_ctx = context.get("fire_severity") if context else None
+        structural_ctx = context.get("structural") if context else None
+        return await compute_pool.run(evacuation_job, fire_ctx, structural_ctx, frame_id)
+    if team_type == "personnel":
+        return await compute_pool.run(personnel_job, context, frame_id)
+    return await _vision.analyze_frame(
+        frame_store.get(frame_path) or frame_path, team_type, context=context, frame_id=frame_id,
+        on_partial=on_partial, use_fallback=use_fallback,
+    )
 
 
 async def run_full_analysis(
@@ -98,8 +148,8 @@ async def run_full_analysis(
     )
     results["teams"]["personnel"] = personnel_result
 
-    # Bonus: fire spread timeline
-    results["spread_timeline"] = build_spread_timeline(fire_result, building_layout)
+    # Bonus: fire spread timeline (CPU-bound, off the event loop)
+    results["spread_timeline"] = await compute_pool.run(spread_timeline_job, fire_result, building_layout)
 
     return results
 
@@ -109,6 +159,11 @@ async def run_single_team(
     team_type: str,
     context: dict[str, Any] | None = None,
     frame_id: str = "frame_0",
+    on_partial: PartialCallback | None = None,
+    use_fallback: bool = True,
 ) -> dict[str, Any]:
     """Run a single agent team's analysis. Used when teams run independently."""
-    return await analyze_frame(frame_path, team_type, context=context, frame_id=frame_id)
+    return await analyze_frame(
+        frame_path, team_type, context=context, frame_id=frame_id,
+        on_partial=on_partial, use_fallback=use_fallback,
+    )
@@ -13,7 +13,6 @@ from __future__ import annotations
 
 import asyncio
 import base64
-import json
 import logging
 from datetime import datetime, timezone
 from pathlib import Path
@@ -22,36 +21,23 @@ from typing import Any
 import httpx
 
 from ..config import get_settings
+from .analysis import (
+    PRESCREEN_ENABLED,
+    compact_context,
+    crop_to_box,
+    fire_free_result,
+    get_inference_cache,
+    inference_key,
+    prescreen_frame,
+    remap_fire_locations,
+)
+from .frame_store import downscale_image_bytes, frame_store
+from .inference_scheduler import Priority, inference_context, inference_scheduler
 
 logger = logging.getLogger(__name__)
 
 DEFAULT_TIMEOUT = 180.0
 
-# Max image dimension before we downscale (keeps payloads reasonable for Ollama)
-MAX_IMAGE_DIMENSION = 1024
-MAX_IMAGE_BYTES = 500_000  # 500KB
-
-
-def _resize_image_bytes(raw: bytes) -> bytes:
-    """Downscale image if too large, returns JPEG bytes."""
-    if len(raw) <= MAX_IMAGE_BYTES:
-        return raw
-    try:
-        from io import BytesIO
-        from PIL import Image
-
-        img = Image.open(BytesIO(raw))
-        # Resize maintaining aspect ratio
-        img.thumbnail((MAX_IMAGE_DIMENSION, MAX_IMAGE_DIMENSION), Image.LANCZOS)
-        buf = BytesIO()
-        img.save(buf, format="JPEG", quality=85)
-        resized = buf.getvalue()
-        logger.info(f"Resized image: {len(raw)} -> {len(resized)} bytes")
-        return resized
-    except ImportError:
-        logger.warning("Pillow not installed, sending full-size image")
-        return raw
-
 # Live Modal endpoint (VisionModel.web_analyze on H100)
 DEFAULT_ENDPOINT = "https://asaha96--orca-vision-visionmodel-web-analyze.modal.run"
 
@@ -140,12 +126,8 @@ _PERSONNEL_JSON_SCHEMA = """{
 
 
 def _summarize_context(ctx: dict[str, Any], keys: list[str]) -> str:
-    """Extract only essential fields from upstream context to keep prompts short."""
-    summary = {}
-    for k in keys:
-        if k in ctx:
-            summary[k] = ctx[k]
-    return json.dumps(summary)
+    """Render essential upstream fields (most valuable first) within the context token budget."""
+    return compact_context(ctx, keys)
 
 
 _JSON_INSTRUCTION = "IMPORTANT: Output ONLY a raw JSON object. No text before or after. No markdown. No explanation. Start with { and end with }."
@@ -155,7 +137,8 @@ def _build_prompt(team_type: str, context: dict[str, Any] | None) -> str:
     """Build the vision model prompt for a given team type.
 
     Keeps prompts concise to avoid confusing smaller models. Upstream
-    context is trimmed to essential fields only.
+    context is trimmed to essential fields, listed most valuable first, and
+    rendered within the context token budget.
     """
     ctx = context or {}
 
@@ -165,7 +148,7 @@ def _build_prompt(team_type: str, context: dict[str, Any] | None) -> str:
     if team_type == "structural":
         fire = ctx.get("fire_severity", {})
         fire_summary = _summarize_context(fire, [
-            "fire_detected", "overall_severity", "severity_score", "fire_locations",
+            "fire_detected", "overall_severity", "fire_locations", "severity_score",
         ])
         return (
             "You are a structural engineer inspecting a building for a training simulation. "
@@ -209,6 +192,24 @@ def _build_prompt(team_type: str, context: dict[str, Any] | None) -> str:
     raise ValueError(f"Unknown team_type: {team_type}")
 
 
+def _fire_free_result(screen: Any) -> dict[str, Any]:
+    """Pre-screen answer for a fire-free frame, in the cloud prompt's schema."""
+    vision_shaped = fire_free_result(screen)
+    return {
+        "fire_detected": False,
+        "overall_severity": "none",
+        "severity_score": 0.0,
+        "fire_locations": [],
+        "fuel_sources": [],
+        "smoke_conditions": {
+            "visibility": "clear" if vision_shaped["smoke_density"] == "none" else "light",
+            "toxicity_risk": "low",
+        },
+        "spread_prediction": {"rate": "slow", "containment_difficulty": "easy"},
+        "confidence": vision_shaped["confidence"],
+    }
+
+
 class CloudInferenceClient:
     """Async HTTP client for the live Modal VisionModel endpoint."""
 
@@ -250,21 +251,39 @@ class CloudInferenceClient:
         Translates team_type into a structured prompt, sends base64 image,
         and returns the parsed JSON result.
         """
-        # Load and optionally resize frame, then encode to base64
-        if isinstance(frame_path, bytes):
-            raw = _resize_image_bytes(frame_path)
-            frame_base64 = base64.standard_b64encode(raw).decode()
+        # Load and optionally resize frame, then encode to base64 — unless the
+        # orchestrator already prepared it for this simulation
+        prepared = frame_store.get(frame_path) if isinstance(frame_path, str) else None
+        if prepared is not None:
+            raw = prepared.data
+        elif isinstance(frame_path, bytes):
+            raw = downscale_image_bytes(frame_path)
         elif isinstance(frame_path, str):
             path = Path(frame_path)
             if path.exists():
-                raw = _resize_image_bytes(path.read_bytes())
-                frame_base64 = base64.standard_b64encode(raw).decode()
+                raw = downscale_image_bytes(path.read_bytes())
             else:
                 logger.warning(f"Frame not found: {frame_path}, using empty placeholder")
-                frame_base64 = ""
+                raw = b""
         else:
             raise ValueError(f"Invalid frame type: {type(frame_path)}")
 
+        # Fire severity: skip the model for fire-free frames, crop to candidates otherwise
+        screen = None
+        if PRESCREEN_ENABLED and team_type == "fire_severity" and raw:
+            screen = await asyncio.to_thread(prescreen_frame, raw)
+        if screen is not None and screen.fire_free:
+            logger.info(f"Pre-screen found no fire in {frame_id}, skipping cloud inference")
+            return self._annotate(_fire_free_result(screen), team_type, frame_id, screen)
+        box = screen.crop_box if screen is not None else None
+        if box is not None:
+            raw = crop_to_box(raw, box)
+
+        if prepared is not None and raw is prepared.data:
+            frame_base64 = prepared.b64
+        else:
+            frame_base64 = base64.standard_b64encode(raw).decode()
+
         prompt = _build_prompt(team_type, context)
 
         # Payload matches VisionModel.web_analyze expected format
@@ -273,13 +292,22 @@ class CloudInferenceClient:
             "prompt": prompt,
         }
 
-        client = await self._get_client()
         url = self._get_endpoint_url()
+        cache = get_inference_cache() if frame_base64 else None
+        key = inference_key(frame_base64, prompt, url, "cloud")
+        if cache is not None:
+            cached = await cache.aget(key)
+            if cached is not None:
+                logger.info(f"Cloud inference cache hit: {team_type}")
+                return self._annotate(cached, team_type, frame_id, screen)
+
+        client = await self._get_client()
         headers = self._get_headers()
 
         try:
             logger.info(f"Calling cloud inference: {team_type} at {url}")
-            response = await client.post(url, json=payload, headers=headers)
+            async with inference_scheduler.slot("cloud", self.settings.cloud_max_concurrency):
+                response = await client.post(url, json=payload, headers=headers)
             response.raise_for_status()
             result = response.json()
 
@@ -288,15 +316,11 @@ class CloudInferenceClient:
             # can fall back to local stubs.
             if "error" in result:
                 logger.warning(f"Model-level error for {team_type}: {result.get('error', '')[:200]}")
-
-            # Enrich with metadata
-            result["frame_id"] = frame_id
-            result["timestamp"] = datetime.now(timezone.utc).isoformat()
-            result["frame_refs"] = [frame_id]
-            result["team_type"] = team_type
+            elif cache is not None and "raw_response" not in result:
+                await cache.aput(key, result)
 
             logger.info(f"Cloud inference complete: {team_type}")
-            return result
+            return self._annotate(result, team_type, frame_id, screen)
 
         except httpx.HTTPStatusError as e:
             logger.error(f"Cloud inference HTTP error: {e.response.status_code} - {e.response.text}")
@@ -305,18 +329,32 @@ class CloudInferenceClient:
             logger.error(f"Cloud inference request error: {e}")
             raise CloudInferenceError(f"Request failed: {e}") from e
 
+    @staticmethod
+    def _annotate(result: dict[str, Any], team_type: str, frame_id: str, screen: Any = None) -> dict[str, Any]:
+        """Enrich a model result with request metadata (and pre-screen details, if any)."""
+        if screen is not None:
+            if screen.crop_box is not None:
+                remap_fire_locations(result, screen.crop_box)
+            result["prescreen"] = screen.to_dict()
+        result["frame_id"] = frame_id
+        result["timestamp"] = datetime.now(timezone.utc).isoformat()
+        result["frame_refs"] = [frame_id]
+        result["team_type"] = team_type
+        return result
+
     async def analyze_batch(
         self,
         team_type: str,
         frames: list[str | bytes],
         context: dict[str, Any] | None = None,
     ) -> list[dict[str, Any]]:
-        """Analyze multiple frames concurrently."""
-        tasks = [
-            self.analyze(team_type, frame, context, frame_id=f"frame_{i:03d}")
-            for i, frame in enumerate(frames)
-        ]
-        return await asyncio.gather(*tasks, return_exceptions=True)
+        """Analyze multiple frames concurrently, behind interactive and simulation calls."""
+        with inference_context(Priority.BATCH):
+            tasks = [
+                self.analyze(team_type, frame, context, frame_id=f"frame_{i:03d}")
+                for i, frame in enumerate(frames)
+            ]
+            return await asyncio.gather(*tasks, return_exceptions=True)
 
     async def health_check(self) -> bool:
         """Check if the cloud endpoint is reachable."""
@@ -0,0 +1,269 @@
+"""Worker-process pool for CPU-bound simulation work.
+
+Evacuation routing, fire spread, personnel synthesis, vehicle ETAs and the
+observability metrics are pure CPU work on plain payloads. Run inside a
+handler they block the event loop — every other WebSocket and request — for
+as long as one large layout takes. They are submitted here instead:
+
+- workers start warm: the initializer loads the world-model and routing
+  modules and builds the default building layout once per process, so a
+  job pays only for its own computation;
+- jobs take and return plain dicts, lists and numpy arrays, which pickle
+  compactly — only payloads cross the process boundary, never hazard
+  graphs or spread simulations;
+- ``stats()`` reports saturation (jobs in flight against workers) and queue
+  and compute time per job kind.
+
+``ORCA_COMPUTE_WORKERS=0`` runs jobs on a thread instead, still off the loop.
+"""
+from __future__ import annotations
+
+import asyncio
+import functools
+import logging
+import multiprocessing
+import time
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from typing import Any, TypeVar
+
+from ..config import get_settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+TIMING_WINDOW = 200  # recent timings kept per job kind
+
+
+# ---------------------------------------------------------------------------
+# Worker side: warm modules and layout, and the jobs themselves
+# ---------------------------------------------------------------------------
+
+_WM_MODULES = ("building_gen", "fire_sim", "evacuation", "personnel")
+
+
+def _wm(name: str) -> Any:
+    from .metrics import load_world_model
+    return load_world_model(name)
+
+
+@functools.lru_cache(maxsize=1)
+def _default_rooms() -> list[dict[str, Any]]:
+    return _wm("building_gen").siebel_center_rooms()
+
+
+def _warm_worker() -> None:
+    """Process initializer: import everything the jobs use and build the default layout."""
+    from . import metrics
+    for name in _WM_MODULES:
+        _wm(name)
+    metrics.build_hazard_state({}, None, _default_rooms()).graph  # networkx + routing graph
+
+
+def _ready() -> None:
+    """No-op job; submitting one per worker starts the pool."""
+
+
+def _timed(call: Callable[[], T]) -> tuple[T, float]:
+    started = time.perf_counter()
+    return call(), time.perf_counter() - started
+
+
+def metrics_job(
+    fire_data: dict[str, Any],
+    structural_data: dict[str, Any] | None = None,
+    origin: str = "Lobby",
+    destination: str = "1302",
+    spread: bool = False,
+) -> dict[str, Any]:
+    """``compute_all_metrics`` as a dict; with ``spread``, also the spread timeline from the same hazard state."""
+    from . import metrics
+    state = metrics.build_hazard_state(fire_data, structural_data, _default_rooms())
+    snapshot = metrics.compute_all_metrics(fire_data, structural_data, origin, destination, state=state)
+    out: dict[str, Any] = {"metrics": snapshot.to_dict()}
+    if spread:
+        out["spread_timeline"] = state.spread_timeline()
+    return out
+
+
+def atlas_job(fire_data: dict[str, Any], structural_data: dict[str, Any] | None = None) -> Any:
+    """Building-wide survivability atlas (per-room numpy arrays)."""
+    from . import metrics
+    return metrics.compute_survivability_atlas(
+        metrics.build_hazard_state(fire_data, structural_data, _default_rooms())
+    )
+
+
+def cua_path_job(
+    fire_data: dict[str, Any],
+    structural_data: dict[str, Any] | None,
+    cua_path: list[str],
+    origin: str,
+    destination: str,
+) -> tuple[dict[str, Any], Any, Any]:
+    """Optimal metrics (as a dict) plus the survivability window and heat exposure of ``cua_path``."""
+    from . import metrics
+    state = metrics.build_hazard_state(fire_data, structural_data, _default_rooms())
+    optimal = metrics.compute_all_metrics(fire_data, structural_data, origin, destination, state=state)
+    return (
+        optimal.to_dict(),
+        metrics.compute_survivability_window(cua_path, fire_data, state=state),
+        metrics.compute_heat_exposure(cua_path, fire_data, structural_data, state=state),
+    )
+
+
+def cua_batch_job(
+    fire_data: dict[str, Any],
+    structural_data: dict[str, Any] | None,
+    paths: list[list[str]],
+    origin: str,
+    destination: str,
+) -> tuple[dict[str, Any], dict[str, Any]]:
+    """Optimal metrics (as a dict) plus ``score_paths`` arrays for every candidate path."""
+    from . import metrics
+    state = metrics.build_hazard_state(fire_data, structural_data, _default_rooms())
+    optimal = metrics.compute_all_metrics(fire_data, structural_data, origin, destination, state=state)
+    return optimal.to_dict(), metrics.score_paths(paths, state)
+
+
+def evacuation_job(
+    fire_data: dict[str, Any] | None,
+    structural_data: dict[str, Any] | None,
+    frame_id: str = "unknown",
+) -> dict[str, Any]:
+    return _wm("evacuation").compute_evacuation_routes(fire_data, structural_data, frame_id)
+
+
+def personnel_job(context: dict[str, Any] | None, frame_id: str = "unknown") -> dict[str, Any]:
+    return _wm("personnel").recommend_personnel(context, frame_id)
+
+
+def spread_timeline_job(
+    fire_data: dict[str, Any],
+    building_layout: dict[str, Any] | None = None,
+) -> list[dict[str, Any]]:
+    return _wm("fire_sim").build_spread_timeline(fire_data, building_layout)
+
+
+def vehicle_route_job(
+    profiles_path: str,
+    origin: dict[str, float],
+    destination: dict[str, float],
+    departure: datetime,
+) -> tuple[float, list[dict[str, float]]] | None:
+    """Time-dependent vehicle ETA and path over the profiled road network."""
+    from .routing import route_on_profiles
+    return route_on_profiles(profiles_path, origin, destination, departure)
+
+
+# ---------------------------------------------------------------------------
+# API side
+# ---------------------------------------------------------------------------
+
+def _percentile(values: deque[float], q: float) -> float | None:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 4)
+
+
+class ComputePool:
+    """Runs CPU-bound jobs in warm worker processes and tracks how busy they are."""
+
+    def __init__(self, workers: int | None = None):
+        self._workers = workers  # None: ORCA_COMPUTE_WORKERS
+        self._executor: ProcessPoolExecutor | None = None
+        self._in_flight = 0
+        self._counters = {"submitted": 0, "completed": 0, "failed": 0, "restarts": 0}
+        self._job_counts: dict[str, int] = {}
+        self._queue_waits: dict[str, deque[float]] = {}
+        self._compute_times: dict[str, deque[float]] = {}
+
+    @property
+    def workers(self) -> int:
+        return self._workers if self._workers is not None else get_settings().compute_workers
+
+    def start(self) -> None:
+        """Spawn and warm every worker now rather than on the first job."""
+        if self.workers <= 0 or self._executor is not None:
+            return
+        # Spawned, not forked: workers must not inherit the event loop,
+        # sockets or locks held by other threads
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_warm_worker,
+        )
+        for _ in range(self.workers):
+            self._executor.submit(_ready)
+        logger.info(f"Compute pool started with {self.workers} worker(s)")
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run ``fn(*args, **kwargs)`` in a worker; ``fn`` and its arguments must pickle."""
+        self.start()
+        call = functools.partial(fn, *args, **kwargs)
+        kind = fn.__name__
+        self._counters["submitted"] += 1
+        self._in_flight += 1
+        submitted = time.perf_counter()
+        try:
+            if self._executor is not None:
+                loop = asyncio.get_running_loop()
+                result, compute = await loop.run_in_executor(self._executor, _timed, call)
+            else:
+                result, compute = await asyncio.to_thread(_timed, call)
+        except BrokenProcessPool:
+            # A worker died (OOM, segfault): later jobs get a fresh pool
+            self._counters["failed"] += 1
+            self._counters["restarts"] += 1
+            logger.warning(f"Compute pool broken during {kind}; restarting it")
+            self.shutdown()
+            raise
+        except Exception:
+            self._counters["failed"] += 1
+            raise
+        finally:
+            self._in_flight -= 1
+
+        self._counters["completed"] += 1
+        self._job_counts[kind] = self._job_counts.get(kind, 0) + 1
+        total = time.perf_counter() - submitted
+        self._queue_waits.setdefault(kind, deque(maxlen=TIMING_WINDOW)).append(max(total - compute, 0.0))
+        self._compute_times.setdefault(kind, deque(maxlen=TIMING_WINDOW)).append(compute)
+        return result
+
+    def stats(self) -> dict[str, Any]:
+        """Workers, jobs in flight and queued, saturation, and queue/compute time per job kind."""
+        workers = self.workers
+        return {
+            "mode": "process" if workers > 0 else "thread",
+            "workers": workers,
+            "running": self._executor is not None,
+            "in_flight": self._in_flight,
+            "queued": max(self._in_flight - workers, 0) if workers > 0 else 0,
+            "saturation": round(self._in_flight / workers, 3) if workers > 0 else None,
+            **self._counters,
+            "jobs": {
+                kind: {
+                    "completed": self._job_counts[kind],
+                    "queue_wait_p50_seconds": _percentile(self._queue_waits[kind], 0.5),
+                    "queue_wait_p95_seconds": _percentile(self._queue_waits[kind], 0.95),
+                    "compute_p50_seconds": _percentile(self._compute_times[kind], 0.5),
+                    "compute_p95_seconds": _percentile(self._compute_times[kind], 0.95),
+                }
+                for kind in self._compute_times
+            },
+        }
+
+
+# Shared by every handler in the process
+compute_pool = ComputePool()
@@ -0,0 +1,232 @@
+"""Field-wise consensus over a team's instance results.
+
+Every instance (and every frame) of a team produces a full result. The
+consensus is built field by field rather than taken from one of them:
+
+- numeric fields: median, or a 20% trimmed mean once there are 5+ values;
+  computed for all numeric fields at once as one (results x fields) matrix;
+- categorical fields (strings, booleans): majority vote weighted by each
+  result's confidence;
+- location lists (``fire_locations`` and anything else whose items carry
+  x/y coordinates): points from all results are clustered spatially, and a
+  cluster reported by at least half of the results becomes one consensus
+  location (itself merged field by field), annotated with its support;
+- other lists: weighted vote on the whole list; ``frame_refs`` is the union.
+
+Each field also gets an agreement score — the share of results within
+tolerance of the consensus value, the winning vote share, or the mean
+cluster support — and their mean is the team's ``agreement_score``, which
+also decides whether a team's early quorum agrees.
+"""
+from __future__ import annotations
+
+import json
+from typing import Any
+
+import numpy as np
+
+# Per-result bookkeeping: taken from the first result, not voted on or scored
+META_FIELDS = frozenset({
+    "frame_id", "timestamp", "merge_timestamp", "phase", "inference_mode",
+    "model", "team_type", "prescreen", "reused_from", "consensus_metadata",
+})
+# Merged like any other field, but a self-reported score is not agreement
+UNSCORED_FIELDS = frozenset({"confidence"})
+DEFAULT_CONFIDENCE = 0.8
+MIN_WEIGHT = 0.05
+TRIM_FRACTION = 0.2
+TRIMMED_MEAN_MIN_VALUES = 5
+# A numeric value agrees with the consensus within max(REL_TOL * |c|, ABS_TOL)
+REL_TOL = 0.1
+ABS_TOL = 0.05
+# Points closer than this belong to the same location: normalized image
+# coordinates (all within [0, 1]) vs. building coordinates in metres
+LOCATION_RADIUS_NORMALIZED = 0.1
+LOCATION_RADIUS_METRES = 3.0
+MIN_LOCATION_SUPPORT = 0.5
+
+Path = tuple[str, ...]
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _flatten(obj: dict[str, Any], prefix: Path = ()) -> dict[Path, Any]:
+    """Nested dicts to {key path: leaf}; lists and empty dicts are leaves."""
+    out: dict[Path, Any] = {}
+    for key, value in obj.items():
+        path = prefix + (key,)
+        if isinstance(value, dict) and value:
+            out.update(_flatten(value, path))
+        else:
+            out[path] = value
+    return out
+
+
+def _unflatten(flat: dict[Path, Any]) -> dict[str, Any]:
+    out: dict[str, Any] = {}
+    for path, value in flat.items():
+        node = out
+        for key in path[:-1]:
+            child = node.setdefault(key, {})
+            if not isinstance(child, dict):  # a leaf in some results, a dict in others
+                break
+            node = child
+        else:
+            node[path[-1]] = value
+    return out
+
+
+def _numeric_consensus(matrix: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Column-wise median / trimmed mean and agreement of a (results x fields) matrix with NaN gaps."""
+    present = ~np.isnan(matrix)
+    counts = present.sum(axis=0)
+    ordered = np.sort(matrix, axis=0)  # NaN sorts last
+    rank = np.arange(matrix.shape[0])[:, None]
+    trim = np.floor(counts * TRIM_FRACTION).astype(int)
+    kept = (rank >= trim) & (rank < counts - trim)
+    trimmed = np.where(kept, ordered, 0.0).sum(axis=0) / np.maximum(kept.sum(axis=0), 1)
+
+    with np.errstate(all="ignore"):
+        median = np.nanmedian(np.where(counts > 0, matrix, 0.0), axis=0)
+    value = np.where(counts >= TRIMMED_MEAN_MIN_VALUES, trimmed, median)
+
+    tolerance = np.maximum(REL_TOL * np.abs(value), ABS_TOL)
+    close = present & (np.abs(np.nan_to_num(matrix) - value) <= tolerance)
+    agreement = close.sum(axis=0) / np.maximum(counts, 1)
+    return value, agreement
+
+
+def _vote(values: list[Any], weights: np.ndarray) -> tuple[Any, float]:
+    """Weighted majority value and its share of the weight."""
+    tally: dict[str, list] = {}
+    for value, weight in zip(values, weights):
+        key = json.dumps(value, sort_keys=True, default=str)
+        if key in tally:
+            tally[key][1] += weight
+        else:
+            tally[key] = [value, weight]
+    winner, weight = max(tally.values(), key=lambda item: item[1])  # ties: first seen
+    return winner, float(weight / weights.sum())
+
+
+def _point(item: Any) -> tuple[float, float] | None:
+    if not isinstance(item, dict):
+        return None
+    coords = item.get("coordinates", item)
+    if isinstance(coords, dict) and _is_number(coords.get("x")) and _is_number(coords.get("y")):
+        return float(coords["x"]), float(coords["y"])
+    return None
+
+
+def _cluster_locations(
+    lists: list[list[dict[str, Any]]],
+    weights: np.ndarray,
+) -> tuple[list[dict[str, Any]], float]:
+    """Merge location lists from several results into supported consensus locations."""
+    items, owners, points = [], [], []
+    for owner, locations in enumerate(lists):
+        for item in locations:
+            point = _point(item)
+            if point is not None:
+                items.append(item)
+                owners.append(owner)
+                points.append(point)
+    if not points:
+        return [], 1.0
+
+    xy = np.asarray(points)
+    radius = LOCATION_RADIUS_NORMALIZED if np.abs(xy).max() <= 1.0 else LOCATION_RADIUS_METRES
+    near = np.linalg.norm(xy[:, None, :] - xy[None, :, :], axis=-1) <= radius
+    # Connected components: propagate the smallest index through neighbours
+    labels = np.arange(len(points))
+    while True:
+        spread = np.where(near, labels[None, :], len(points)).min(axis=1)
+        if np.array_equal(spread, labels):
+            break
+        labels = spread
+
+    owners_arr = np.asarray(owners)
+    merged, supports = [], []
+    for label in dict.fromkeys(labels.tolist()):  # first-appearance order
+        members = np.flatnonzero(labels == label)
+        member_owners = owners_arr[members]
+        support = len(set(member_owners.tolist())) / len(lists)
+        supports.append(support)
+        if support < MIN_LOCATION_SUPPORT:
+            continue
+        location, _ = _merge([items[i] for i in members], weights[member_owners])
+        location["support"] = round(support, 3)
+        merged.append(location)
+    merged.sort(key=lambda loc: -loc["support"])
+    return merged, float(np.mean(supports))
+
+
+def _merge(results: list[dict[str, Any]], weights: np.ndarray) -> tuple[dict[str, Any], dict[Path, float]]:
+    """Field-wise consensus of ``results`` and the agreement score of each scored field."""
+    flats = [_flatten(r) for r in results]
+    paths = list(dict.fromkeys(path for flat in flats for path in flat))
+    merged: dict[Path, Any] = {}
+    agreement: dict[Path, float] = {}
+    numeric: list[Path] = []
+
+    for path in paths:
+        if path[0] in META_FIELDS:
+            merged[path] = next(flat[path] for flat in flats if path in flat)
+            continue
+        present = [i for i, flat in enumerate(flats) if flat.get(path) is not None]
+        values = [flats[i][path] for i in present]
+        if not values:
+            merged[path] = None
+        elif all(_is_number(v) for v in values):
+            numeric.append(path)
+        elif path == ("frame_refs",):
+            merged[path] = list(dict.fromkeys(ref for v in values if isinstance(v, list) for ref in v))
+        elif all(isinstance(v, list) for v in values) and any(_point(item) for v in values for item in v):
+            merged[path], agreement[path] = _cluster_locations(values, weights[present])
+        else:
+            merged[path], agreement[path] = _vote(values, weights[present])
+
+    if numeric:
+        matrix = np.array(
+            [[flat[p] if _is_number(flat.get(p)) else np.nan for p in numeric] for flat in flats],
+            dtype=float,
+        )
+        values, scores = _numeric_consensus(matrix)
+        for path, value, score in zip(numeric, values.tolist(), scores.tolist()):
+            integral = all(isinstance(flat[path], int) for flat in flats if _is_number(flat.get(path)))
+            merged[path] = int(round(value)) if integral else round(value, 4)
+            if path[0] not in UNSCORED_FIELDS:
+                agreement[path] = score
+
+    return _unflatten({path: merged[path] for path in paths}), agreement
+
+
+def build_consensus(results: list[dict[str, Any]]) -> dict[str, Any]:
+    """Field-wise consensus of several results of one team, with agreement metadata."""
+    if not results:
+        return {}
+    if len(results) == 1:
+        return results[0]
+
+    confidences = [r.get("confidence") for r in results]
+    weights = np.array(
+        [c if _is_number(c) else DEFAULT_CONFIDENCE for c in confidences], dtype=float,
+    ).clip(MIN_WEIGHT, None)
+    consensus, agreement = _merge(results, weights)
+
+    disputed = {".".join(path): round(score, 3) for path, score in agreement.items() if score < 1.0}
+    consensus["consensus_metadata"] = {
+        "num_instances": len(results),
+        "agreement_score": round(float(np.mean(list(agreement.values()))), 3) if agreement else 1.0,
+        "disputed_fields": disputed,
+    }
+    return consensus
+
+
+def agreement_score(results: list[dict[str, Any]]) -> float:
+    """Mean field agreement among ``results`` (1.0 for fewer than two)."""
+    if len(results) < 2:
+        return 1.0
+    return build_consensus(results)["consensus_metadata"]["agreement_score"]
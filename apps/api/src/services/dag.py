@@ -0,0 +1,117 @@
+"""Dependency-ordered execution of a task graph, critical path first.
+
+Nodes start as soon as all of their dependencies have finished, up to a
+concurrency limit. When more nodes are ready than may run, the one with the
+longest remaining path to the end of the graph goes first (ties: the order
+the graph lists them in), so work everything else waits on is never stuck
+behind work nothing waits on. An optional ``rank`` orders nodes ahead of
+that: a node with a lower rank goes first whatever its path length.
+
+The orchestrator runs each (frame, team) pair as a node: frame 1's
+structural analysis starts as soon as frame 1's fire analysis is done,
+while frame 2's fire analysis is still running. Nodes are ranked by frame,
+so later frames' analyses, whose paths are longer, don't hold back the
+merges that finish frame 1.
+"""
+from __future__ import annotations
+
+import asyncio
+import heapq
+from collections.abc import Awaitable, Callable, Hashable, Iterable, Mapping
+from typing import Any, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+
+
+def _topological_order(graph: Mapping[K, Iterable[K]], dependents: Mapping[K, list[K]]) -> list[K]:
+    waiting = {node: len(set(deps)) for node, deps in graph.items()}
+    order = [node for node, count in waiting.items() if count == 0]
+    for node in order:  # grows while iterating
+        for child in dependents[node]:
+            waiting[child] -= 1
+            if waiting[child] == 0:
+                order.append(child)
+    if len(order) != len(graph):
+        raise ValueError("Dependency cycle among: " + ", ".join(repr(n) for n in graph if waiting[n]))
+    return order
+
+
+def _dependents(graph: Mapping[K, Iterable[K]]) -> dict[K, list[K]]:
+    dependents: dict[K, list[K]] = {node: [] for node in graph}
+    for node, deps in graph.items():
+        for dep in set(deps):
+            if dep not in graph:
+                raise ValueError(f"Unknown dependency {dep!r} of {node!r}")
+            dependents[dep].append(node)
+    return dependents
+
+
+def critical_path_lengths(
+    graph: Mapping[K, Iterable[K]],
+    cost: Callable[[K], float] | None = None,
+) -> dict[K, float]:
+    """Cost of the longest path from each node to the end of the graph (node included).
+
+    ``graph`` maps each node to the nodes it depends on; ``cost`` defaults to
+    1 per node.
+    """
+    dependents = _dependents(graph)
+    lengths: dict[K, float] = {}
+    for node in reversed(_topological_order(graph, dependents)):
+        own = cost(node) if cost is not None else 1.0
+        lengths[node] = own + max((lengths[child] for child in dependents[node]), default=0.0)
+    return lengths
+
+
+async def run_dag(
+    graph: Mapping[K, Iterable[K]],
+    run: Callable[[K, dict[K, Any]], Awaitable[Any]],
+    max_concurrency: int | None = None,
+    cost: Callable[[K], float] | None = None,
+    rank: Callable[[K], float] | None = None,
+) -> dict[K, Any]:
+    """Run every node of ``graph`` once its dependencies are done; return each node's result.
+
+    ``run(node, upstream)`` receives the results of the node's dependencies.
+    Ready nodes start lowest ``rank`` first (default: all equal), then
+    longest critical path first. The first failure cancels the nodes still
+    running and is re-raised.
+    """
+    graph = {node: tuple(dict.fromkeys(deps)) for node, deps in graph.items()}
+    dependents = _dependents(graph)
+    priority = critical_path_lengths(graph, cost)
+    position = {node: i for i, node in enumerate(graph)}
+    order = {node: (rank(node) if rank is not None else 0.0, -priority[node], position[node]) for node in graph}
+    waiting = {node: len(deps) for node, deps in graph.items()}
+    # (rank, then longest path first, then graph order); position is unique so nodes are never compared
+    ready = [(order[n], n) for n, count in waiting.items() if count == 0]
+    heapq.heapify(ready)
+    limit = max_concurrency or max(len(graph), 1)
+
+    results: dict[K, Any] = {}
+    running: dict[asyncio.Task, K] = {}
+    try:
+        while ready or running:
+            while ready and len(running) < limit:
+                _, node = heapq.heappop(ready)
+                upstream = {dep: results[dep] for dep in graph[node]}
+                running[asyncio.create_task(run(node, upstream))] = node
+
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            errors = [task.exception() for task in done if task.exception() is not None]
+            if errors:
+                for task in done:
+                    running.pop(task)
+                raise errors[0]
+            for task in done:
+                node = running.pop(task)
+                results[node] = task.result()
+                for child in dependents[node]:
+                    waiting[child] -= 1
+                    if waiting[child] == 0:
+                        heapq.heappush(ready, (order[child], child))
+    finally:
+        for task in running:
+            task.cancel()
+        await asyncio.gather(*running, return_exceptions=True)
+    return results
@@ -0,0 +1,108 @@
+"""Perceptual-hash deduplication of near-identical frames.
+
+Consecutive frames from the world model or a body-cam feed are often nearly
+the same picture. Each frame gets a 64-bit difference hash (dHash) of a 9x8
+grayscale thumbnail; a frame within a few bits (Hamming distance) of a
+recently analyzed frame reuses that frame's results instead of running all
+four teams again, so a long recording costs roughly one analysis per distinct
+scene.
+"""
+from __future__ import annotations
+
+import logging
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass
+from io import BytesIO
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+HASH_SIZE = 8  # HASH_SIZE x HASH_SIZE bits
+HAMMING_THRESHOLD = 6  # max differing bits for two frames to be the same scene
+RECENT_FRAMES = 32  # distinct frames kept for comparison
+
+
+def dhash(image: bytes | str | Path) -> int | None:
+    """64-bit difference hash of an image file or encoded bytes; None if undecodable."""
+    try:
+        img = Image.open(BytesIO(image) if isinstance(image, bytes) else Path(image))
+        img.draft("L", (HASH_SIZE * 8, HASH_SIZE * 8))  # JPEG: decode at 1/8 scale
+        small = img.convert("L").resize((HASH_SIZE + 1, HASH_SIZE), Image.Resampling.BILINEAR)
+    except (OSError, ValueError):
+        return None
+    pixels = np.asarray(small, dtype=np.int16)
+    bits = pixels[:, 1:] > pixels[:, :-1]
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+@dataclass(frozen=True)
+class FrameMatch:
+    """A recently analyzed frame that a new frame duplicates."""
+    frame: str
+    distance: int
+    payload: Any = None
+
+    def provenance(self, frame: str) -> dict[str, Any]:
+        return {"frame": frame, "reused_from": self.frame, "hamming_distance": self.distance}
+
+
+class FrameIndex:
+    """Recent distinct frames, searchable by Hamming distance of their dHash."""
+
+    def __init__(self, threshold: int = HAMMING_THRESHOLD, window: int = RECENT_FRAMES):
+        self.threshold = threshold
+        self._recent: deque[tuple[str, int, Any]] = deque(maxlen=window)
+        self._counters = {"frames": 0, "duplicates": 0}
+
+    def lookup(self, fingerprint: int | None) -> FrameMatch | None:
+        """Closest recent frame within the threshold, if any."""
+        self._counters["frames"] += 1
+        if fingerprint is None or self.threshold < 0:
+            return None
+        best: FrameMatch | None = None
+        for frame, other, payload in self._recent:
+            distance = (fingerprint ^ other).bit_count()
+            if distance <= self.threshold and (best is None or distance < best.distance):
+                best = FrameMatch(frame, distance, payload)
+        if best is not None:
+            self._counters["duplicates"] += 1
+        return best
+
+    def add(self, frame: str, fingerprint: int | None, payload: Any = None) -> None:
+        """Remember an analyzed frame (and optionally its results) for later lookups."""
+        if fingerprint is not None:
+            self._recent.append((frame, fingerprint, payload))
+
+    def stats(self) -> dict[str, int]:
+        return {**self._counters, "distinct_in_window": len(self._recent)}
+
+
+def dedupe_frames(
+    frames: list[str],
+    threshold: int = HAMMING_THRESHOLD,
+    fingerprint_of: Callable[[str], int | None] = dhash,
+) -> tuple[list[str], list[dict[str, Any]]]:
+    """Split frames into the distinct ones to analyze and provenance for the rest.
+
+    ``fingerprint_of`` may return a hash computed earlier (e.g. when the
+    frame was prepared). Blocking; run off the event loop.
+    """
+    index = FrameIndex(threshold)
+    distinct: list[str] = []
+    reused: list[dict[str, Any]] = []
+    for frame in frames:
+        fingerprint = fingerprint_of(frame)
+        match = index.lookup(fingerprint)
+        if match is not None:
+            reused.append(match.provenance(frame))
+        else:
+            distinct.append(frame)
+            index.add(frame, fingerprint)
+    if reused:
+        logger.info(f"Frame dedup: {len(distinct)} distinct of {len(frames)} frames")
+    return distinct, reused
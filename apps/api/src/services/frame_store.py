@@ -0,0 +1,140 @@
+"""Decode-once frame preprocessing shared by every team and agent instance.
+
+The orchestrator prepares each frame once per simulation — read from disk,
+downscaled and re-encoded as JPEG when oversized, then base64-encoded — and
+every inference backend reads the prepared payload from this store instead of
+repeating that work per instance and per team.
+
+Entries are refcounted by simulation: a frame used by two concurrent
+simulations is prepared once and freed when the last of them releases it.
+"""
+from __future__ import annotations
+
+import asyncio
+import base64
+import hashlib
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+
+from .frame_dedup import dhash
+
+logger = logging.getLogger(__name__)
+
+# Max image dimension before we downscale (keeps payloads reasonable for Ollama)
+MAX_IMAGE_DIMENSION = 1024
+MAX_IMAGE_BYTES = 500_000  # 500KB
+
+_MEDIA_TYPES = {
+    ".png": "image/png",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".gif": "image/gif",
+    ".webp": "image/webp",
+}
+
+
+@dataclass(frozen=True)
+class PreparedFrame:
+    """A frame ready to send to any vision backend."""
+    path: str
+    data: bytes  # image bytes as sent (possibly downscaled JPEG)
+    b64: str
+    media_type: str
+    digest: str  # SHA-256 of ``data``
+    dhash: int | None = None  # perceptual hash for near-duplicate detection
+
+
+def downscale_image_bytes(raw: bytes) -> bytes:
+    """Downscale image if too large, returns JPEG bytes."""
+    if len(raw) <= MAX_IMAGE_BYTES:
+        return raw
+    try:
+        from io import BytesIO
+        from PIL import Image
+
+        img = Image.open(BytesIO(raw))
+        # Resize maintaining aspect ratio
+        img.thumbnail((MAX_IMAGE_DIMENSION, MAX_IMAGE_DIMENSION), Image.LANCZOS)
+        buf = BytesIO()
+        img.convert("RGB").save(buf, format="JPEG", quality=85)
+        resized = buf.getvalue()
+        logger.info(f"Resized image: {len(raw)} -> {len(resized)} bytes")
+        return resized
+    except ImportError:
+        logger.warning("Pillow not installed, sending full-size image")
+        return raw
+
+
+def prepare_frame(path: str) -> PreparedFrame:
+    """Load, downscale and encode one frame (blocking; run off the event loop)."""
+    raw = Path(path).read_bytes()
+    data = downscale_image_bytes(raw)
+    if data is raw:
+        media_type = _MEDIA_TYPES.get(Path(path).suffix.lower(), "image/jpeg")
+    else:
+        media_type = "image/jpeg"
+    return PreparedFrame(
+        path=path,
+        data=data,
+        b64=base64.standard_b64encode(data).decode(),
+        media_type=media_type,
+        digest=hashlib.sha256(data).hexdigest(),
+        dhash=dhash(data),
+    )
+
+
+class FrameStore:
+    """Refcounted in-process store of prepared frames, keyed by frame path."""
+
+    def __init__(self):
+        self._frames: dict[str, PreparedFrame] = {}
+        self._refs: dict[str, int] = {}
+        self._held: dict[str, list[str]] = {}
+
+    async def acquire(self, simulation_id: str, frames: list[str]) -> dict[str, PreparedFrame]:
+        """Prepare ``frames`` for a simulation and hold a reference to each.
+
+        Frames that can't be read are skipped; backends fall back to their own
+        loading for anything not in the store.
+        """
+        paths = [p for p in dict.fromkeys(frames) if p not in self._frames]
+        prepared = await asyncio.gather(
+            *(asyncio.to_thread(prepare_frame, p) for p in paths),
+            return_exceptions=True,
+        )
+        for path, frame in zip(paths, prepared):
+            if isinstance(frame, BaseException):
+                logger.warning(f"Frame preprocessing failed for {path}: {frame}")
+            elif path not in self._frames:
+                self._frames[path] = frame
+
+        held = self._held.setdefault(simulation_id, [])
+        for path in dict.fromkeys(frames):
+            if path in self._frames and path not in held:
+                held.append(path)
+                self._refs[path] = self._refs.get(path, 0) + 1
+        return {p: self._frames[p] for p in held}
+
+    def get(self, path: str) -> PreparedFrame | None:
+        """Prepared frame for ``path``, or None if no simulation holds it."""
+        return self._frames.get(path)
+
+    def release(self, simulation_id: str) -> None:
+        """Drop a simulation's references, freeing frames nobody else holds."""
+        for path in self._held.pop(simulation_id, []):
+            self._refs[path] -= 1
+            if self._refs[path] <= 0:
+                del self._refs[path]
+                self._frames.pop(path, None)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "frames": len(self._frames),
+            "bytes": sum(len(f.data) + len(f.b64) for f in self._frames.values()),
+            "simulations": len(self._held),
+        }
+
+
+# Singleton store
+frame_store = FrameStore()
@@ -0,0 +1,183 @@
+"""Latency-aware routing of inference calls across backends, with hedging.
+
+Keeps a rolling window of latencies and outcomes per backend. Each call goes
+to the fastest healthy backend; if it hasn't answered by that backend's p95
+latency, a hedged duplicate is sent to the next backend and whichever answers
+first wins — the other is cancelled, and its time so far is recorded as a
+latency sample (it was at least that slow), so a backend that keeps losing
+hedges drops in the ranking. A failed call moves straight on to the next
+backend without waiting.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import Any, TypeVar
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+ROLLING_WINDOW = 50  # most recent calls kept per backend
+MIN_SAMPLES = 5  # before p95 is trusted as a hedge trigger
+DEFAULT_HEDGE_DELAY = 8.0  # seconds, until a backend has enough samples
+UNHEALTHY_ERROR_RATE = 0.5
+UNHEALTHY_COOLDOWN = 30.0  # seconds before an unhealthy backend is probed again
+
+
+@dataclass
+class BackendStats:
+    """Rolling latency/error window for one backend."""
+    latencies: deque = field(default_factory=lambda: deque(maxlen=ROLLING_WINDOW))
+    outcomes: deque = field(default_factory=lambda: deque(maxlen=ROLLING_WINDOW))
+    last_failure: float = 0.0
+    calls: int = 0
+    hedges: int = 0
+    wins: int = 0
+
+    def record(self, latency: float, ok: bool) -> None:
+        self.calls += 1
+        self.outcomes.append(ok)
+        if ok:
+            self.latencies.append(latency)
+        else:
+            self.last_failure = time.monotonic()
+
+    def record_censored(self, latency: float) -> None:
+        """A call cancelled after ``latency`` seconds: it would have taken at least that long."""
+        self.calls += 1
+        self.latencies.append(latency)
+
+    def percentile(self, q: float) -> float | None:
+        if not self.latencies:
+            return None
+        return float(np.percentile(np.fromiter(self.latencies, dtype=float), q))
+
+    @property
+    def error_rate(self) -> float:
+        return 1.0 - sum(self.outcomes) / len(self.outcomes) if self.outcomes else 0.0
+
+    @property
+    def healthy(self) -> bool:
+        if self.error_rate < UNHEALTHY_ERROR_RATE:
+            return True
+        return time.monotonic() - self.last_failure > UNHEALTHY_COOLDOWN
+
+    def to_dict(self) -> dict[str, Any]:
+        p50, p95 = self.percentile(50), self.percentile(95)
+        return {
+            "calls": self.calls,
+            "wins": self.wins,
+            "hedges": self.hedges,
+            "error_rate": round(self.error_rate, 3),
+            "p50_seconds": None if p50 is None else round(p50, 3),
+            "p95_seconds": None if p95 is None else round(p95, 3),
+            "healthy": self.healthy,
+        }
+
+
+class InferenceRouter:
+    """Route each call to the fastest healthy backend, hedging past its p95."""
+
+    def __init__(self):
+        self._stats: dict[str, BackendStats] = {}
+
+    def stats_for(self, backend: str) -> BackendStats:
+        if backend not in self._stats:
+            self._stats[backend] = BackendStats()
+        return self._stats[backend]
+
+    def rank(self, backends: list[str]) -> list[str]:
+        """Healthy backends by median latency (unmeasured first, so they get sampled), then unhealthy."""
+        def key(item: tuple[int, str]) -> tuple[int, float, int]:
+            position, backend = item
+            stats = self.stats_for(backend)
+            p50 = stats.percentile(50)
+            return (0 if stats.healthy else 1, 0.0 if p50 is None else p50, position)
+
+        return [backend for _, backend in sorted(enumerate(backends), key=key)]
+
+    def hedge_delay(self, backend: str) -> float:
+        stats = self.stats_for(backend)
+        if len(stats.latencies) < MIN_SAMPLES:
+            return DEFAULT_HEDGE_DELAY
+        return stats.percentile(95)
+
+    async def call(
+        self,
+        calls: dict[str, Callable[[], Awaitable[T]]],
+        hedge: bool = True,
+    ) -> tuple[str, T]:
+        """Run one logical request against the best backend(s).
+
+        Args:
+            calls: Backend name -> zero-arg coroutine factory making the call
+            hedge: Send a duplicate to the next backend once the current one
+                exceeds its p95 latency (otherwise only fail over on error)
+
+        Returns:
+            (winning backend, its result)
+
+        Raises:
+            The last backend's exception if every backend failed
+        """
+        queue = self.rank(list(calls))
+        if not queue:
+            raise ValueError("No inference backends configured")
+        pending: dict[asyncio.Task, tuple[str, float]] = {}
+        last_error: BaseException | None = None
+
+        def launch(is_hedge: bool = False) -> None:
+            backend = queue.pop(0)
+            if is_hedge:
+                self.stats_for(backend).hedges += 1
+                logger.info(f"Hedging inference to {backend}")
+            pending[asyncio.ensure_future(calls[backend]())] = (backend, time.monotonic())
+
+        launch()
+        try:
+            while pending:
+                timeout = None
+                if hedge and queue and len(pending) == 1:
+                    backend, started = next(iter(pending.values()))
+                    timeout = max(0.0, self.hedge_delay(backend) - (time.monotonic() - started))
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    launch(is_hedge=True)
+                    continue
+
+                for task in done:
+                    backend, started = pending.pop(task)
+                    error = task.exception()
+                    self.stats_for(backend).record(time.monotonic() - started, error is None)
+                    if error is None:
+                        self.stats_for(backend).wins += 1
+                        return backend, task.result()
+                    logger.warning(f"Inference backend {backend} failed: {error}")
+                    last_error = error
+
+                if not pending and queue:
+                    launch()
+        finally:
+            now = time.monotonic()
+            for task, (backend, started) in pending.items():
+                task.cancel()
+                self.stats_for(backend).record_censored(now - started)
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+        assert last_error is not None
+        raise last_error
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        return {backend: stats.to_dict() for backend, stats in self._stats.items()}
+
+
+# Shared by every agent instance in the process
+inference_router = InferenceRouter()
@@ -0,0 +1,225 @@
+"""Process-wide scheduler for vision inference calls.
+
+Every backend call (Ollama/Modal via vision.py, the cloud endpoint, Azure
+OpenAI) takes a slot from here before it is sent. Each backend has a fixed
+number of slots; when they are all busy, callers queue and freed slots go to:
+
+1. the highest priority class waiting — live WebSocket/HTTP requests, then
+   critical-path teams of a simulation, then downstream teams, then bulk jobs;
+2. within a class, the next simulation in round-robin order, so a
+   simulation with hundreds of queued frames can't starve one with a few.
+
+Priority and simulation are read from context variables set once where the
+work enters the API (``inference_context``); asyncio tasks inherit them, so
+the backends don't need extra parameters.
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import OrderedDict, deque
+from collections.abc import AsyncIterator, Iterator
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Any
+
+DEFAULT_SLOTS = 4
+WAIT_WINDOW = 200  # recent queue waits kept per priority class
+
+
+class Priority(IntEnum):
+    """Scheduling classes, most urgent first."""
+    INTERACTIVE = 0  # live WebSocket streams and direct analysis requests
+    CRITICAL = 1  # simulation teams everything downstream waits on
+    NORMAL = 2  # other simulation teams
+    BATCH = 3  # bulk jobs (analyze_batch)
+
+
+_priority: ContextVar[Priority] = ContextVar("inference_priority", default=Priority.NORMAL)
+_tenant: ContextVar[str] = ContextVar("inference_tenant", default="default")
+
+
+@contextmanager
+def inference_context(priority: Priority | None = None, tenant: str | None = None) -> Iterator[None]:
+    """Set the priority class and simulation for inference calls made inside the block."""
+    tokens = []
+    if priority is not None:
+        tokens.append((_priority, _priority.set(priority)))
+    if tenant is not None:
+        tokens.append((_tenant, _tenant.set(tenant)))
+    try:
+        yield
+    finally:
+        for var, token in reversed(tokens):
+            var.reset(token)
+
+
+@dataclass
+class _Waiter:
+    future: asyncio.Future
+    tenant: str
+    priority: Priority
+    enqueued: float
+
+
+@dataclass
+class _BackendQueue:
+    """Slots of one backend and its callers waiting for one."""
+    capacity: int
+    in_use: int = 0
+    # Per priority class: simulation -> its waiters, in round-robin order
+    waiting: list[OrderedDict[str, deque[_Waiter]]] = field(
+        default_factory=lambda: [OrderedDict() for _ in Priority]
+    )
+    granted: list[int] = field(default_factory=lambda: [0] * len(Priority))
+    waits: list[deque[float]] = field(
+        default_factory=lambda: [deque(maxlen=WAIT_WINDOW) for _ in Priority]
+    )
+
+    def queued(self) -> int:
+        return sum(len(q) for by_tenant in self.waiting for q in by_tenant.values())
+
+    def enqueue(self, waiter: _Waiter) -> None:
+        self.waiting[waiter.priority].setdefault(waiter.tenant, deque()).append(waiter)
+
+    def remove(self, waiter: _Waiter) -> None:
+        by_tenant = self.waiting[waiter.priority]
+        queue = by_tenant.get(waiter.tenant)
+        if queue is not None and waiter in queue:
+            queue.remove(waiter)
+            if not queue:
+                del by_tenant[waiter.tenant]
+
+    def next_waiter(self) -> _Waiter | None:
+        """Pop the head waiter of the next simulation in the most urgent non-empty class."""
+        for by_tenant in self.waiting:
+            if by_tenant:
+                tenant, queue = next(iter(by_tenant.items()))
+                waiter = queue.popleft()
+                if queue:
+                    by_tenant.move_to_end(tenant)
+                else:
+                    del by_tenant[tenant]
+                return waiter
+        return None
+
+    def record_grant(self, priority: Priority, waited: float) -> None:
+        self.in_use += 1
+        self.granted[priority] += 1
+        self.waits[priority].append(waited)
+
+
+def _percentile(values: deque[float], q: float) -> float | None:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 4)
+
+
+class InferenceScheduler:
+    """Per-backend concurrency slots handed out by priority, then fairly across simulations."""
+
+    def __init__(self):
+        self._backends: dict[str, _BackendQueue] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def _ensure_loop(self) -> None:
+        # Waiter futures belong to one event loop
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._backends.clear()
+            self._loop = loop
+
+    def _queue(self, backend: str, capacity: int | None) -> _BackendQueue:
+        self._ensure_loop()
+        state = self._backends.get(backend)
+        if state is None:
+            state = self._backends[backend] = _BackendQueue(capacity or DEFAULT_SLOTS)
+        elif capacity and capacity != state.capacity:
+            state.capacity = capacity
+            self._grant(state)
+        return state
+
+    def _grant(self, state: _BackendQueue) -> None:
+        now = time.monotonic()
+        while state.in_use < state.capacity:
+            waiter = state.next_waiter()
+            if waiter is None:
+                return
+            waiter.future.set_result(None)
+            state.record_grant(waiter.priority, now - waiter.enqueued)
+
+    async def acquire(
+        self,
+        backend: str,
+        capacity: int | None = None,
+        priority: Priority | None = None,
+        tenant: str | None = None,
+    ) -> _BackendQueue:
+        """Wait for a slot on ``backend``; ``capacity`` (if given) sets its slot count."""
+        state = self._queue(backend, capacity)
+        priority = _priority.get() if priority is None else priority
+        tenant = _tenant.get() if tenant is None else tenant
+
+        if state.in_use < state.capacity and not state.queued():
+            state.record_grant(priority, 0.0)
+            return state
+
+        waiter = _Waiter(asyncio.get_running_loop().create_future(), tenant, priority, time.monotonic())
+        state.enqueue(waiter)
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.cancelled():
+                state.remove(waiter)
+            else:
+                # Granted just as the caller was cancelled: pass the slot on
+                self.release(state)
+            raise
+        return state
+
+    def release(self, state: _BackendQueue) -> None:
+        state.in_use -= 1
+        self._grant(state)
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        backend: str,
+        capacity: int | None = None,
+        priority: Priority | None = None,
+        tenant: str | None = None,
+    ) -> AsyncIterator[None]:
+        """Hold one of ``backend``'s slots for the duration of the block."""
+        state = await self.acquire(backend, capacity, priority, tenant)
+        try:
+            yield
+        finally:
+            self.release(state)
+
+    def stats(self) -> dict[str, Any]:
+        """Slots in use, queue depth per class and simulation, and queue waits per backend."""
+        out = {}
+        for backend, state in self._backends.items():
+            out[backend] = {
+                "capacity": state.capacity,
+                "in_use": state.in_use,
+                "queued": state.queued(),
+                "queued_by_priority": {
+                    p.name.lower(): sum(len(q) for q in state.waiting[p].values()) for p in Priority
+                },
+                "queued_by_simulation": {
+                    tenant: sum(len(by_tenant.get(tenant, ())) for by_tenant in state.waiting)
+                    for tenant in {t for by_tenant in state.waiting for t in by_tenant}
+                },
+                "granted_by_priority": {p.name.lower(): state.granted[p] for p in Priority},
+                "wait_p50_seconds": {p.name.lower(): _percentile(state.waits[p], 0.5) for p in Priority},
+                "wait_p95_seconds": {p.name.lower(): _percentile(state.waits[p], 0.95) for p in Priority},
+            }
+        return out
+
+
+# Shared by every inference call site in the process
+inference_scheduler = InferenceScheduler()
@@ -3,16 +3,25 @@
 Computes three real-time metrics in parallel with agent analysis:
 1. Optimized Path — safest firefighter route via Dijkstra
 2. Survivability Window — minutes until the optimal path becomes impassable
-3. Cumulative Heat Exposure — integrated fire intensity along the path
+3. Cumulative Heat Exposure — integrated fire intensity along the path, plus the
+   time-integrated dose a crew picks up while walking it
+
+All three read from a shared HazardState, so one fire/structural payload costs
+one hazard graph build and one spread simulation.
 """
 from __future__ import annotations
 
+import heapq
 import importlib.util as _ilu
 import sys
+import threading
 from dataclasses import asdict, dataclass, field
+from functools import cached_property
 from pathlib import Path
 from typing import Any
 
+import numpy as np
+
 # ---------------------------------------------------------------------------
 # Module loaders for packages outside the API's src/ tree
 # ---------------------------------------------------------------------------
@@ -28,20 +37,40 @@ _wm_src = _repo_root / "packages" / "world-models" / "src"
 _routing_src = _repo_root / "packages" / "routing" / "src"
 
 
+# Compute-pool jobs run on threads with ORCA_COMPUTE_WORKERS=0; a module is
+# registered before it has executed, so loads are serialized
+_load_lock = threading.RLock()
+
+
 def _load_module(name: str, src_dir: Path):
     """Load a Python module from an arbitrary directory by name."""
     cache_key = f"_metrics_{name}"
-    if cache_key in sys.modules:
-        return sys.modules[cache_key]
-    spec = _ilu.spec_from_file_location(
-        cache_key,
-        src_dir / f"{name}.py",
-        submodule_search_locations=[str(src_dir)],
-    )
-    mod = _ilu.module_from_spec(spec)  # type: ignore[arg-type]
-    sys.modules[cache_key] = mod
-    spec.loader.exec_module(mod)  # type: ignore[union-attr]
-    return mod
+    with _load_lock:
+        if cache_key in sys.modules:
+            return sys.modules[cache_key]
+        spec = _ilu.spec_from_file_location(
+            cache_key,
+            src_dir / f"{name}.py",
+            submodule_search_locations=[str(src_dir)],
+        )
+        mod = _ilu.module_from_spec(spec)  # type: ignore[arg-type]
+        sys.modules[cache_key] = mod
+        try:
+            spec.loader.exec_module(mod)  # type: ignore[union-attr]
+        except BaseException:
+            del sys.modules[cache_key]
+            raise
+        return mod
+
+
+def load_world_model(name: str):
+    """A module from packages/world-models/src, loaded once per process."""
+    return _load_module(name, _wm_src)
+
+
+def load_routing(name: str):
+    """A module from packages/routing/src, loaded once per process."""
+    return _load_module(name, _routing_src)
 
 
 # ---------------------------------------------------------------------------
@@ -70,6 +99,36 @@ class CumulativeHeatExposure:
     total_score: float
     classification: str  # minimal | moderate | severe | lethal
     per_room: dict[str, float] = field(default_factory=dict)
+    dose: float = 0.0  # time-integrated intensity along the walk (intensity x minutes)
+
+
+@dataclass
+class SurvivabilityAtlas:
+    """Building-wide survivability, one array entry per room (room order)."""
+    rooms: list[str]
+    time_to_danger_min: np.ndarray  # -1 = beyond sim horizon
+    time_to_flashover_min: np.ndarray  # -1 = beyond sim horizon
+    egress_seconds: np.ndarray  # walk time to the nearest exit, inf = no route
+    nearest_exit: list[str | None]
+    latest_safe_departure_min: np.ndarray  # inf = beyond sim horizon, <= 0 = already cut off
+
+    def to_dict(self) -> dict[str, Any]:
+        def minutes(arr: np.ndarray) -> list[int | None]:
+            return [int(v) if v >= 0 else None for v in arr.tolist()]
+
+        departure = self.latest_safe_departure_min
+        return {
+            "rooms": self.rooms,
+            "horizon_min": SIM_HORIZON_MIN,
+            "time_to_danger_min": minutes(self.time_to_danger_min),
+            "time_to_flashover_min": minutes(self.time_to_flashover_min),
+            "egress_seconds": [None if np.isinf(v) else round(v, 1) for v in self.egress_seconds.tolist()],
+            "nearest_exit": self.nearest_exit,
+            "latest_safe_departure_min": [
+                None if np.isinf(v) or v < 0 else round(v, 2) for v in departure.tolist()
+            ],
+            "viable": (departure > 0).tolist(),
+        }
 
 
 @dataclass
@@ -92,6 +151,104 @@ class MetricsSnapshot:
 
 DANGER_THRESHOLD = 0.6
 SIM_HORIZON_MIN = 30  # max minutes to simulate forward
+ROOM_TRAVERSAL_SEC = 15  # same walking estimate as evacuation._estimate_traversal_time
+
+
+# ---------------------------------------------------------------------------
+# Shared hazard state
+# ---------------------------------------------------------------------------
+
+@dataclass
+class HazardState:
+    """Everything the metrics derive from one fire/structural payload.
+
+    The hazard graph and spread simulation are built lazily and at most once,
+    so callers that only need one of them don't pay for the other.
+    """
+    fire_data: dict[str, Any]
+    structural_data: dict[str, Any] | None
+    rooms: list[dict[str, Any]]
+
+    @cached_property
+    def room_index(self) -> dict[str, int]:
+        return {r["name"]: i for i, r in enumerate(self.rooms)}
+
+    @cached_property
+    def graph(self) -> Any:
+        """Building graph with fire and structural data applied (networkx DiGraph)."""
+        _graph_mod = _load_module("graph", _routing_src)
+        graph = _graph_mod.build_building_graph(self.rooms)
+        if self.fire_data:
+            graph = _graph_mod.apply_fire_data(graph, self.fire_data)
+        if self.structural_data:
+            graph = _graph_mod.apply_structural_data(graph, self.structural_data)
+        return graph
+
+    @cached_property
+    def room_risks(self) -> dict[str, np.ndarray]:
+        """Per-room fire/structural/smoke risk from the hazard graph, in room order."""
+        nodes = self.graph.nodes
+        return {
+            attr: np.array([nodes[r["name"]].get(attr, 0.0) for r in self.rooms], dtype=np.float64)
+            for attr in ("fire_intensity", "structural_risk", "smoke_risk")
+        }
+
+    @cached_property
+    def exposure(self) -> np.ndarray:
+        """Per-room heat exposure weight: fire intensity plus smoke contribution."""
+        risks = self.room_risks
+        return risks["fire_intensity"] + risks["smoke_risk"] * 0.3
+
+    @cached_property
+    def adjacency(self) -> list[list[int]]:
+        """Room indices reachable in one step from each room."""
+        index = self.room_index
+        return [[index[a] for a in r.get("adjacent", []) if a in index] for r in self.rooms]
+
+    @cached_property
+    def exits(self) -> np.ndarray:
+        return np.array([i for i, r in enumerate(self.rooms) if r.get("is_exterior")], dtype=np.intp)
+
+    @cached_property
+    def sim_rooms(self) -> list:
+        _fire_sim = _load_module("fire_sim", _wm_src)
+        return _fire_sim.rooms_from_fire_data(self.fire_data or {}, self.rooms)
+
+    @cached_property
+    def spread(self) -> Any:
+        """Spread simulation arrays over SIM_HORIZON_MIN (fire_sim.SpreadArrays)."""
+        _fire_sim = _load_module("fire_sim", _wm_src)
+        return _fire_sim.simulate_spread(self.sim_rooms, time_steps_min=SIM_HORIZON_MIN)
+
+    @cached_property
+    def cumulative_intensity(self) -> np.ndarray:
+        """Trapezoidal integral of spread intensity from minute 0 to each minute."""
+        intensities = self.spread.intensities
+        steps = (intensities[:, 1:] + intensities[:, :-1]) * 0.5
+        return np.concatenate((np.zeros((len(intensities), 1)), np.cumsum(steps, axis=1)), axis=1)
+
+    def indices(self, path: list[str]) -> np.ndarray:
+        """Room indices for the known rooms on ``path``, in path order."""
+        index = self.room_index
+        return np.array([index[r] for r in path if r in index], dtype=np.intp)
+
+    def spread_timeline(self, time_steps_min: int = 10) -> list[dict[str, Any]]:
+        """Spread timeline (build_spread_timeline format) from the shared simulation."""
+        _fire_sim = _load_module("fire_sim", _wm_src)
+        predictions = _fire_sim.spread_predictions(self.sim_rooms, self.spread.horizon(time_steps_min))
+        return _fire_sim.predictions_to_timeline(predictions)
+
+
+def build_hazard_state(
+    fire_data: dict[str, Any] | None,
+    structural_data: dict[str, Any] | None = None,
+    rooms: list[dict[str, Any]] | None = None,
+) -> HazardState:
+    """Create the shared hazard state for one fire/structural payload."""
+    if rooms is None:
+        _building_gen = _load_module("building_gen", _wm_src)
+        rooms = _building_gen.siebel_center_rooms()
+    return HazardState(fire_data=fire_data or {}, structural_data=structural_data, rooms=rooms)
 
 
 # ---------------------------------------------------------------------------
@@ -104,11 +261,13 @@ def compute_optimized_path(
     fire_data: dict[str, Any] | None = None,
     structural_data: dict[str, Any] | None = None,
     rooms: list[dict[str, Any]] | None = None,
+    state: HazardState | None = None,
 ) -> OptimizedPath:
     """Compute the safest route between two rooms using Dijkstra with fire-weighted edges."""
+    if state is None:
+        state = build_hazard_state(fire_data, structural_data, rooms)
     _optimizer = _load_module("optimizer", _routing_src)
-    solver = _optimizer.RouteSolver()
-    result = solver.solve_fire_aware(origin, destination, fire_data, structural_data, rooms)
+    result = _optimizer.RouteSolver().solve_on_graph(state.graph, origin, destination)
 
     path = result.get("path", [])
     return OptimizedPath(
@@ -124,10 +283,11 @@ def compute_survivability_window(
     path: list[str],
     fire_data: dict[str, Any],
     rooms_data: list[dict[str, Any]] | None = None,
+    state: HazardState | None = None,
 ) -> SurvivabilityWindow:
     """Determine how many minutes until the worst room on the path exceeds the danger threshold.
 
-    Walks the fire spread simulation forward minute-by-minute and checks every room on the path.
+    Reads the spread simulation from the hazard state and checks every room on the path.
     """
     if not path:
         return SurvivabilityWindow(
@@ -137,65 +297,29 @@ def compute_survivability_window(
             worst_room_intensity=0.0,
         )
 
-    _fire_sim = _load_module("fire_sim", _wm_src)
-    _building_gen = _load_module("building_gen", _wm_src)
-
-    if rooms_data is None:
-        rooms_data = _building_gen.siebel_center_rooms()
-
-    # Build Room objects matching fire_sim expectations
-    fire_locations = fire_data.get("fire_locations", [])
-    fuel_sources = fire_data.get("fuel_sources", [])
-    severity = fire_data.get("severity", 0)
-
-    rooms: list = []
-    for rd in rooms_data:
-        # Match fuel level from fire_data fuel_sources
-        room_fuel = "low"
-        for fs in fuel_sources:
-            loc = fs.get("location_label", "").lower()
-            if rd["name"].lower() in loc or loc in rd["name"].lower():
-                room_fuel = fs.get("flammability", "medium")
-                break
-
-        # Match fire intensity from fire_data fire_locations
-        room_intensity = 0.0
-        for fl in fire_locations:
-            label = fl.get("label", "").lower()
-            if rd["name"].lower() in label or label in rd["name"].lower():
-                room_intensity = max(room_intensity, fl.get("intensity", 0.0))
-
-        if room_intensity == 0.0 and severity >= 5:
-            room_intensity = severity / 20.0
-
-        rooms.append(_fire_sim.Room(
-            name=rd["name"],
-            fire_intensity=room_intensity,
-            has_door_to=rd.get("adjacent", []),
-            has_stairwell=rd.get("has_stairwell", False),
-            fuel_level=room_fuel,
-            is_exterior=rd.get("is_exterior", False),
-        ))
-
-    path_set = set(path)
-    predictions = _fire_sim.predict_fire_spread(rooms, time_steps_min=SIM_HORIZON_MIN)
-
-    # Find the worst room on the path by time-to-danger
+    if state is None:
+        state = build_hazard_state(fire_data, None, rooms_data)
+
+    # Rooms on the path, in building order (ties go to the first room listed)
+    idx = np.unique(state.indices(path))
+    time_to_danger = state.spread.time_to_danger[idx]
+    current = state.spread.intensities[idx, 0]
+
     worst_room: str | None = None
     worst_intensity = 0.0
     earliest_danger: int | None = None
 
-    for pred in predictions:
-        if pred.room_name not in path_set:
-            continue
-        if pred.time_to_danger_min is not None:
-            if earliest_danger is None or pred.time_to_danger_min < earliest_danger:
-                earliest_danger = pred.time_to_danger_min
-                worst_room = pred.room_name
-                worst_intensity = pred.current_intensity
-        if pred.current_intensity > worst_intensity and worst_room is None:
-            worst_intensity = pred.current_intensity
-            worst_room = pred.room_name
+    in_danger = np.flatnonzero(time_to_danger >= 0)
+    if in_danger.size:
+        k = in_danger[np.argmin(time_to_danger[in_danger])]
+        earliest_danger = int(time_to_danger[k])
+        worst_room = state.rooms[idx[k]]["name"]
+        worst_intensity = float(current[k])
+    else:
+        burning = np.flatnonzero(current > 0.0)
+        if burning.size:
+            worst_room = state.rooms[idx[burning[0]]]["name"]
+            worst_intensity = float(current[burning[0]])
 
     viable = earliest_danger is None or earliest_danger > 0
     return SurvivabilityWindow(
@@ -211,6 +335,7 @@ def compute_heat_exposure(
     fire_data: dict[str, Any],
     structural_data: dict[str, Any] | None = None,
     rooms_data: list[dict[str, Any]] | None = None,
+    state: HazardState | None = None,
 ) -> CumulativeHeatExposure:
     """Sum fire intensity + smoke contribution for every room on the path."""
     if not path:
@@ -220,46 +345,208 @@ def compute_heat_exposure(
             per_room={},
         )
 
-    _graph_mod = _load_module("graph", _routing_src)
-    _building_gen = _load_module("building_gen", _wm_src)
-
-    if rooms_data is None:
-        rooms_data = _building_gen.siebel_center_rooms()
+    if state is None:
+        state = build_hazard_state(fire_data, structural_data, rooms_data)
 
-    graph = _graph_mod.build_building_graph(rooms_data)
-    if fire_data:
-        graph = _graph_mod.apply_fire_data(graph, fire_data)
-    if structural_data:
-        graph = _graph_mod.apply_structural_data(graph, structural_data)
+    exposure = state.exposure
 
     total = 0.0
     per_room: dict[str, float] = {}
 
     for room_name in path:
-        if room_name not in graph.nodes:
+        i = state.room_index.get(room_name)
+        if i is None:
             continue
-        node = graph.nodes[room_name]
-        fire_intensity = node.get("fire_intensity", 0.0)
-        smoke = node.get("smoke_risk", 0.0)
-        exposure = fire_intensity + smoke * 0.3
-        per_room[room_name] = round(exposure, 3)
-        total += exposure
+        per_room[room_name] = round(float(exposure[i]), 3)
+        total += float(exposure[i])
 
     total = round(total, 3)
 
+    return CumulativeHeatExposure(
+        total_score=total,
+        classification=_classify_exposure(total),
+        per_room=per_room,
+        dose=float(compute_heat_dose([path], state)[0]),
+    )
+
+
+def _classify_exposure(total: float) -> str:
     if total < 0.5:
-        classification = "minimal"
+        return "minimal"
     elif total < 2.0:
-        classification = "moderate"
+        return "moderate"
     elif total < 5.0:
-        classification = "severe"
-    else:
-        classification = "lethal"
+        return "severe"
+    return "lethal"
 
-    return CumulativeHeatExposure(
-        total_score=total,
-        classification=classification,
-        per_room=per_room,
+
+def _flatten_paths(paths: list[list[str]], state: HazardState) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Concatenate the known rooms of every path into one index array.
+
+    Returns (flat room indices, per-path lengths, per-path start offsets).
+    """
+    index = state.room_index
+    flat = np.fromiter(
+        (index[r] for path in paths for r in path if r in index), dtype=np.intp,
+    )
+    lengths = np.fromiter(
+        (sum(1 for r in path if r in index) for path in paths), dtype=np.intp, count=len(paths),
+    )
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1])).astype(np.intp)
+    return flat, lengths, starts
+
+
+def _integrated_intensity(state: HazardState, rooms: np.ndarray, t: np.ndarray) -> np.ndarray:
+    """Integral of spread intensity from minute 0 to ``t`` for each (room, t) pair.
+
+    Intensity is linear between simulated minutes and held at its last value
+    beyond the simulation horizon.
+    """
+    intensities = state.spread.intensities
+    horizon = intensities.shape[1] - 1
+    if horizon == 0:
+        return intensities[rooms, 0] * t
+    tc = np.minimum(t, horizon)
+    m = np.minimum(np.floor(tc).astype(np.intp), horizon - 1)
+    f = tc - m
+    i0 = intensities[rooms, m]
+    i1 = intensities[rooms, m + 1]
+    within = state.cumulative_intensity[rooms, m] + i0 * f + (i1 - i0) * f * f * 0.5
+    beyond = intensities[rooms, horizon] * np.maximum(t - horizon, 0.0)
+    return within + beyond
+
+
+def compute_heat_dose(
+    paths: list[list[str]],
+    state: HazardState,
+    departure_min: float = 0.0,
+) -> np.ndarray:
+    """Time-integrated heat dose for every path, in one vectorized pass.
+
+    A crew leaving at ``departure_min`` spends ROOM_TRAVERSAL_SEC in each room
+    of the path in order. The dose for a room is the spread intensity
+    integrated over the crew's time in it (so rooms reached later count at
+    their grown intensity) plus the static smoke contribution.
+    Units: intensity x minutes.
+    """
+    flat, lengths, starts = _flatten_paths(paths, state)
+    dose = np.zeros(len(paths))
+    if not flat.size:
+        return dose
+
+    step = ROOM_TRAVERSAL_SEC / 60.0
+    position = np.arange(flat.size) - np.repeat(starts, lengths)
+    enter = departure_min + position * step
+    leave = enter + step
+    per_room = (
+        _integrated_intensity(state, flat, leave)
+        - _integrated_intensity(state, flat, enter)
+        + state.room_risks["smoke_risk"][flat] * 0.3 * step
+    )
+    nonempty = lengths > 0
+    dose[nonempty] = np.add.reduceat(per_room, starts[nonempty])
+    return np.round(dose, 4)
+
+
+def score_paths(paths: list[list[str]], state: HazardState) -> dict[str, np.ndarray]:
+    """Heat exposure, dose and survivability for many candidate paths at once.
+
+    All paths are flattened into one room-index array and reduced per path
+    segment, so scoring costs one gather over the per-room exposure and
+    time-to-danger arrays regardless of how many paths are submitted.
+    Matches compute_heat_exposure / compute_survivability_window per path.
+
+    Returns arrays (one entry per path): heat_exposure, heat_dose,
+    minutes_remaining (-1 = beyond horizon) and viable.
+    """
+    flat, lengths, starts = _flatten_paths(paths, state)
+    nonempty = lengths > 0
+
+    heat = np.zeros(len(paths))
+    minutes = np.full(len(paths), -1, dtype=np.int64)
+    if flat.size:
+        ttd = state.spread.time_to_danger
+        never = np.iinfo(np.int64).max
+        danger = np.where(ttd >= 0, ttd, never)[flat]
+        heat[nonempty] = np.add.reduceat(state.exposure[flat], starts[nonempty])
+        earliest = np.minimum.reduceat(danger, starts[nonempty])
+        minutes[nonempty] = np.where(earliest == never, -1, earliest)
+
+    empty_path = np.array([len(p) == 0 for p in paths], dtype=bool)
+    minutes[empty_path] = 0
+    viable = ~empty_path & ((minutes < 0) | (minutes > 0))
+    return {
+        "heat_exposure": np.round(heat, 3),
+        "heat_dose": compute_heat_dose(paths, state),
+        "minutes_remaining": minutes,
+        "viable": viable,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Survivability atlas — every room from one spread run
+# ---------------------------------------------------------------------------
+
+def compute_survivability_atlas(state: HazardState) -> SurvivabilityAtlas:
+    """Time-to-danger, time-to-flashover and latest safe departure for every room.
+
+    Latest safe departure is the last minute an occupant can leave a room and
+    still reach some exit, entering every room on the way before it turns
+    dangerous. It is a max-min (bottleneck) search outward from all exits:
+    L(exit) = ttd(exit), L(room) = min(ttd(room), max over neighbours of L(n) - step).
+    """
+    n = len(state.rooms)
+    step_min = ROOM_TRAVERSAL_SEC / 60.0
+    ttd = state.spread.time_to_danger
+    deadline = np.where(ttd >= 0, ttd, np.inf).astype(np.float64)
+    adjacency = state.adjacency
+
+    # Rooms that lead into each room (graph may not be perfectly symmetric)
+    incoming: list[list[int]] = [[] for _ in range(n)]
+    for u, nbrs in enumerate(adjacency):
+        for v in nbrs:
+            incoming[v].append(u)
+
+    # Multi-exit walking distance (BFS, unit room steps)
+    hops = np.full(n, np.inf)
+    nearest = np.full(n, -1, dtype=np.intp)
+    frontier = list(state.exits)
+    hops[frontier] = 0
+    nearest[frontier] = frontier
+    while frontier:
+        nxt = []
+        for v in frontier:
+            for u in incoming[v]:
+                if np.isinf(hops[u]):
+                    hops[u] = hops[v] + 1
+                    nearest[u] = nearest[v]
+                    nxt.append(u)
+        frontier = nxt
+
+    # Latest safe departure: widest-path search with a max-heap keyed on L
+    latest = np.full(n, -np.inf)
+    heap: list[tuple[float, int]] = []
+    for e in state.exits:
+        latest[e] = deadline[e]
+        heap.append((-latest[e], int(e)))
+    heapq.heapify(heap)
+    while heap:
+        neg, v = heapq.heappop(heap)
+        if -neg < latest[v]:
+            continue
+        for u in incoming[v]:
+            cand = min(deadline[u], latest[v] - step_min)
+            if cand > latest[u]:
+                latest[u] = cand
+                heapq.heappush(heap, (-cand, u))
+
+    return SurvivabilityAtlas(
+        rooms=[r["name"] for r in state.rooms],
+        time_to_danger_min=ttd,
+        time_to_flashover_min=state.spread.time_to_flashover,
+        egress_seconds=hops * ROOM_TRAVERSAL_SEC,
+        nearest_exit=[state.rooms[i]["name"] if i >= 0 else None for i in nearest.tolist()],
+        latest_safe_departure_min=latest,
     )
 
 
@@ -273,16 +560,19 @@ def compute_all_metrics(
     origin: str = "Lobby",
     destination: str = "1302",
     rooms: list[dict[str, Any]] | None = None,
+    state: HazardState | None = None,
 ) -> MetricsSnapshot:
     """Compute all three observability metrics for a given fire scene.
 
+    Pass a prebuilt ``state`` to share the hazard graph and spread simulation
+    with other consumers of the same payload.
+
     Falls back to a reasonable destination if the requested one doesn't exist in the graph.
     """
-    _building_gen = _load_module("building_gen", _wm_src)
-    if rooms is None:
-        rooms = _building_gen.siebel_center_rooms()
+    if state is None:
+        state = build_hazard_state(fire_data, structural_data, rooms)
 
-    room_names = {r["name"] for r in rooms}
+    room_names = state.room_index
 
     # Validate origin/destination, fall back to known rooms
     if origin not in room_names:
@@ -301,9 +591,9 @@ def compute_all_metrics(
         else:
             destination = "1302" if "1302" in room_names else next(iter(room_names))
 
-    path_result = compute_optimized_path(origin, destination, fire_data, structural_data, rooms)
-    survivability = compute_survivability_window(path_result.path, fire_data, rooms)
-    heat_exposure = compute_heat_exposure(path_result.path, fire_data, structural_data, rooms)
+    path_result = compute_optimized_path(origin, destination, state=state)
+    survivability = compute_survivability_window(path_result.path, fire_data, state=state)
+    heat_exposure = compute_heat_exposure(path_result.path, fire_data, state=state)
 
     return MetricsSnapshot(
         optimized_path=path_result,
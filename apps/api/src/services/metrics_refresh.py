@@ -0,0 +1,96 @@
+"""Write-through recompute of a simulation's cached metrics, and its per-frame series.
+
+Storing a fire_severity or structural result only bumps the simulation's
+result revision and drops its cached snapshot (RedisClient.set_team_result).
+The recompute — a hazard graph, Dijkstra and a spread simulation — is
+scheduled here as a background task that runs in the compute pool, so
+publishing a team result, and every pipeline node waiting on it, never waits
+for metrics. A snapshot computed for a revision that has since moved on is
+discarded by ``set_cached_metrics``; the newer result schedules its own.
+
+The metrics time series gets one point per analyzed frame instead, computed
+from that frame's fire and structural consensus as the pipeline produces it
+(``schedule_frame_metrics``).
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Awaitable
+from typing import Any
+
+from ..redis_client import redis_client
+from .compute_pool import compute_pool, metrics_job
+
+logger = logging.getLogger(__name__)
+
+# Refreshes and series points in flight, held until they finish. Shared by every caller in the process.
+_refreshes: set[asyncio.Task] = set()
+
+
+async def refresh_metrics(simulation_id: str) -> dict[str, Any] | None:
+    """Recompute the metrics for the current result revision and write them through.
+
+    Returns the snapshot, or None if there is no fire result yet or newer
+    results landed while it was computed.
+    """
+    revision = await redis_client.get_result_revision(simulation_id)
+    fire_data = await redis_client.get_team_result(simulation_id, "fire_severity")
+    if not fire_data:
+        return None
+    structural_data = await redis_client.get_team_result(simulation_id, "structural")
+    computed = await compute_pool.run(metrics_job, fire_data, structural_data)
+    if not await redis_client.set_cached_metrics(simulation_id, revision, computed["metrics"]):
+        return None
+    return computed["metrics"]
+
+
+async def record_frame_metrics(
+    simulation_id: str,
+    frame: int | None,
+    fire_data: dict[str, Any] | None,
+    structural_data: dict[str, Any] | None,
+) -> int | None:
+    """Append one frame's metrics, from its fire and structural consensus, to the series.
+
+    ``frame`` None records results that cover the whole simulation (the
+    team-blocked pipeline has no per-frame consensus). Returns the point's
+    seq, or None without a fire result.
+    """
+    if not fire_data:
+        return None
+    computed = await compute_pool.run(metrics_job, fire_data, structural_data)
+    return await redis_client.append_metrics_point(simulation_id, computed["metrics"], frame=frame)
+
+
+async def _logged(work: Awaitable[Any], what: str) -> None:
+    # A metrics failure must never surface in result storage or the pipeline, so errors are logged only
+    try:
+        await work
+    except Exception as e:
+        logger.warning(f"{what} failed: {e}")
+
+
+def _schedule(work: Awaitable[Any], what: str) -> asyncio.Task:
+    task = asyncio.create_task(_logged(work, what))
+    _refreshes.add(task)
+    task.add_done_callback(_refreshes.discard)
+    return task
+
+
+def schedule_metrics_refresh(simulation_id: str) -> asyncio.Task:
+    """Recompute ``simulation_id``'s metrics in the background."""
+    return _schedule(refresh_metrics(simulation_id), f"Metrics refresh for simulation {simulation_id}")
+
+
+def schedule_frame_metrics(
+    simulation_id: str,
+    frame: int | None,
+    fire_data: dict[str, Any] | None,
+    structural_data: dict[str, Any] | None,
+) -> asyncio.Task:
+    """Record frame ``frame``'s series point in the background; see ``record_frame_metrics``."""
+    return _schedule(
+        record_frame_metrics(simulation_id, frame, fire_data, structural_data),
+        f"Series point for frame {frame} of simulation {simulation_id}",
+    )
@@ -5,22 +5,46 @@ Requires AZURE_OPENAI_API_KEY and AZURE_OPENAI_ENDPOINT in environment.
 """
 from __future__ import annotations
 
+import asyncio
 import base64
-import json
 import logging
+import random
+import time
+from collections import deque
+from contextlib import AbstractAsyncContextManager
 from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 from pathlib import Path
 from typing import Any
 
-from openai import AsyncAzureOpenAI
+import numpy as np
+from openai import APIConnectionError, APIStatusError, AsyncAzureOpenAI, RateLimitError
 
 from ..config import get_settings
+from .analysis import (
+    JSONExtractionError,
+    PartialCallback,
+    StreamingJSONObject,
+    coerce_to_schema,
+    extract_json,
+    get_inference_cache,
+    inference_key,
+    load_schema,
+)
+from .frame_store import frame_store
+from .inference_scheduler import inference_scheduler
 
 logger = logging.getLogger(__name__)
 
 AZURE_API_VERSION = "2024-12-01-preview"
 DEPLOYMENT_NAME = "gpt-5-mini"
 
+# Rate-limit retries: full-jitter exponential backoff, or the server's retry-after
+MAX_RETRIES = 5
+BACKOFF_BASE = 0.5  # seconds
+BACKOFF_CAP = 20.0
+LATENCY_WINDOW = 200  # recent requests kept for latency percentiles
+
 FIRE_SEVERITY_PROMPT = """Analyze this image of a building scene for fire conditions. You are an expert fire investigator.
 
 Provide your analysis as JSON with these exact fields:
@@ -64,10 +88,18 @@ TEAM_PROMPTS = {
     "fire_severity": FIRE_SEVERITY_PROMPT,
     "structural": STRUCTURAL_ANALYSIS_PROMPT,
 }
+# shared/schemas the answers are coerced to
+TEAM_SCHEMAS = {
+    "fire_severity": "fire_severity_analysis",
+    "structural": "structural_analysis",
+}
 
 
 def _encode_image(frame_path: str) -> tuple[str, str]:
     """Encode an image file to base64 with media type."""
+    prepared = frame_store.get(frame_path)
+    if prepared is not None:
+        return prepared.b64, prepared.media_type
     path = Path(frame_path)
     suffix = path.suffix.lower()
     media_map = {
@@ -83,71 +115,227 @@ def _encode_image(frame_path: str) -> tuple[str, str]:
 
 
 def _parse_json_response(raw: str) -> dict[str, Any]:
-    """Parse JSON from model response, stripping markdown fences if present."""
-    text = raw.strip()
-    if text.startswith("```"):
-        lines = text.split("\n")
-        lines = lines[1:]
-        if lines and lines[-1].strip() == "```":
-            lines = lines[:-1]
-        text = "\n".join(lines)
-    start = text.find("{")
-    end = text.rfind("}") + 1
-    if start >= 0 and end > start:
+    """Parse (and if needed repair) JSON from a model response; unrecoverable text is kept raw."""
+    try:
+        return extract_json(raw)
+    except JSONExtractionError:
+        return {"raw_response": raw}
+
+
+# ---------------------------------------------------------------------------
+# Pooled client, concurrency limit, backoff and counters
+# ---------------------------------------------------------------------------
+
+_client: AsyncAzureOpenAI | None = None
+_pool_loop: asyncio.AbstractEventLoop | None = None
+_latencies: deque[float] = deque(maxlen=LATENCY_WINDOW)
+_in_flight = 0
+_counters = {
+    "requests": 0,
+    "failures": 0,
+    "retries": 0,
+    "rate_limited": 0,
+    "prompt_tokens": 0,
+    "completion_tokens": 0,
+}
+
+
+def _ensure_pool_loop() -> None:
+    # The client's connections belong to one event loop
+    global _client, _pool_loop
+    loop = asyncio.get_running_loop()
+    if _pool_loop is not loop:
+        _client = None
+        _pool_loop = loop
+
+
+def _get_client() -> AsyncAzureOpenAI:
+    """Shared Azure OpenAI async client (one connection pool per process)."""
+    global _client
+    _ensure_pool_loop()
+    if _client is None or _client.is_closed():
+        settings = get_settings()
+        if not settings.azure_openai_api_key:
+            raise RuntimeError("AZURE_OPENAI_API_KEY not configured")
+        _client = AsyncAzureOpenAI(
+            api_key=settings.azure_openai_api_key,
+            azure_endpoint=settings.azure_openai_endpoint,
+            api_version=AZURE_API_VERSION,
+            max_retries=0,  # retried below, outside the concurrency slot
+        )
+    return _client
+
+
+def _slot() -> AbstractAsyncContextManager[None]:
+    """One of the scheduler's Azure OpenAI slots, bounding in-flight requests."""
+    return inference_scheduler.slot("openai", get_settings().azure_openai_max_concurrency)
+
+
+async def close_client() -> None:
+    """Close the pooled client (call on server shutdown)."""
+    global _client
+    if _client is not None and not _client.is_closed():
+        await _client.close()
+    _client = None
+
+
+def _retry_after(exc: APIStatusError) -> float | None:
+    """Seconds the server asked us to wait, from retry-after-ms / retry-after."""
+    headers = exc.response.headers
+    if headers.get("retry-after-ms"):
         try:
-            return json.loads(text[start:end])
-        except json.JSONDecodeError:
+            return float(headers["retry-after-ms"]) / 1000
+        except ValueError:
             pass
-    return {"raw_response": raw}
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
 
 
-def _get_client() -> AsyncAzureOpenAI:
-    """Create Azure OpenAI async client."""
-    settings = get_settings()
-    if not settings.azure_openai_api_key:
-        raise RuntimeError("AZURE_OPENAI_API_KEY not configured")
+def _backoff(attempt: int, retry_after: float | None) -> float:
+    if retry_after is not None:
+        return min(retry_after, BACKOFF_CAP) + random.uniform(0, BACKOFF_BASE)
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+
+
+def _retryable(exc: Exception) -> bool:
+    if isinstance(exc, (RateLimitError, APIConnectionError)):
+        return True
+    return isinstance(exc, APIStatusError) and exc.status_code >= 500
 
-    return AsyncAzureOpenAI(
-        api_key=settings.azure_openai_api_key,
-        azure_endpoint=settings.azure_openai_endpoint,
-        api_version=AZURE_API_VERSION,
-    )
+
+def openai_stats() -> dict[str, Any]:
+    """Request, retry and token counters plus recent latency percentiles."""
+    latencies = np.fromiter(_latencies, dtype=float)
+    p50, p95 = np.percentile(latencies, [50, 95]) if latencies.size else (None, None)
+    return {
+        **_counters,
+        "in_flight": _in_flight,
+        "latency_p50_seconds": None if p50 is None else round(float(p50), 3),
+        "latency_p95_seconds": None if p95 is None else round(float(p95), 3),
+    }
+
+
+async def _consume_stream(stream: Any, on_partial: PartialCallback | None) -> tuple[str, str | None]:
+    """Collect streamed content, counting tokens and handing completed fields to ``on_partial``."""
+    parser = StreamingJSONObject()
+    chunks: list[str] = []
+    finish_reason = None
+    async for chunk in stream:
+        if chunk.usage is not None:
+            _counters["prompt_tokens"] += chunk.usage.prompt_tokens or 0
+            _counters["completion_tokens"] += chunk.usage.completion_tokens or 0
+        if not chunk.choices:
+            continue  # usage chunk, or an Azure content-filter annotation
+        choice = chunk.choices[0]
+        finish_reason = choice.finish_reason or finish_reason
+        delta = choice.delta.content or ""
+        if not delta:
+            continue
+        chunks.append(delta)
+        fields = parser.feed(delta)
+        if fields and on_partial is not None:
+            await on_partial(fields)
+    return "".join(chunks), finish_reason
+
+
+async def _stream_completion(
+    image_b64: str,
+    media_type: str,
+    prompt: str,
+    on_partial: PartialCallback | None,
+) -> tuple[str, str | None]:
+    """One streamed completion inside a concurrency slot.
+
+    Rate limits, 5xx and connection errors are retried with backoff — with
+    the slot released while waiting. Once tokens flow (and partial fields may
+    have been published) the request is not retried.
+    """
+    global _in_flight
+    attempt = 0
+    while True:
+        async with _slot():
+            _in_flight += 1
+            _counters["requests"] += 1
+            started = time.monotonic()
+            stream = None
+            try:
+                stream = await _get_client().chat.completions.create(
+                    model=DEPLOYMENT_NAME,
+                    messages=[
+                        {
+                            "role": "user",
+                            "content": [
+                                {"type": "text", "text": prompt},
+                                {
+                                    "type": "image_url",
+                                    "image_url": {
+                                        "url": f"data:{media_type};base64,{image_b64}",
+                                        "detail": "low",
+                                    },
+                                },
+                            ],
+                        }
+                    ],
+                    max_completion_tokens=2048,
+                    stream=True,
+                    stream_options={"include_usage": True},
+                )
+                result = await _consume_stream(stream, on_partial)
+                _latencies.append(time.monotonic() - started)
+                return result
+            except Exception as exc:
+                _counters["failures"] += 1
+                if isinstance(exc, RateLimitError):
+                    _counters["rate_limited"] += 1
+                if stream is not None or not _retryable(exc) or attempt >= MAX_RETRIES:
+                    raise
+                error = exc
+                delay = _backoff(attempt, _retry_after(exc) if isinstance(exc, APIStatusError) else None)
+            finally:
+                _in_flight -= 1
+
+        attempt += 1
+        _counters["retries"] += 1
+        logger.warning(f"Azure OpenAI request failed ({error}), retry {attempt} in {delay:.2f}s")
+        await asyncio.sleep(delay)
 
 
 async def call_openai_vision(
     image_b64: str,
     media_type: str,
     prompt: str,
+    on_partial: PartialCallback | None = None,
 ) -> dict[str, Any]:
-    """Call Azure GPT-5-mini with a vision prompt."""
-    client = _get_client()
-
-    response = await client.chat.completions.create(
-        model=DEPLOYMENT_NAME,
-        messages=[
-            {
-                "role": "user",
-                "content": [
-                    {"type": "text", "text": prompt},
-                    {
-                        "type": "image_url",
-                        "image_url": {
-                            "url": f"data:{media_type};base64,{image_b64}",
-                            "detail": "low",
-                        },
-                    },
-                ],
-            }
-        ],
-        max_completion_tokens=2048,
-    )
-
-    content = response.choices[0].message.content or ""
-    raw = content.strip()
+    """Call Azure GPT-5-mini with a vision prompt (served from the inference cache when possible).
+
+    The completion is streamed; top-level JSON fields are handed to
+    ``on_partial`` as soon as they are complete.
+    """
+    cache = get_inference_cache()
+    key = inference_key(image_b64, prompt, DEPLOYMENT_NAME, "azure_openai")
+    if cache is not None:
+        cached = await cache.aget(key)
+        if cached is not None:
+            return cached
+
+    raw, finish_reason = await _stream_completion(image_b64, media_type, prompt, on_partial)
+    raw = raw.strip()
     if not raw:
-        logger.warning("Azure OpenAI returned empty content, finish_reason=%s", response.choices[0].finish_reason)
+        logger.warning("Azure OpenAI returned empty content, finish_reason=%s", finish_reason)
         return {"raw_response": "", "error": "empty response from model"}
-    return _parse_json_response(raw)
+    result = _parse_json_response(raw)
+    if cache is not None and "raw_response" not in result:
+        await cache.aput(key, result)
+    return result
 
 
 async def run_single_team_openai(
@@ -155,6 +343,7 @@ async def run_single_team_openai(
     team_type: str,
     context: dict[str, Any] | None = None,
     frame_id: str = "frame_0",
+    on_partial: PartialCallback | None = None,
 ) -> dict[str, Any]:
     """Run a single agent team's analysis using Azure OpenAI Vision."""
     prompt = TEAM_PROMPTS.get(team_type)
@@ -165,7 +354,8 @@ async def run_single_team_openai(
         return await run_single_team(frame_path, team_type, context, frame_id)
 
     image_b64, media_type = _encode_image(frame_path)
-    result = await call_openai_vision(image_b64, media_type, prompt)
+    result = await call_openai_vision(image_b64, media_type, prompt, on_partial)
+    coerce_to_schema(result, load_schema(TEAM_SCHEMAS[team_type]))
     result["frame_id"] = frame_id
     result["timestamp"] = datetime.now(timezone.utc).isoformat()
     result["model"] = DEPLOYMENT_NAME
@@ -6,23 +6,38 @@ Manages 4 specialized teams of agents that collaborate to analyze emergency scen
 3. Evacuation Team - computes safe routes (reads fire + structural data)
 4. Personnel Team - recommends deployment (reads all team data)
 
-HYBRID PARALLEL EXECUTION:
+FRAME-PIPELINED EXECUTION (default):
+- Each (frame, team) pair is analyzed, then merged, as nodes of a DAG built
+  from TeamType.dependencies()
+- A team starts on a frame as soon as that frame's upstream teams finish it,
+  while later frames are still in earlier teams; critical-path nodes go first
+
+HYBRID PARALLEL EXECUTION (ORCA_PIPELINE_MODE=teams):
 - All agent instances across all 4 teams spawn simultaneously
 - Each team has two phases:
   1. Independent phase: analyze frames without upstream data
   2. Merge phase: incorporate upstream team results from Redis
-- Teams poll Redis for upstream dependencies with timeout
+- Teams are notified (in-process event or Redis pub/sub) as upstream results land
 - Reduces total latency by overlapping independent work
 
+EARLY QUORUM (ORCA_TEAM_QUORUM, per team):
+- A team publishes once k of its n instances have finished with agreeing
+  results; laggards are cancelled or left to update the consensus later
+
 INFERENCE MODES:
 - local: Use stub/mock data (fast, no external deps)
 - cloud: Call Modal-deployed endpoints (global, scalable)
 - anthropic: Use Claude Vision API directly (requires ANTHROPIC_API_KEY)
+- openai: Use Azure OpenAI vision
+- routed: Pick the fastest healthy backend per call, hedging critical-path teams
 """
 from __future__ import annotations
 
 import asyncio
+import copy
+import functools
 import logging
+from collections.abc import Awaitable, Callable
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from enum import Enum
@@ -30,13 +45,24 @@ from typing import Any
 
 from ..config import get_settings
 from ..redis_client import redis_client
+from .consensus import agreement_score, build_consensus
+from .dag import run_dag
+from .frame_dedup import dedupe_frames, dhash
+from .frame_store import frame_store
+from .inference_router import inference_router
+from .inference_scheduler import Priority, inference_context
+from .metrics_refresh import schedule_frame_metrics, schedule_metrics_refresh
+from .single_flight import inference_flights
 
 logger = logging.getLogger(__name__)
 
 # Configuration
-UPSTREAM_POLL_INTERVAL = 0.5  # seconds between Redis polls
 UPSTREAM_TIMEOUT = 30.0  # max seconds to wait for upstream data
 
+# Instances left running past a team's quorum (late_updates). Shared by every
+# team in the process; holds them until they finish.
+_late_tasks: set[asyncio.Task] = set()
+
 
 class TeamType(str, Enum):
     """Agent team types in execution order."""
@@ -61,6 +87,12 @@ class TeamType(str, Enum):
         return deps[self]
 
 
+# Teams on the critical path (everything downstream waits on them): in routed
+# mode their calls are hedged to a second backend past the first one's p95,
+# and they get ahead of other teams' calls in the inference scheduler
+HEDGED_TEAMS = frozenset({TeamType.FIRE_SEVERITY, TeamType.STRUCTURAL})
+
+
 @dataclass
 class AgentInstance:
     """Single agent instance within a team.
@@ -72,8 +104,15 @@ class AgentInstance:
     instance_id: str
     team_type: TeamType
     status: str = "idle"
+    # Share one in-flight backend call with sibling instances on the same
+    # frame. Turn off when the team wants diverse samples (temperature > 0).
+    coalesce: bool = True
 
-    async def analyze_independent(self, frame_path: str) -> dict[str, Any]:
+    async def analyze_independent(
+        self,
+        frame_path: str,
+        on_partial: Callable[[dict[str, Any]], Awaitable[None]] | None = None,
+    ) -> dict[str, Any]:
         """Phase 1: Analyze frame independently without upstream data.
 
         Returns partial result that can be computed from frame alone.
@@ -84,6 +123,10 @@ class AgentInstance:
         - cloud: Calls Modal endpoint (global, scalable)
         - anthropic: Uses Claude Vision API
         - openai: Uses OpenAI GPT-4o-mini Vision API
+        - routed: Fastest healthy backend from ORCA_INFERENCE_BACKENDS
+
+        ``on_partial`` receives early fields from streaming backends
+        (anthropic mode's Ollama path and openai).
         """
         self.status = "analyzing_independent"
         settings = get_settings()
@@ -95,66 +138,170 @@ class AgentInstance:
 
         # Anthropic inference - call Claude Vision API
         if inference_mode == "anthropic":
-            return await self._analyze_anthropic(frame_path)
+            return await self._analyze_anthropic(frame_path, on_partial)
 
         # OpenAI inference - call GPT-4o-mini Vision API
         if inference_mode == "openai":
-            return await self._analyze_openai(frame_path)
+            return await self._analyze_openai(frame_path, on_partial)
+
+        # Latency-aware routing across several backends
+        if inference_mode == "routed":
+            backends = [b.strip() for b in settings.inference_backends.split(",") if b.strip()]
+            return await self._analyze_routed(frame_path, backends, on_partial)
 
         # Local/stub inference (default)
         return await self._analyze_local(frame_path)
 
+    async def _coalesced(
+        self,
+        frame_path: str,
+        backend: str,
+        call: Callable[[], Awaitable[dict[str, Any]]],
+    ) -> dict[str, Any]:
+        """Run an independent-phase backend call, sharing it with identical concurrent calls.
+
+        The independent prompt is fixed by (team, backend) since there is no
+        upstream context yet, so the frame content plus those two identify the
+        request. Followers get a private copy re-labelled with their own frame_id.
+        """
+        if not self.coalesce:
+            return await call()
+
+        prepared = frame_store.get(frame_path)
+        key = (prepared.digest if prepared else frame_path, self.team_type.value, "independent", backend)
+        shared = await inference_flights.do(key, call)
+        result = copy.deepcopy(shared)
+        own_id = f"{self.instance_id}_{frame_path}"
+        if "frame_id" in result:
+            result["frame_id"] = own_id
+        if "frame_refs" in result:
+            result["frame_refs"] = [own_id]
+        return result
+
     async def _analyze_cloud(self, frame_path: str) -> dict[str, Any]:
         """Call cloud-deployed Modal endpoint."""
         from .cloud_inference import analyze_remote
 
         try:
-            result = await analyze_remote(
+            result = await self._coalesced(frame_path, "cloud", lambda: analyze_remote(
                 team_type=self.team_type.value,
                 frame_path=frame_path,
                 context=None,  # Independent phase has no context
                 frame_id=f"{self.instance_id}_{frame_path}",
-            )
+            ))
             result["inference_mode"] = "cloud"
             return result
         except Exception as e:
             logger.warning(f"Cloud inference failed, falling back to local: {e}")
             return await self._analyze_local(frame_path)
 
-    async def _analyze_anthropic(self, frame_path: str) -> dict[str, Any]:
+    async def _analyze_anthropic(
+        self,
+        frame_path: str,
+        on_partial: Callable[[dict[str, Any]], Awaitable[None]] | None = None,
+    ) -> dict[str, Any]:
         """Call Claude Vision API directly."""
         try:
             from .analysis import run_single_team
 
-            result = await run_single_team(
+            result = await self._coalesced(frame_path, "anthropic", lambda: run_single_team(
                 frame_path=frame_path,
                 team_type=self.team_type.value,
                 context=None,
                 frame_id=f"{self.instance_id}_{frame_path}",
-            )
+                on_partial=on_partial,
+            ))
             result["inference_mode"] = "anthropic"
             return result
         except Exception as e:
             logger.warning(f"Anthropic inference failed, falling back to local: {e}")
             return await self._analyze_local(frame_path)
 
-    async def _analyze_openai(self, frame_path: str) -> dict[str, Any]:
+    async def _analyze_openai(
+        self,
+        frame_path: str,
+        on_partial: Callable[[dict[str, Any]], Awaitable[None]] | None = None,
+    ) -> dict[str, Any]:
         """Call OpenAI GPT-4o-mini Vision API."""
         try:
             from .openai_inference import run_single_team_openai
 
-            result = await run_single_team_openai(
+            result = await self._coalesced(frame_path, "openai", lambda: run_single_team_openai(
                 frame_path=frame_path,
                 team_type=self.team_type.value,
                 context=None,
                 frame_id=f"{self.instance_id}_{frame_path}",
-            )
+                on_partial=on_partial,
+            ))
             result["inference_mode"] = "openai"
             return result
         except Exception as e:
             logger.warning(f"OpenAI inference failed, falling back to local: {e}")
             return await self._analyze_local(frame_path)
 
+    async def _analyze_routed(
+        self,
+        frame_path: str,
+        backends: list[str],
+        on_partial: Callable[[dict[str, Any]], Awaitable[None]] | None = None,
+    ) -> dict[str, Any]:
+        """Let the inference router pick (and hedge) the backend for this call."""
+        async def route() -> dict[str, Any]:
+            backend, result = await inference_router.call(
+                {b: (lambda b=b: self._call_backend(b, frame_path, on_partial)) for b in backends},
+                hedge=self.team_type in HEDGED_TEAMS,
+            )
+            result["inference_mode"] = backend
+            return result
+
+        try:
+            return await self._coalesced(frame_path, "routed", route)
+        except Exception as e:
+            logger.warning(f"All routed backends failed, falling back to local: {e}")
+            return await self._analyze_local(frame_path)
+
+    async def _call_backend(
+        self,
+        backend: str,
+        frame_path: str,
+        on_partial: Callable[[dict[str, Any]], Awaitable[None]] | None = None,
+    ) -> dict[str, Any]:
+        """One routed backend call. Raises on any failure so the router can fail over."""
+        frame_id = f"{self.instance_id}_{frame_path}"
+        if backend == "cloud":
+            from .cloud_inference import analyze_remote
+
+            result = await analyze_remote(
+                team_type=self.team_type.value, frame_path=frame_path, context=None, frame_id=frame_id,
+            )
+        elif backend == "anthropic":
+            from .analysis import run_single_team
+
+            result = await run_single_team(
+                frame_path=frame_path,
+                team_type=self.team_type.value,
+                context=None,
+                frame_id=frame_id,
+                on_partial=on_partial,
+                use_fallback=False,
+            )
+        elif backend == "openai":
+            from .openai_inference import run_single_team_openai
+
+            result = await run_single_team_openai(
+                frame_path=frame_path,
+                team_type=self.team_type.value,
+                context=None,
+                frame_id=frame_id,
+                on_partial=on_partial,
+            )
+        else:
+            raise ValueError(f"Unknown inference backend: {backend}")
+
+        if "error" in result:
+            raise RuntimeError(f"{backend} returned an error: {str(result['error'])[:200]}")
+        return result
+
     async def _analyze_local(self, frame_path: str) -> dict[str, Any]:
         """Generate local stub data (no external calls)."""
         timestamp = datetime.now(timezone.utc).isoformat()
@@ -497,6 +644,23 @@ class Team:
     team_type: TeamType
     instances: list[AgentInstance] = field(default_factory=list)
     num_instances: int = 3
+    # Each instance makes its own backend call instead of sharing one.
+    # Otherwise concurrent instances coalesce into one call per frame and
+    # their consensus agreement is trivially 1.0.
+    diverse_samples: bool = False
+    # Publish once this many instances have finished and their results agree
+    # (agreement_score >= min_agreement); None waits for all. Instances still
+    # running are cancelled, or with late_updates allowed to finish and
+    # republish the consensus including their results. A quorum implies
+    # diverse samples: agreement between copies of one call proves nothing.
+    quorum: int | None = None
+    min_agreement: float = 0.8
+    late_updates: bool = False
+    _late_results: list[dict[str, Any]] = field(default_factory=list, init=False, repr=False)
+    _completed: tuple[list[dict[str, Any]], list[dict[str, Any]] | None] | None = field(
+        default=None, init=False, repr=False,
+    )
+    _pending_late: int = field(default=0, init=False, repr=False)
 
     def __post_init__(self):
         """Initialize team instances."""
@@ -504,7 +668,8 @@ class Team:
             self.instances = [
                 AgentInstance(
                     instance_id=f"{self.team_type.value}_{i}",
-                    team_type=self.team_type
+                    team_type=self.team_type,
+                    coalesce=not (self.diverse_samples or self.quorum),
                 )
                 for i in range(self.num_instances)
             ]
@@ -512,55 +677,218 @@ class Team:
     async def run_hybrid(
         self,
         simulation_id: str,
-        frames: list[str]
+        frames: list[str],
+        reused_frames: list[dict[str, Any]] | None = None,
     ) -> dict[str, Any]:
         """Run team with hybrid parallel execution.
 
         1. Start independent analysis immediately
-        2. Poll for upstream dependencies
+        2. Wait for upstream dependencies (pushed, not polled)
         3. Merge when dependencies available
-        4. Compute consensus across instances
+        4. Compute consensus across instances, once all of them (or a
+           quorum) are done
+
+        ``reused_frames`` lists near-duplicate frames that were not analyzed
+        and the frame whose results stand in for them; it is attached to the
+        consensus as provenance.
         """
         logger.info(f"[{self.team_type.value}] Starting hybrid analysis")
         await redis_client.set_team_status(simulation_id, self.team_type.value, "processing")
 
-        # Phase 1: Run all instances' independent analysis in parallel
-        independent_tasks = []
-        for instance in self.instances:
-            for frame in frames:
-                independent_tasks.append(instance.analyze_independent(frame))
+        publish_partial = self._partial_publisher(simulation_id)
+        upstream = asyncio.ensure_future(self._wait_for_upstream(simulation_id))
+
+        async def run_instance(instance: AgentInstance) -> list[dict[str, Any]]:
+            # Phase 1: independent analysis of every frame, in parallel
+            independent_results = await asyncio.gather(*(
+                instance.analyze_independent(frame, publish_partial) for frame in frames
+            ))
+            # Phase 2: merge with upstream results once they are pushed
+            upstream_context = await asyncio.shield(upstream)
+            return list(await asyncio.gather(*(
+                self._run_merge(simulation_id, instance, result, upstream_context)
+                for result in independent_results
+            )))
+
+        with inference_context(self._priority(), tenant=simulation_id):
+            tasks = [asyncio.create_task(run_instance(instance)) for instance in self.instances]
+        try:
+            instance_results = await self._gather_quorum(simulation_id, tasks)
+        finally:
+            if not upstream.done():  # every instance failed before needing it
+                upstream.cancel()
+        logger.info(f"[{self.team_type.value}] Merge phase complete")
 
-        independent_results = await asyncio.gather(*independent_tasks)
-        logger.info(f"[{self.team_type.value}] Independent phase complete ({len(independent_results)} results)")
+        final_results = [r for results in instance_results if results is not None for r in results]
+        return await self.complete(simulation_id, final_results, reused_frames)
 
-        # Phase 2: Wait for upstream dependencies and merge
-        upstream_context = await self._wait_for_upstream(simulation_id)
+    async def analyze_frame(self, simulation_id: str, frame: str) -> list[dict[str, Any] | None]:
+        """Independent phase for one frame: every instance's analysis, in instance order.
 
-        # Merge each independent result with upstream context
-        merge_tasks = []
-        for i, instance in enumerate(self.instances):
-            for j, frame in enumerate(frames):
-                idx = i * len(frames) + j
-                independent_result = independent_results[idx]
-                merge_tasks.append(
-                    self._run_merge(simulation_id, instance, independent_result, upstream_context)
-                )
+        With a quorum, instances that had not finished when it was reached are None.
+        """
+        publish_partial = self._partial_publisher(simulation_id)
+        with inference_context(self._priority(), tenant=simulation_id):
+            tasks = [
+                asyncio.create_task(instance.analyze_independent(frame, publish_partial))
+                for instance in self.instances
+            ]
+        return await self._gather_quorum(
+            simulation_id, tasks, functools.partial(self._merge_late, simulation_id),
+        )
 
-        final_results = await asyncio.gather(*merge_tasks)
-        logger.info(f"[{self.team_type.value}] Merge phase complete")
+    async def merge_frame(
+        self,
+        simulation_id: str,
+        independent_results: list[dict[str, Any]],
+        upstream_context: dict[str, Any],
+    ) -> list[dict[str, Any]]:
+        """Merge phase for one frame, with the same frame's upstream results.
+
+        Returns the merged instance results; ``complete`` turns all frames'
+        results into the team result.
+        """
+        return list(await asyncio.gather(*(
+            self._run_merge(simulation_id, instance, result, upstream_context)
+            for instance, result in zip(self.instances, independent_results)
+            if result is not None
+        )))
 
-        # Compute consensus
-        consensus = self._compute_consensus(final_results)
+    async def complete(
+        self,
+        simulation_id: str,
+        results: list[dict[str, Any]],
+        reused_frames: list[dict[str, Any]] | None = None,
+    ) -> dict[str, Any]:
+        """Compute the team consensus over all instance results and publish it.
+
+        Results of instances that finished after the quorum are included;
+        each one arriving later publishes the consensus again.
+        """
+        self._completed = (list(results), reused_frames)
+        consensus = self._compute_consensus(list(results) + self._late_results)
+        if reused_frames:
+            consensus["reused_frames"] = reused_frames
+        if self.quorum:
+            consensus.setdefault("consensus_metadata", {})["quorum"] = {
+                "required": self.quorum,
+                "pending_instances": self._pending_late,
+            }
 
         # Store consensus result in Redis
         await redis_client.set_team_result(simulation_id, self.team_type.value, consensus)
+        if self.team_type.value in redis_client.METRICS_SOURCE_TEAMS:
+            schedule_metrics_refresh(simulation_id)
         await redis_client.set_team_status(simulation_id, self.team_type.value, "complete")
 
         logger.info(f"[{self.team_type.value}] Team complete")
         return consensus
 
+    async def _gather_quorum(
+        self,
+        simulation_id: str,
+        tasks: list[asyncio.Task],
+        late_merge: Callable[[int, Any], Awaitable[list[dict[str, Any]]]] | None = None,
+    ) -> list[Any]:
+        """Results of the instances' ``tasks``, in order, once all finish or a quorum agrees.
+
+        A task's result is the instance's result for one frame or its list of
+        merged results for every frame. At quorum the unfinished tasks get
+        None in their place and are cancelled, or with ``late_updates`` left
+        to finish; ``late_merge(index, result)`` then turns a late result
+        into merged results (default: it already is a list of them).
+
+        Failed instances also get None and count toward nothing; the gather
+        fails, with the first instance error, only once so many have failed
+        that the quorum (every instance, without one) can't be reached.
+        """
+        needed = min(self.quorum or len(tasks), len(tasks))
+        try:
+            pending = set(tasks)
+            while pending:
+                _, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                failed = [task for task in tasks if task.done() and _task_failed(task)]
+                if len(tasks) - len(failed) < needed:
+                    failed[0].result()  # re-raises the instance's error
+                finished = [task.result() for task in tasks if task.done() and not _task_failed(task)]
+                if pending and len(finished) >= needed and self._agrees(finished):
+                    break
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+
+        for index, task in enumerate(tasks):
+            if task.done() and _task_failed(task):
+                error = "cancelled" if task.cancelled() else repr(task.exception())
+                logger.warning(f"[{self.team_type.value}] Instance {index} failed: {error}")
+        results = [task.result() if task.done() and not _task_failed(task) else None for task in tasks]
+        laggards = [(index, task) for index, task in enumerate(tasks) if not task.done()]
+        if laggards:
+            logger.info(
+                f"[{self.team_type.value}] Quorum of {len(tasks) - len(laggards)}/{len(tasks)} reached; "
+                f"{'updating later with' if self.late_updates else 'cancelling'} {len(laggards)} instance(s)"
+            )
+        for index, task in laggards:
+            if self.late_updates:
+                merge = functools.partial(late_merge, index) if late_merge is not None else None
+                late = asyncio.create_task(self._late_update(simulation_id, task, merge))
+                _late_tasks.add(late)
+                late.add_done_callback(_late_tasks.discard)
+            else:
+                task.cancel()
+        return results
+
+    def _agrees(self, finished: list[Any]) -> bool:
+        """Whether the finished instances agree on every frame."""
+        per_instance = [r if isinstance(r, list) else [r] for r in finished]
+        return all(
+            agreement_score(list(frame_results)) >= self.min_agreement
+            for frame_results in zip(*per_instance)
+        )
+
+    async def _late_update(
+        self,
+        simulation_id: str,
+        task: asyncio.Task,
+        merge: Callable[[Any], Awaitable[list[dict[str, Any]]]] | None,
+    ) -> None:
+        """Wait for an instance that missed the quorum and fold its results into the consensus."""
+        self._pending_late += 1
+        try:
+            result = await task
+            self._late_results.extend(await merge(result) if merge is not None else result)
+        except Exception as e:
+            logger.warning(f"[{self.team_type.value}] Late instance result dropped: {e}")
+            return
+        finally:
+            self._pending_late -= 1
+        if self._completed is not None:  # otherwise the team's consensus will include it
+            try:
+                await self.complete(simulation_id, *self._completed)
+            except Exception as e:
+                logger.warning(f"[{self.team_type.value}] Late consensus update not published: {e}")
+
+    async def _merge_late(self, simulation_id: str, index: int, result: dict[str, Any]) -> list[dict[str, Any]]:
+        """Merge a frame's late independent result with the upstream teams' published results."""
+        # The frame's own upstream merges have moved on; the team results cover it
+        upstream_context = await self._wait_for_upstream(simulation_id)
+        return [await self._run_merge(simulation_id, self.instances[index], result, upstream_context)]
+
+    def _priority(self) -> Priority:
+        return Priority.CRITICAL if self.team_type in HEDGED_TEAMS else Priority.NORMAL
+
+    def _partial_publisher(self, simulation_id: str) -> Callable[[dict[str, Any]], Awaitable[None]]:
+        async def publish_partial(fields: dict[str, Any]) -> None:
+            # Best effort: a streaming hiccup must never fail the inference
+            try:
+                await redis_client.set_team_partial(simulation_id, self.team_type.value, fields)
+            except Exception as e:
+                logger.debug(f"[{self.team_type.value}] Partial update not published: {e}")
+        return publish_partial
+
     async def _wait_for_upstream(self, simulation_id: str) -> dict[str, Any]:
-        """Poll Redis for upstream team dependencies with timeout."""
+        """Wait for upstream team results, which Redis pushes as they land, with timeout."""
         dependencies = self.team_type.dependencies()
 
         if not dependencies:
@@ -569,33 +897,17 @@ class Team:
 
         logger.info(f"[{self.team_type.value}] Waiting for upstream: {[d.value for d in dependencies]}")
 
-        start_time = asyncio.get_event_loop().time()
-        upstream_context = {}
-
-        while True:
-            # Check all dependencies
-            all_ready = True
-            for dep in dependencies:
-                if dep.value not in upstream_context:
-                    result = await redis_client.get_team_result(simulation_id, dep.value)
-                    if result:
-                        upstream_context[dep.value] = result
-                        logger.info(f"[{self.team_type.value}] Received {dep.value} data")
-                    else:
-                        all_ready = False
-
-            if all_ready:
-                logger.info(f"[{self.team_type.value}] All upstream dependencies ready")
-                return upstream_context
-
-            # Check timeout
-            elapsed = asyncio.get_event_loop().time() - start_time
-            if elapsed > UPSTREAM_TIMEOUT:
-                logger.warning(f"[{self.team_type.value}] Timeout waiting for upstream, proceeding with partial data")
-                return upstream_context
-
-            # Poll interval
-            await asyncio.sleep(UPSTREAM_POLL_INTERVAL)
+        upstream_context = await redis_client.wait_for_team_results(
+            simulation_id, [d.value for d in dependencies], UPSTREAM_TIMEOUT,
+        )
+        missing = [d.value for d in dependencies if d.value not in upstream_context]
+        if missing:
+            logger.warning(
+                f"[{self.team_type.value}] Timeout waiting for upstream {missing}, proceeding with partial data"
+            )
+        else:
+            logger.info(f"[{self.team_type.value}] All upstream dependencies ready")
+        return upstream_context
 
     async def _run_merge(
         self,
@@ -618,32 +930,31 @@ class Team:
         return result
 
     def _compute_consensus(self, results: list[dict[str, Any]]) -> dict[str, Any]:
-        """Compute consensus from multiple instance results."""
-        if not results:
-            return {}
+        """Compute consensus from multiple instance results, field by field."""
+        return build_consensus(results)
 
-        if len(results) == 1:
-            return results[0]
 
-        consensus = results[0].copy()
+def _parse_quorum(spec: str) -> dict[str, int]:
+    """``"fire_severity=2,structural=2"`` -> {team type: instances needed}."""
+    quorum = {}
+    for entry in spec.split(","):
+        if entry.strip():
+            team, _, size = entry.partition("=")
+            quorum[team.strip()] = int(size)
+    return quorum
 
-        # Average confidence scores
-        confidences = [r.get("confidence", 0.8) for r in results]
-        consensus["confidence"] = sum(confidences) / len(confidences)
 
-        # Combine frame refs
-        all_frame_refs = []
-        for r in results:
-            all_frame_refs.extend(r.get("frame_refs", []))
-        consensus["frame_refs"] = list(set(all_frame_refs))
+def _task_failed(task: asyncio.Task) -> bool:
+    """Whether a finished task was cancelled or raised."""
+    return task.cancelled() or task.exception() is not None
 
-        # Add consensus metadata
-        consensus["consensus_metadata"] = {
-            "num_instances": len(results),
-            "agreement_score": 0.85,
-        }
 
-        return consensus
+def _frame_fingerprint(frame_path: str) -> int | None:
+    """Perceptual hash of a frame, reusing the one computed when it was prepared."""
+    prepared = frame_store.get(frame_path)
+    if prepared is not None:
+        return prepared.dhash
+    return dhash(frame_path)
 
 
 class Orchestrator:
@@ -685,17 +996,22 @@ class Orchestrator:
         simulation_id: str,
         frames: list[str]
     ) -> dict[str, Any]:
-        """Run the full agent pipeline with hybrid parallel execution.
+        """Run the full agent pipeline.
 
-        All teams spawn simultaneously. Each team:
-        1. Runs independent analysis immediately
-        2. Polls Redis for upstream dependencies
-        3. Merges upstream data when available
-        4. Publishes final result
+        Frame-pipelined (default): every (frame, team) pair is analyzed and
+        merged as nodes of a DAG built from ``TeamType.dependencies()``. A team starts on a frame
+        as soon as that frame's upstream teams are done with it, so frame 1
+        moves through all four teams while later frames are still in fire
+        analysis; critical-path nodes run first when the pipeline is full.
 
-        This reduces total latency by overlapping independent work.
+        Team-blocked (``ORCA_PIPELINE_MODE=teams``): all teams spawn
+        simultaneously; each analyzes every frame, waits for its upstream
+        teams' final results to be pushed, merges them and publishes.
         """
-        logger.info(f"Starting HYBRID PARALLEL pipeline for simulation {simulation_id}")
+        pipelined = get_settings().pipeline_mode != "teams"
+        logger.info(
+            f"Starting {'FRAME PIPELINED' if pipelined else 'HYBRID PARALLEL'} pipeline for simulation {simulation_id}"
+        )
 
         # Initialize simulation state in Redis
         await redis_client.set_simulation_status(simulation_id, "analyzing")
@@ -709,26 +1025,54 @@ class Orchestrator:
         self.active_simulations[simulation_id] = {
             "status": "analyzing",
             "started_at": datetime.now(timezone.utc).isoformat(),
-            "mode": "hybrid_parallel",
+            "mode": "frame_pipelined" if pipelined else "hybrid_parallel",
         }
 
         try:
+            # Decode/encode every frame once for all teams and instances
+            if get_settings().inference_mode != "local":
+                await frame_store.acquire(simulation_id, frames)
+
+            # Near-duplicate frames reuse the results of the frame they match
+            analyzed, reused = await asyncio.to_thread(
+                dedupe_frames, frames, get_settings().frame_dedup_distance, _frame_fingerprint,
+            )
+            self.active_simulations[simulation_id]["frames_reused"] = len(reused)
+
             # Create all teams
+            settings = get_settings()
+            diverse = set(settings.diverse_sample_teams.split(","))
+            quorum = _parse_quorum(settings.team_quorum)
             teams = [
-                Team(team_type=team_type, num_instances=self.instances_per_team)
+                Team(
+                    team_type=team_type,
+                    num_instances=self.instances_per_team,
+                    diverse_samples=team_type.value in diverse,
+                    quorum=quorum.get(team_type.value),
+                    min_agreement=settings.quorum_min_agreement,
+                    late_updates=settings.quorum_laggards == "update",
+                )
                 for team_type in TeamType.execution_order()
             ]
 
-            # Spawn ALL teams simultaneously with asyncio.gather()
-            logger.info(f"Spawning all {len(teams)} teams simultaneously")
-            team_tasks = [team.run_hybrid(simulation_id, frames) for team in teams]
-            team_results = await asyncio.gather(*team_tasks)
-
-            # Build results dict
-            results = {
-                team_type.value: result
-                for team_type, result in zip(TeamType.execution_order(), team_results)
-            }
+            if pipelined:
+                results = await self._run_pipelined(simulation_id, teams, analyzed, reused)
+            else:
+                # Spawn ALL teams simultaneously with asyncio.gather()
+                logger.info(f"Spawning all {len(teams)} teams simultaneously")
+                team_tasks = [team.run_hybrid(simulation_id, analyzed, reused) for team in teams]
+                team_results = await asyncio.gather(*team_tasks)
+
+                # Build results dict
+                results = {
+                    team_type.value: result
+                    for team_type, result in zip(TeamType.execution_order(), team_results)
+                }
+                # Teams merged all frames at once: one series point for the whole run
+                await schedule_frame_metrics(
+                    simulation_id, None,
+                    results[TeamType.FIRE_SEVERITY.value], results[TeamType.STRUCTURAL.value],
+                )
 
             # Mark simulation complete
             await redis_client.set_simulation_status(simulation_id, "complete")
@@ -743,9 +1087,75 @@ class Orchestrator:
             self.active_simulations[simulation_id]["status"] = "error"
             self.active_simulations[simulation_id]["error"] = str(e)
             raise
+        finally:
+            frame_store.release(simulation_id)
 
         return results
 
+    async def _run_pipelined(
+        self,
+        simulation_id: str,
+        teams: list[Team],
+        frames: list[str],
+        reused: list[dict[str, Any]],
+    ) -> dict[str, Any]:
+        """Run each (frame, team) pair as DAG nodes, pipelining frames through the teams.
+
+        Each pair is two nodes: the independent analysis (no dependencies, so
+        inference for all teams overlaps as before) and the merge, which
+        waits for that analysis and for the same frame's upstream merges and
+        takes their per-frame consensus. When a team has merged every frame,
+        its consensus over all of them is published as the team result.
+        Once a frame's structural merge is done, its fire and structural
+        consensus give the frame's point in the metrics series.
+        """
+        by_type = {team.team_type: team for team in teams}
+        graph: dict[tuple[int, TeamType, str], list[tuple[int, TeamType, str]]] = {}
+        for index in range(len(frames)):
+            for team_type in TeamType.execution_order():
+                graph[(index, team_type, "analyze")] = []
+                graph[(index, team_type, "merge")] = [(index, team_type, "analyze")] + [
+                    (index, dep, "merge") for dep in team_type.dependencies()
+                ]
+        per_frame: dict[TeamType, list[list[dict[str, Any]]]] = {t: [[] for _ in frames] for t in by_type}
+        remaining = {t: len(frames) for t in by_type}
+        results: dict[str, Any] = {}
+        frame_points: list[asyncio.Task] = []
+
+        async def run_node(node: tuple[int, TeamType, str], upstream: dict) -> Any:
+            index, team_type, phase = node
+            team = by_type[team_type]
+            if phase == "analyze":
+                return await team.analyze_frame(simulation_id, frames[index])
+
+            context = {dep.value: upstream[(index, dep, "merge")] for dep in team_type.dependencies()}
+            merged = await team.merge_frame(simulation_id, upstream[(index, team_type, "analyze")], context)
+            per_frame[team_type][index] = merged
+            remaining[team_type] -= 1
+            if not remaining[team_type]:
+                all_results = [r for frame_results in per_frame[team_type] for r in frame_results]
+                results[team_type.value] = await team.complete(simulation_id, all_results, reused)
+            consensus = team._compute_consensus(merged)
+            if team_type is TeamType.STRUCTURAL:
+                # Computed off the pipeline; downstream teams don't wait on metrics
+                fire = context[TeamType.FIRE_SEVERITY.value]
+                frame_points.append(schedule_frame_metrics(simulation_id, index, fire, consensus))
+            return consensus
+
+        logger.info(f"Pipelining {len(frames)} frames through {len(teams)} teams ({len(graph)} nodes)")
+        # Earlier frames first, so their merges aren't starved by later frames' analyses
+        await run_dag(
+            graph, run_node,
+            max_concurrency=get_settings().pipeline_concurrency,
+            rank=lambda node: node[0],
+        )
+        await asyncio.gather(*frame_points)  # the series is complete when the simulation is
+
+        for team in teams:
+            if team.team_type.value not in results:  # no frames to analyze
+                results[team.team_type.value] = await team.complete(simulation_id, [], reused)
+        return {team_type.value: results[team_type.value] for team_type in TeamType.execution_order()}
+
     async def get_simulation_results(self, simulation_id: str) -> dict[str, Any]:
         """Get current results for a simulation."""
         status = await redis_client.get_simulation_status(simulation_id)
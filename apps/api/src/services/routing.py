@@ -1,7 +1,16 @@
 from __future__ import annotations
 
+from datetime import datetime
+from functools import lru_cache
 from math import atan2, cos, radians, sin, sqrt
 from typing import Any
+from zoneinfo import ZoneInfo
+
+from ..config import get_settings
+from .compute_pool import compute_pool, vehicle_route_job
+from .metrics import load_routing
+
+VEHICLE_FACTORS = {"fire_truck": 1.2, "police": 1.1}
 
 
 def _haversine_meters(a: tuple[float, float], b: tuple[float, float]) -> float:
@@ -13,21 +22,89 @@ def _haversine_meters(a: tuple[float, float], b: tuple[float, float]) -> float:
     return 2 * 6_371_000 * atan2(sqrt(h), sqrt(1 - h))
 
 
-async def optimize_vehicle_route(origin: dict[str, float], destination: dict[str, float], vehicle_type: str) -> dict[str, Any]:
+@lru_cache(maxsize=1)
+def _get_speed_profiles(path: str):
+    """Memory-map the speed profile file once per process."""
+    _traffic = load_routing("traffic")
+    return _traffic.SpeedProfiles.load(path)
+
+
+def _local_departure(departure_time: datetime | None, tz_name: str) -> datetime:
+    """Departure in the road network's local time; naive times are taken as already local."""
+    tz = ZoneInfo(tz_name)
+    if departure_time is None:
+        return datetime.now(tz)
+    if departure_time.tzinfo is None:
+        return departure_time.replace(tzinfo=tz)
+    return departure_time.astimezone(tz)
+
+
+def _profile_route(
+    profiles: Any,
+    origin: dict[str, float],
+    destination: dict[str, float],
+    departure: datetime,
+) -> tuple[float, list[dict[str, float]]] | None:
+    """Time-dependent ETA over the profiled road network, or None if unreachable."""
+    _optimizer = load_routing("optimizer")
+    src = profiles.nearest_node(origin["lat"], origin["lng"])
+    dst = profiles.nearest_node(destination["lat"], destination["lng"])
+    result = _optimizer.RouteSolver().solve_time_dependent(profiles, src, dst, departure)
+    if not result["path"]:
+        return None
+    coords = [
+        {"lat": float(profiles.node_lat[n]), "lng": float(profiles.node_lng[n])}
+        for n in result["path"]
+    ]
+    return result["eta_seconds"], [origin, *coords, destination]
+
+
+def route_on_profiles(
+    profiles_path: str,
+    origin: dict[str, float],
+    destination: dict[str, float],
+    departure: datetime,
+) -> tuple[float, list[dict[str, float]]] | None:
+    """``_profile_route`` over the speed profiles at ``profiles_path``, mapped once per process."""
+    return _profile_route(_get_speed_profiles(profiles_path), origin, destination, departure)
+
+
+async def optimize_vehicle_route(
+    origin: dict[str, float],
+    destination: dict[str, float],
+    vehicle_type: str,
+    departure_time: datetime | None = None,
+) -> dict[str, Any]:
     if not origin or not destination:
         return {}
-    estimated_seconds = int(_haversine_meters((origin["lat"], origin["lng"]), (destination["lat"], destination["lng"])) / 20)
-    if vehicle_type == "fire_truck":
-        estimated_seconds = int(estimated_seconds * 1.2)
-    elif vehicle_type == "police":
-        estimated_seconds = int(estimated_seconds * 1.1)
+    settings = get_settings()
+    departure = _local_departure(departure_time, settings.traffic_timezone)
+
+    route = None
+    if settings.traffic_profiles_path:
+        # Dijkstra over the whole road network: keep it off the event loop
+        route = await compute_pool.run(
+            vehicle_route_job, settings.traffic_profiles_path, origin, destination, departure,
+        )
+
+    if route is not None:
+        seconds, coordinates = route
+        source = "speed_profiles"
+    else:
+        seconds = _haversine_meters((origin["lat"], origin["lng"]), (destination["lat"], destination["lng"])) / 20
+        coordinates = [origin, destination]
+        source = "straight_line"
+
+    estimated_seconds = int(seconds * VEHICLE_FACTORS.get(vehicle_type, 1.0))
 
     return {
         "origin": origin,
         "destination": destination,
         "vehicle_type": vehicle_type,
         "optimal_route": {
-            "coordinates": [origin, destination],
+            "coordinates": coordinates,
         },
         "estimated_time_seconds": estimated_seconds,
+        "departure_time": departure.isoformat(),
+        "eta_source": source,
     }
@@ -0,0 +1,63 @@
+"""Single-flight coalescing of identical in-flight inference calls.
+
+When several agent instances send the same prompt on the same frame to the
+same backend at the same time, only the first caller (the leader) runs the
+call; the others await the leader's result. Nothing is remembered once the
+call settles — that is the inference cache's job — so sequential calls are
+never coalesced.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Collapse concurrent calls that share a key into one."""
+
+    def __init__(self):
+        self._inflight: dict[Hashable, asyncio.Future] = {}
+        self._counters = {"calls": 0, "coalesced": 0}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """Run ``fn`` unless a call with ``key`` is already in flight.
+
+        Followers receive the leader's result object (or exception) as is;
+        callers that mutate the result must copy it first.
+        """
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self._counters["coalesced"] += 1
+            return await asyncio.shield(pending)
+
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        # Followers may all be gone by the time the leader fails
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._inflight[key] = future
+        self._counters["calls"] += 1
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._inflight.pop(key, None)
+
+    def stats(self) -> dict[str, Any]:
+        return {**self._counters, "in_flight": len(self._inflight)}
+
+
+# Shared by every agent instance in the process
+inference_flights = SingleFlight()
@@ -9,12 +9,17 @@ Endpoints:
 from __future__ import annotations
 
 import asyncio
+import copy
 import json
 import logging
+import uuid
 
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 
 from .redis_client import redis_client
+from .services.compute_pool import compute_pool, evacuation_job, metrics_job, personnel_job
+from .services.frame_dedup import FrameIndex, dhash
+from .services.inference_scheduler import Priority, inference_context
 from .services.telemetry import publish_telemetry
 
 logger = logging.getLogger(__name__)
@@ -111,6 +116,7 @@ async def simulation_ws(websocket: WebSocket, simulation_id: str):
         status = await redis_client.get_simulation_status(simulation_id)
         team_statuses = await redis_client.get_team_statuses(simulation_id)
         team_results = await redis_client.get_all_team_results(simulation_id)
+        metrics_series = await redis_client.get_metrics_series(simulation_id)
 
         initial_state = {
             "event": "initial_state",
@@ -123,6 +129,7 @@ async def simulation_ws(websocket: WebSocket, simulation_id: str):
                 }
                 for team in redis_client.TEAM_TYPES
             },
+            "metrics_series": metrics_series,
         }
         await websocket.send_text(json.dumps(initial_state))
     except Exception as e:
@@ -241,8 +248,18 @@ async def analysis_stream_ws(websocket: WebSocket):
     Final message: {"status": "complete", "all_results": {...}}
 
     If frame_path is "demo", uses fallback data with delays to simulate processing.
+
+    Live frames that are near-duplicates of a recent frame on the same
+    connection get that frame's results back (with a "reused_from" note)
+    instead of a new analysis.
     """
+    from .config import get_settings
+
     await websocket.accept()
+    recent_frames = FrameIndex(threshold=get_settings().frame_dedup_distance)
+    # Clients that don't name a simulation get one per connection, so their
+    # metrics series and scheduling share don't mix with other clients'
+    session_id = f"ws_{uuid.uuid4().hex[:12]}"
     try:
         while True:
             raw = await websocket.receive_text()
@@ -250,12 +267,12 @@ async def analysis_stream_ws(websocket: WebSocket):
 
             frame_path = request.get("frame_path", "demo")
             frame_id = request.get("frame_id", "ws_frame_001")
-            sim_id = request.get("simulation_id", "ws_session")
+            sim_id = request.get("simulation_id") or session_id
 
             if frame_path == "demo":
-                await _stream_demo_analysis(websocket, frame_id)
+                await _stream_demo_analysis(websocket, sim_id, frame_id)
             else:
-                await _stream_live_analysis(websocket, sim_id, frame_path, frame_id)
+                await _stream_live_analysis(websocket, sim_id, frame_path, frame_id, recent_frames)
     except WebSocketDisconnect:
         pass
 
@@ -283,20 +300,22 @@ async def _emit_team_payment(ws: WebSocket, team: str) -> None:
         logger.warning("Payment failed for team %s: %s", team, exc)
 
 
-async def _stream_demo_analysis(ws: WebSocket, frame_id: str):
+async def _record_metrics_point(sim_id: str, metrics: dict) -> None:
+    """Append a frame's metrics to the simulation time series (best effort)."""
+    try:
+        await redis_client.append_metrics_point(sim_id, metrics)
+    except Exception as exc:
+        logger.warning("Could not record metrics point for %s: %s", sim_id, exc)
+
+
+async def _stream_demo_analysis(ws: WebSocket, sim_id: str, frame_id: str):
     """Stream pre-computed demo results with simulated delays."""
     from .services.analysis import _load_wm_module
 
     _fallback = _load_wm_module("fallback")
-    _evacuation = _load_wm_module("evacuation")
-    _personnel = _load_wm_module("personnel")
-    _fire_sim = _load_wm_module("fire_sim")
 
     get_fallback_fire_severity = _fallback.get_fallback_fire_severity
     get_fallback_structural = _fallback.get_fallback_structural
-    compute_evacuation_routes = _evacuation.compute_evacuation_routes
-    recommend_personnel = _personnel.recommend_personnel
-    build_spread_timeline = _fire_sim.build_spread_timeline
 
     # Fire Severity
     await ws.send_text(json.dumps({"team": "fire_severity", "status": "running"}))
@@ -315,29 +334,29 @@ async def _stream_demo_analysis(ws: WebSocket, frame_id: str):
     # Evacuation
     await ws.send_text(json.dumps({"team": "evacuation", "status": "running"}))
     await asyncio.sleep(0.3)
-    evac = compute_evacuation_routes(fire, structural, frame_id)
+    evac = await compute_pool.run(evacuation_job, fire, structural, frame_id)
     await ws.send_text(json.dumps({"team": "evacuation", "status": "complete", "result": evac}))
     await _emit_team_payment(ws, "evacuation")
 
     # Personnel
     await ws.send_text(json.dumps({"team": "personnel", "status": "running"}))
     await asyncio.sleep(0.3)
-    personnel = recommend_personnel(
+    personnel = await compute_pool.run(
+        personnel_job,
         {"fire_severity": fire, "structural": structural, "evacuation": evac},
         frame_id,
     )
     await ws.send_text(json.dumps({"team": "personnel", "status": "complete", "result": personnel}))
     await _emit_team_payment(ws, "personnel")
 
-    # Spread timeline
-    spread = build_spread_timeline(fire)
-
-    # Observability metrics (path, survivability, heat exposure)
-    from .services.metrics import compute_all_metrics
-    metrics_snapshot = compute_all_metrics(fire, structural)
-    metrics_dict = metrics_snapshot.to_dict()
+    # Observability metrics (path, survivability, heat exposure) and the
+    # spread timeline, from one hazard state in a worker process
+    computed = await compute_pool.run(metrics_job, fire, structural, spread=True)
+    spread = computed["spread_timeline"]
+    metrics_dict = computed["metrics"]
 
     await ws.send_text(json.dumps({"event": "metrics", "metrics": metrics_dict}))
+    await _record_metrics_point(sim_id, metrics_dict)
 
     await ws.send_text(json.dumps({
         "status": "complete",
@@ -356,29 +375,48 @@ async def _stream_demo_analysis(ws: WebSocket, frame_id: str):
     }))
 
 
-async def _stream_live_analysis(ws: WebSocket, sim_id: str, frame_path: str, frame_id: str):
+async def _stream_live_analysis(
+    ws: WebSocket,
+    sim_id: str,
+    frame_path: str,
+    frame_id: str,
+    recent_frames: FrameIndex | None = None,
+):
     """Stream live analysis using the vision model."""
     from .services.analysis import run_full_analysis
 
     try:
         await ws.send_text(json.dumps({"status": "running", "frame_id": frame_id}))
-        result = await run_full_analysis(sim_id, frame_path, frame_id)
+        fingerprint, match = None, None
+        if recent_frames is not None:
+            fingerprint = await asyncio.to_thread(dhash, frame_path)
+            match = recent_frames.lookup(fingerprint)
+        if match is not None:
+            result = copy.deepcopy(match.payload)
+            result["frame_id"] = frame_id
+            result["reused_from"] = match.provenance(frame_path)
+            await ws.send_text(json.dumps({"status": "complete", "all_results": result}))
+            return
+
+        with inference_context(Priority.INTERACTIVE, tenant=sim_id):
+            result = await run_full_analysis(sim_id, frame_path, frame_id)
 
         # Compute observability metrics from live analysis results
-        from .services.metrics import compute_all_metrics
         teams = result.get("teams", {})
         fire_data = teams.get("fire_severity")
         structural_data = teams.get("structural")
         if fire_data:
-            metrics_snapshot = compute_all_metrics(fire_data, structural_data)
-            metrics_dict = metrics_snapshot.to_dict()
+            metrics_dict = (await compute_pool.run(metrics_job, fire_data, structural_data))["metrics"]
             await ws.send_text(json.dumps({"event": "metrics", "metrics": metrics_dict}))
+            await _record_metrics_point(sim_id, metrics_dict)
             result["metrics"] = metrics_dict
 
         # Distribute micropayments to all agent teams
         for team in ["fire_severity", "structural", "evacuation", "personnel"]:
             await _emit_team_payment(ws, team)
 
+        if recent_frames is not None:
+            recent_frames.add(frame_path, fingerprint, copy.deepcopy(result))
         await ws.send_text(json.dumps({"status": "complete", "all_results": result}))
     except Exception as exc:
         await ws.send_text(json.dumps({"status": "error", "error": str(exc)}))
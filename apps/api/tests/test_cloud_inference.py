@@ -0,0 +1,63 @@
+"""Tests for the cloud inference client's pre-screen handling."""
+from __future__ import annotations
+
+import asyncio
+import io
+import json
+import sys
+from pathlib import Path
+
+import httpx
+import pytest
+
+Image = pytest.importorskip("PIL.Image")
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.services import cloud_inference  # noqa: E402
+
+
+def _jpeg(flames: bool) -> bytes:
+    img = Image.new("RGB", (640, 480), (40, 70, 140))
+    if flames:
+        img.paste((255, 140, 20), (40, 40, 200, 160))  # flames in the top-left
+    buf = io.BytesIO()
+    img.save(buf, format="JPEG")
+    return buf.getvalue()
+
+
+@pytest.mark.skipif(not cloud_inference.PRESCREEN_ENABLED, reason="pre-screen disabled")
+def test_prescreened_results_use_the_cloud_schema(monkeypatch):
+    monkeypatch.setattr(cloud_inference, "get_inference_cache", lambda: None)
+    sent = []
+
+    def handler(request):
+        sent.append(json.loads(request.content))
+        return httpx.Response(200, json={
+            "fire_detected": True, "overall_severity": "high", "severity_score": 0.8,
+            "fire_locations": [{"zone_id": "blob", "intensity": "large", "coordinates": {"x": 0.5, "y": 0.5}}],
+        })
+
+    client = cloud_inference.CloudInferenceClient()
+    http = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    async def get_client():
+        return http
+
+    monkeypatch.setattr(client, "_get_client", get_client)
+
+    async def run():
+        return (
+            await client.analyze("fire_severity", _jpeg(False), frame_id="quiet"),
+            await client.analyze("fire_severity", _jpeg(True), frame_id="fire"),
+        )
+
+    quiet, fire = asyncio.run(run())
+    assert len(sent) == 1, "Only the fire frame should reach the model"
+    assert quiet["fire_detected"] is False and quiet["overall_severity"] == "none"
+    assert quiet["severity_score"] == 0.0 and quiet["fire_locations"] == []
+    assert "prescreen" in quiet
+
+    x0, y0, x1, y1 = cloud_inference.prescreen_frame(_jpeg(True)).crop_box
+    coordinates = fire["fire_locations"][0]["coordinates"]
+    assert abs(coordinates["x"] - (x0 + x1) / 2) < 1e-3 and abs(coordinates["y"] - (y0 + y1) / 2) < 1e-3
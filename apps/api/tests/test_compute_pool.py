@@ -0,0 +1,68 @@
+"""Tests for the CPU worker pool."""
+from __future__ import annotations
+
+import asyncio
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.services import metrics  # noqa: E402
+from src.services.compute_pool import ComputePool, atlas_job, evacuation_job, metrics_job  # noqa: E402
+
+_fallback = metrics._load_module("fallback", metrics._wm_src)
+
+
+@pytest.mark.parametrize("workers", [1, 0])
+def test_jobs_match_inline_results(workers):
+    fire = _fallback.get_fallback_fire_severity("f0")
+    structural = _fallback.get_fallback_structural("f0")
+    pool = ComputePool(workers=workers)
+
+    async def run():
+        return await asyncio.gather(
+            pool.run(metrics_job, fire, structural, spread=True),
+            pool.run(atlas_job, fire, structural),
+            pool.run(evacuation_job, fire, structural, "f0"),
+        )
+
+    try:
+        computed, atlas, evacuation = asyncio.run(run())
+    finally:
+        pool.shutdown()
+
+    state = metrics.build_hazard_state(fire, structural)
+    assert computed["metrics"] == metrics.compute_all_metrics(fire, structural, state=state).to_dict()
+    assert computed["spread_timeline"] == state.spread_timeline()
+    np.testing.assert_array_equal(atlas.time_to_danger_min, metrics.compute_survivability_atlas(state).time_to_danger_min)
+    assert evacuation["frame_id"] == "f0"
+
+    stats = pool.stats()
+    assert stats["mode"] == ("process" if workers else "thread")
+    assert (stats["submitted"], stats["completed"], stats["failed"], stats["in_flight"]) == (3, 3, 0, 0)
+    assert stats["jobs"]["metrics_job"]["completed"] == 1
+    assert stats["jobs"]["atlas_job"]["compute_p95_seconds"] >= 0
+
+
+def test_cua_endpoints_score_paths_in_the_pool(monkeypatch):
+    from src.routers import metrics as metrics_router
+
+    pool = ComputePool(workers=0)
+    monkeypatch.setattr(metrics_router, "compute_pool", pool)
+    fire = _fallback.get_fallback_fire_severity("demo")
+    structural = _fallback.get_fallback_structural("demo")
+    paths = [["Lobby", "C1300", "1302"], ["Lobby", "C1300"]]
+
+    single = asyncio.run(metrics_router.compare_cua_path(metrics_router.CuaPathRequest(cua_path=paths[0])))
+    batch = asyncio.run(metrics_router.compare_cua_paths_batch(metrics_router.CuaBatchRequest(paths=paths)))
+
+    state = metrics.build_hazard_state(fire, structural)
+    optimal = metrics.compute_all_metrics(fire, structural, "Lobby", "1302", state=state)
+    assert single["optimal"] == batch["optimal"] == optimal.to_dict()
+    heat = metrics.compute_heat_exposure(paths[0], fire, structural, state=state)
+    assert single["cua"]["heat_exposure"]["total_score"] == heat.total_score
+    assert batch["heat_exposure"] == metrics.score_paths(paths, state)["heat_exposure"].tolist()
+    assert set(pool.stats()["jobs"]) == {"cua_path_job", "cua_batch_job"}
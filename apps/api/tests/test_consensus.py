@@ -0,0 +1,70 @@
+"""Tests for the field-wise team consensus."""
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.services.consensus import build_consensus  # noqa: E402
+from src.services.metrics import load_world_model  # noqa: E402
+
+
+def _fire(severity, smoke, locations, confidence=0.8, **extra):
+    return {
+        "frame_id": "f0", "severity": severity, "smoke_density": smoke, "confidence": confidence,
+        "fire_locations": locations, "structural_integrity": {"load_bearing": extra.get("load_bearing", True)},
+        "frame_refs": extra.get("frame_refs", ["f0.jpg"]),
+    }
+
+
+def test_fields_are_merged_independently_with_agreement():
+    kitchen = {"label": "kitchen", "coordinates": {"x": 4.0, "y": 2.0}, "intensity": 0.8}
+    results = [
+        _fire(7, "heavy", [kitchen], confidence=0.9),
+        _fire(7, "heavy", [{**kitchen, "coordinates": {"x": 5.0, "y": 2.5}, "intensity": 0.6}],
+              confidence=0.7, frame_refs=["f1.jpg"]),
+        _fire(2, "light", [kitchen, {"label": "garage", "coordinates": {"x": 40.0, "y": 30.0}}],
+              confidence=0.3, load_bearing=False),
+    ]
+    consensus = build_consensus(results)
+
+    assert consensus["frame_id"] == "f0"
+    assert consensus["severity"] == 7 and isinstance(consensus["severity"], int)
+    assert consensus["smoke_density"] == "heavy"
+    assert consensus["structural_integrity"] == {"load_bearing": True}
+    assert consensus["frame_refs"] == ["f0.jpg", "f1.jpg"]
+    # The kitchen reports merge into one location; the garage has one supporter of three
+    [location] = consensus["fire_locations"]
+    assert location["label"] == "kitchen" and location["support"] == 1.0
+    assert location["coordinates"] == {"x": 4.0, "y": 2.0}
+
+    meta = consensus["consensus_metadata"]
+    assert meta["num_instances"] == 3
+    assert meta["disputed_fields"]["severity"] == round(2 / 3, 3)
+    assert "confidence" not in meta["disputed_fields"]
+    assert 0.5 < meta["agreement_score"] < 1.0
+
+
+def test_unanimous_results_agree_fully_and_trimmed_mean_drops_outliers():
+    same = [_fire(5, "moderate", [], confidence=c) for c in (0.9, 0.85, 0.88)]
+    assert build_consensus(same)["consensus_metadata"]["agreement_score"] == 1.0
+    assert build_consensus(same[:1]) is same[0]
+    assert build_consensus([]) == {}
+
+    spread = [{"temperature": t} for t in (100.0, 101.0, 102.0, 103.0, 900.0)]
+    consensus = build_consensus(spread)
+    assert consensus["temperature"] == 102.0
+    assert consensus["consensus_metadata"]["disputed_fields"] == {"temperature": 0.8}
+
+
+def test_context_renders_follow_the_consensus_not_its_frame_identity():
+    # A consensus keeps its first instance's frame_id and timestamp as more instances arrive
+    compactor = load_world_model("context_compact").ContextCompactor()
+    stamped = [{**_fire(s, "heavy", []), "timestamp": "2026-01-01T00:00:00Z"} for s in (2, 6, 9)]
+    early, late = build_consensus(stamped[:2]), build_consensus(stamped)
+    assert (early["frame_id"], early["timestamp"]) == (late["frame_id"], late["timestamp"])
+
+    rendered = [compactor.render(r, ("severity",)) for r in (stamped[0], early, late)]
+    assert rendered == ['{"severity":2}', f'{{"severity":{early["severity"]}}}', f'{{"severity":{late["severity"]}}}']
+    assert early["severity"] != late["severity"]
@@ -0,0 +1,153 @@
+"""Tests for the DAG executor and the frame-pipelined orchestrator."""
+from __future__ import annotations
+
+import asyncio
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.redis_client import RedisClient  # noqa: E402
+from src.services import orchestrator  # noqa: E402
+from src.services.dag import critical_path_lengths, run_dag  # noqa: E402
+
+
+def test_nodes_run_after_dependencies_critical_path_first():
+    graph = {"a1": [], "b1": ["a1"], "a2": [], "b2": ["a2"], "lone": []}
+    assert critical_path_lengths(graph) == {"a1": 2, "b1": 1, "a2": 2, "b2": 1, "lone": 1}
+    order = []
+
+    async def run(node, upstream):
+        order.append(node)
+        await asyncio.sleep(0)
+        return f"{node}<{','.join(upstream.values())}>"
+
+    results = asyncio.run(run_dag(graph, run, max_concurrency=1))
+    assert order == ["a1", "a2", "b1", "b2", "lone"]
+    assert results["b2"] == "b2<a2<>>"
+
+    # A rank outweighs path length: group 1 finishes before group 2 starts
+    order.clear()
+    asyncio.run(run_dag(graph, run, max_concurrency=1, rank=lambda n: int(n[-1]) if n[-1].isdigit() else 3))
+    assert order == ["a1", "b1", "a2", "b2", "lone"]
+
+    with pytest.raises(ValueError, match="cycle"):
+        asyncio.run(run_dag({"x": ["y"], "y": ["x"]}, run))
+
+    async def failing(node, upstream):
+        if node == "a1":
+            raise RuntimeError("boom")
+        await asyncio.sleep(1)
+
+    with pytest.raises(RuntimeError, match="boom"):
+        asyncio.run(asyncio.wait_for(run_dag(graph, failing), 0.5))
+
+
+def test_first_frame_finishes_all_teams_while_second_is_in_fire_analysis(monkeypatch):
+    client = RedisClient()
+    server = fakeredis.FakeServer()
+    client._client = fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+    client._binary = fakeredis.FakeAsyncRedis(server=server)
+    monkeypatch.setattr(orchestrator, "redis_client", client)
+    monkeypatch.setattr(orchestrator, "get_settings", lambda: SimpleNamespace(
+        inference_mode="local", diverse_sample_teams="", frame_dedup_distance=-1,
+        pipeline_mode="frames", pipeline_concurrency=8,
+        team_quorum="", quorum_min_agreement=0.8, quorum_laggards="cancel",
+    ))
+    events = []
+    analyze_local = orchestrator.AgentInstance._analyze_local
+    merge_frame = orchestrator.Team.merge_frame
+
+    async def slow_second_fire(self, frame_path):
+        if self.team_type is orchestrator.TeamType.FIRE_SEVERITY and frame_path == "f1.jpg":
+            await asyncio.sleep(0.2)
+            events.append(("fire analyzed", frame_path))
+        return await analyze_local(self, frame_path)
+
+    async def record_merge(self, simulation_id, independent_results, upstream_context):
+        merged = await merge_frame(self, simulation_id, independent_results, upstream_context)
+        events.append((f"{self.team_type.value} merged", merged[0]["frame_refs"][0]))
+        return merged
+
+    monkeypatch.setattr(orchestrator.AgentInstance, "_analyze_local", slow_second_fire)
+    monkeypatch.setattr(orchestrator.Team, "merge_frame", record_merge)
+
+    results = asyncio.run(orchestrator.Orchestrator(instances_per_team=2).run_simulation("sim", ["f0.jpg", "f1.jpg"]))
+    assert events.index(("personnel merged", "f0.jpg")) < events.index(("fire analyzed", "f1.jpg"))
+    assert events[-1] == ("personnel merged", "f1.jpg")
+    assert set(results) == {"fire_severity", "structural", "evacuation", "personnel"}
+    assert results["personnel"]["consensus_metadata"]["num_instances"] == 4
+
+
+def test_earlier_frames_merge_before_later_frames_are_analyzed(monkeypatch):
+    client = RedisClient()
+    server = fakeredis.FakeServer()
+    client._client = fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+    client._binary = fakeredis.FakeAsyncRedis(server=server)
+    monkeypatch.setattr(orchestrator, "redis_client", client)
+    monkeypatch.setattr(orchestrator, "get_settings", lambda: SimpleNamespace(
+        inference_mode="local", diverse_sample_teams="", frame_dedup_distance=-1,
+        pipeline_mode="frames", pipeline_concurrency=1,
+        team_quorum="", quorum_min_agreement=0.8, quorum_laggards="cancel",
+    ))
+    events = []
+    analyze_frame = orchestrator.Team.analyze_frame
+    merge_frame = orchestrator.Team.merge_frame
+
+    async def record_analyze(self, simulation_id, frame):
+        events.append(("analyze", frame))
+        return await analyze_frame(self, simulation_id, frame)
+
+    async def record_merge(self, simulation_id, independent_results, upstream_context):
+        merged = await merge_frame(self, simulation_id, independent_results, upstream_context)
+        events.append(("merge", merged[0]["frame_refs"][0]))
+        return merged
+
+    monkeypatch.setattr(orchestrator.Team, "analyze_frame", record_analyze)
+    monkeypatch.setattr(orchestrator.Team, "merge_frame", record_merge)
+
+    asyncio.run(orchestrator.Orchestrator(instances_per_team=1).run_simulation("sim", ["f0.jpg", "f1.jpg"]))
+    frames = [frame for _, frame in events]
+    assert frames == ["f0.jpg"] * 8 + ["f1.jpg"] * 8
+
+
+def test_pipeline_records_a_series_point_per_frame(monkeypatch):
+    from src.services import metrics_refresh
+    from src.services.compute_pool import ComputePool
+    from src.services.metrics import load_world_model
+
+    client = RedisClient()
+    server = fakeredis.FakeServer()
+    client._client = fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+    client._binary = fakeredis.FakeAsyncRedis(server=server)
+    monkeypatch.setattr(orchestrator, "redis_client", client)
+    monkeypatch.setattr(metrics_refresh, "redis_client", client)
+    monkeypatch.setattr(metrics_refresh, "compute_pool", ComputePool(workers=0))
+    fallback = load_world_model("fallback")
+    analyze_local = orchestrator.AgentInstance._analyze_local
+
+    async def vision_shaped_fire(self, frame_path):
+        # The local stub answers in the cloud schema; metrics read the vision one
+        if self.team_type is orchestrator.TeamType.FIRE_SEVERITY:
+            return {**fallback.get_fallback_fire_severity(frame_path), "frame_refs": [frame_path]}
+        return await analyze_local(self, frame_path)
+
+    monkeypatch.setattr(orchestrator.AgentInstance, "_analyze_local", vision_shaped_fire)
+    monkeypatch.setattr(orchestrator, "get_settings", lambda: SimpleNamespace(
+        inference_mode="local", diverse_sample_teams="", frame_dedup_distance=-1,
+        pipeline_mode="frames", pipeline_concurrency=8,
+        team_quorum="", quorum_min_agreement=0.8, quorum_laggards="cancel",
+    ))
+
+    async def run():
+        await orchestrator.Orchestrator(instances_per_team=2).run_simulation("sim", ["f0.jpg", "f1.jpg", "f2.jpg"])
+        return await client.get_metrics_series("sim")
+
+    series = asyncio.run(run())
+    assert sorted(series["frame"]) == [0, 1, 2]
+    assert series["seq"] == [1, 2, 3]
@@ -0,0 +1,76 @@
+"""Tests for perceptual-hash frame deduplication."""
+from __future__ import annotations
+
+import asyncio
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from PIL import Image
+
+fakeredis = pytest.importorskip("fakeredis")
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.redis_client import RedisClient  # noqa: E402
+from src.services import orchestrator  # noqa: E402
+from src.services.frame_dedup import dedupe_frames, dhash  # noqa: E402
+
+
+def _frames(tmp_path) -> list[str]:
+    """Two near-identical renders of one scene, then a different scene."""
+    rng = np.random.default_rng(0)
+    scene = np.kron(rng.integers(0, 255, (12, 16, 3)), np.ones((40, 40, 1))).astype(np.uint8)
+    noisy = np.clip(scene + rng.integers(-6, 7, scene.shape), 0, 255).astype(np.uint8)
+    other = np.kron(rng.integers(0, 255, (12, 16, 3)), np.ones((40, 40, 1))).astype(np.uint8)
+    paths = []
+    for name, pixels, quality in (("a", scene, 90), ("a2", noisy, 70), ("b", other, 90)):
+        path = tmp_path / f"{name}.jpg"
+        Image.fromarray(pixels).save(path, quality=quality)
+        paths.append(str(path))
+    return paths
+
+
+def test_near_duplicates_reuse_earlier_frame(tmp_path):
+    a, a2, b = _frames(tmp_path)
+    assert (dhash(a) ^ dhash(a2)).bit_count() <= 6
+    assert (dhash(a) ^ dhash(b)).bit_count() > 16
+    assert dhash(b"not an image") is None
+
+    distinct, reused = dedupe_frames([a, a2, b, a])
+    assert distinct == [a, b]
+    assert [(r["frame"], r["reused_from"]) for r in reused] == [(a2, a), (a, a)]
+    assert reused[1]["hamming_distance"] == 0
+
+    assert dedupe_frames([a, a2, b], threshold=-1) == ([a, a2, b], [])
+
+
+@pytest.mark.parametrize("pipeline_mode", ["frames", "teams"])
+def test_simulation_analyzes_distinct_frames_only(tmp_path, monkeypatch, pipeline_mode):
+    a, a2, b = _frames(tmp_path)
+    client = RedisClient()
+    server = fakeredis.FakeServer()
+    client._client = fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+    client._binary = fakeredis.FakeAsyncRedis(server=server)
+    monkeypatch.setattr(orchestrator, "redis_client", client)
+    monkeypatch.setattr(orchestrator, "get_settings", lambda: SimpleNamespace(
+        inference_mode="local", diverse_sample_teams="", frame_dedup_distance=6,
+        pipeline_mode=pipeline_mode, pipeline_concurrency=8,
+        team_quorum="", quorum_min_agreement=0.8, quorum_laggards="cancel",
+    ))
+    analyzed = []
+    analyze_local = orchestrator.AgentInstance._analyze_local
+
+    async def spy(self, frame_path):
+        analyzed.append(frame_path)
+        return await analyze_local(self, frame_path)
+
+    monkeypatch.setattr(orchestrator.AgentInstance, "_analyze_local", spy)
+
+    results = asyncio.run(orchestrator.Orchestrator(instances_per_team=1).run_simulation("sim", [a, a2, b]))
+    assert sorted(set(analyzed)) == sorted([a, b])
+    for team in results.values():
+        (entry,) = team["reused_frames"]
+        assert (entry["frame"], entry["reused_from"]) == (a2, a)
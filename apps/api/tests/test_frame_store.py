@@ -0,0 +1,77 @@
+"""Tests for decode-once frame preprocessing."""
+from __future__ import annotations
+
+import asyncio
+import sys
+from io import BytesIO
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.services import frame_store as module  # noqa: E402
+from src.services.frame_store import FrameStore  # noqa: E402
+
+
+def test_frames_prepared_once_and_refcounted(tmp_path, monkeypatch):
+    frame = tmp_path / "frame.png"
+    frame.write_bytes(b"\x89PNG small frame")
+    calls = []
+    prepare = module.prepare_frame
+    monkeypatch.setattr(module, "prepare_frame", lambda p: calls.append(p) or prepare(p))
+
+    async def run():
+        store = FrameStore()
+        first = await store.acquire("sim1", [str(frame), str(frame), str(tmp_path / "missing.png")])
+        await store.acquire("sim2", [str(frame)])
+        assert calls == [str(frame), str(tmp_path / "missing.png")]
+        assert list(first) == [str(frame)]
+        assert first[str(frame)].media_type == "image/png"
+
+        store.release("sim1")
+        assert store.get(str(frame)) is first[str(frame)]
+        store.release("sim2")
+        assert store.get(str(frame)) is None
+        assert store.stats() == {"frames": 0, "bytes": 0, "simulations": 0}
+
+    asyncio.run(run())
+
+
+def test_oversized_frame_downscaled_to_jpeg(tmp_path, monkeypatch):
+    Image = pytest.importorskip("PIL.Image")
+    monkeypatch.setattr(module, "MAX_IMAGE_BYTES", 1000)
+    buf = BytesIO()
+    Image.new("RGBA", (2048, 1024), (255, 80, 0, 255)).save(buf, format="PNG")
+    frame = tmp_path / "big.png"
+    frame.write_bytes(buf.getvalue())
+
+    prepared = module.prepare_frame(str(frame))
+    assert prepared.media_type == "image/jpeg"
+    assert Image.open(BytesIO(prepared.data)).size == (module.MAX_IMAGE_DIMENSION, 512)
+
+
+def test_vision_teams_receive_the_prepared_frame(tmp_path, monkeypatch):
+    from src.services import analysis
+
+    frame = tmp_path / "frame.png"
+    frame.write_bytes(b"\x89PNG small frame")
+    store = FrameStore()
+    monkeypatch.setattr(analysis, "frame_store", store)
+    seen = []
+
+    async def vision_analyze_frame(frame, team_type, **kwargs):
+        seen.append(frame)
+        return {"severity": 1}
+
+    monkeypatch.setattr(analysis._vision, "analyze_frame", vision_analyze_frame)
+
+    async def run():
+        await analysis.run_single_team(str(frame), "fire_severity")
+        await store.acquire("sim1", [str(frame)])
+        await analysis.run_single_team(str(frame), "fire_severity")
+
+    asyncio.run(run())
+    assert seen[0] == str(frame)
+    assert isinstance(seen[1], analysis._vision.EncodedFrame)
+    assert analysis._vision._encode_image(seen[1]) == (seen[1].b64, "image/png")
@@ -0,0 +1,111 @@
+"""Tests for latency-aware inference routing with hedged requests."""
+from __future__ import annotations
+
+import asyncio
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.services import cloud_inference, openai_inference, orchestrator  # noqa: E402
+from src.services.inference_router import InferenceRouter  # noqa: E402
+
+
+def _backend(name, delay, log, fail=False):
+    async def call():
+        log.append(f"{name}:start")
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            log.append(f"{name}:cancelled")
+            raise
+        if fail:
+            raise RuntimeError(f"{name} down")
+        return {"backend": name}
+    return call
+
+
+def test_routes_to_fastest_and_fails_over():
+    router = InferenceRouter()
+    for _ in range(5):
+        router.stats_for("slow").record(0.5, True)
+        router.stats_for("fast").record(0.01, True)
+    assert router.rank(["slow", "fast"]) == ["fast", "slow"]
+
+    async def run():
+        log = []
+        backend, result = await router.call(
+            {"slow": _backend("slow", 0.01, log), "fast": _backend("fast", 0, log, fail=True)},
+            hedge=False,
+        )
+        assert (backend, result) == ("slow", {"backend": "slow"})
+        assert log == ["fast:start", "slow:start"]
+
+        with pytest.raises(RuntimeError, match="slow down"):
+            await router.call({"slow": _backend("slow", 0, [], fail=True)}, hedge=False)
+
+    asyncio.run(run())
+    assert router.stats()["fast"]["calls"] == 6
+
+
+def test_hedge_fires_past_p95_and_cancels_loser():
+    router = InferenceRouter()
+    for _ in range(5):
+        router.stats_for("primary").record(0.02, True)
+        router.stats_for("backup").record(0.03, True)
+
+    async def run():
+        log = []
+        backend, _ = await router.call({
+            "primary": _backend("primary", 1.0, log),  # stalls well past its p95
+            "backup": _backend("backup", 0.01, log),
+        })
+        return backend, log
+
+    backend, log = asyncio.run(run())
+    assert backend == "backup"
+    assert log == ["primary:start", "backup:start", "primary:cancelled"]
+    assert router.stats()["backup"]["hedges"] == 1
+
+
+def test_routed_mode_tags_winning_backend(monkeypatch):
+    async def broken_remote(**kwargs):
+        raise cloud_inference.CloudInferenceError("endpoint down")
+
+    async def fake_openai(frame_path, team_type, context=None, frame_id="unknown", on_partial=None):
+        return {"severity_score": 0.4, "frame_id": frame_id, "frame_refs": [frame_id]}
+
+    monkeypatch.setattr(orchestrator, "get_settings", lambda: SimpleNamespace(
+        inference_mode="routed", inference_backends="cloud,openai",
+    ))
+    monkeypatch.setattr(orchestrator, "inference_router", InferenceRouter())
+    monkeypatch.setattr(cloud_inference, "analyze_remote", broken_remote)
+    monkeypatch.setattr(openai_inference, "run_single_team_openai", fake_openai)
+    instance = orchestrator.AgentInstance("fire_severity_0", orchestrator.TeamType.FIRE_SEVERITY)
+
+    result = asyncio.run(instance.analyze_independent("frame.jpg"))
+    assert result["inference_mode"] == "openai"
+    assert result["frame_id"] == "fire_severity_0_frame.jpg"
+    assert orchestrator.inference_router.stats()["cloud"]["error_rate"] == 1.0
+
+
+def test_backend_that_keeps_losing_hedges_drops_in_rank():
+    router = InferenceRouter()
+    for _ in range(5):
+        router.stats_for("primary").record(0.02, True)  # fast history, now stalling
+        router.stats_for("backup").record(0.05, True)
+    assert router.rank(["primary", "backup"]) == ["primary", "backup"]
+
+    async def run():
+        for _ in range(6):
+            await router.call({
+                "primary": _backend("primary", 1.0, []),
+                "backup": _backend("backup", 0.05, []),
+            })
+
+    asyncio.run(run())
+    assert router.rank(["primary", "backup"]) == ["backup", "primary"]
+    assert router.stats()["primary"]["p50_seconds"] >= 0.07
@@ -0,0 +1,67 @@
+"""Tests for the priority- and simulation-fair inference scheduler."""
+from __future__ import annotations
+
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.services.inference_scheduler import InferenceScheduler, Priority, inference_context  # noqa: E402
+
+
+async def _run_queued(scheduler: InferenceScheduler, calls: list[tuple[Priority, str, str]]) -> list[str]:
+    """Queue ``calls`` behind one held slot, release it, and return the order they ran in."""
+    order: list[str] = []
+    gate = asyncio.Event()
+
+    async def hold():
+        async with scheduler.slot("ollama", capacity=1):
+            await gate.wait()
+
+    async def call(priority, tenant, name):
+        with inference_context(priority, tenant):
+            async with scheduler.slot("ollama", capacity=1):
+                order.append(name)
+                await asyncio.sleep(0)
+
+    holder = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+    tasks = [asyncio.create_task(call(*c)) for c in calls]
+    await asyncio.sleep(0)
+    assert scheduler.stats()["ollama"]["queued"] == len(calls)
+    gate.set()
+    await asyncio.gather(holder, *tasks)
+    return order
+
+
+def test_priority_classes_then_round_robin_across_simulations():
+    scheduler = InferenceScheduler()
+    calls = [(Priority.BATCH, "export", "batch")]
+    calls += [(Priority.NORMAL, "big", f"big{i}") for i in range(3)]
+    calls += [(Priority.NORMAL, "small", "small0")]
+    calls += [(Priority.INTERACTIVE, "live", "live")]
+
+    order = asyncio.run(_run_queued(scheduler, calls))
+    assert order == ["live", "big0", "small0", "big1", "big2", "batch"]
+
+    stats = scheduler.stats()["ollama"]
+    assert (stats["in_use"], stats["queued"]) == (0, 0)
+    assert stats["granted_by_priority"] == {"interactive": 1, "critical": 0, "normal": 5, "batch": 1}
+
+
+def test_cancelled_waiter_gives_up_its_place():
+    scheduler = InferenceScheduler()
+
+    async def run():
+        async with scheduler.slot("cloud", capacity=1):
+            waiter = asyncio.create_task(scheduler.acquire("cloud", priority=Priority.CRITICAL))
+            await asyncio.sleep(0)
+            assert scheduler.stats()["cloud"]["queued_by_priority"]["critical"] == 1
+            waiter.cancel()
+            await asyncio.gather(waiter, return_exceptions=True)
+            assert scheduler.stats()["cloud"]["queued"] == 0
+        async with scheduler.slot("cloud"):
+            return scheduler.stats()["cloud"]["in_use"]
+
+    assert asyncio.run(run()) == 1
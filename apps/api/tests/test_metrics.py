@@ -0,0 +1,157 @@
+"""Tests for the observability metrics service."""
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+# Import the API as the `src` package (relative imports work)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.services import metrics  # noqa: E402
+
+_fallback = metrics._load_module("fallback", metrics._wm_src)
+_fire_sim = metrics._load_module("fire_sim", metrics._wm_src)
+
+
+def _payload(frame_id: str = "test_frame"):
+    return (
+        _fallback.get_fallback_fire_severity(frame_id),
+        _fallback.get_fallback_structural(frame_id),
+    )
+
+
+def test_hazard_state_single_graph_and_simulation(monkeypatch):
+    fire, structural = _payload()
+    _graph_mod = metrics._load_module("graph", metrics._routing_src)
+    calls = {"graph": 0, "spread": 0}
+    build_graph = _graph_mod.build_building_graph
+    simulate = _fire_sim.simulate_spread
+
+    def counting_graph(*args, **kwargs):
+        calls["graph"] += 1
+        return build_graph(*args, **kwargs)
+
+    def counting_spread(*args, **kwargs):
+        calls["spread"] += 1
+        return simulate(*args, **kwargs)
+
+    monkeypatch.setattr(_graph_mod, "build_building_graph", counting_graph)
+    monkeypatch.setattr(_fire_sim, "simulate_spread", counting_spread)
+
+    state = metrics.build_hazard_state(fire, structural)
+    snapshot = metrics.compute_all_metrics(fire, structural, state=state)
+    metrics.compute_heat_exposure(["Lobby", "C1300"], fire, structural, state=state)
+    metrics.compute_survivability_window(["Lobby", "C1300"], fire, state=state)
+
+    assert calls == {"graph": 1, "spread": 1}
+    assert snapshot.optimized_path.path[0] == "Lobby"
+
+
+def test_hazard_state_matches_standalone_metrics():
+    fire, structural = _payload()
+    state = metrics.build_hazard_state(fire, structural)
+    path = ["Lobby", "C1300", "C1200", "1210"]
+
+    assert metrics.compute_heat_exposure(path, fire, structural) == \
+        metrics.compute_heat_exposure(path, fire, structural, state=state)
+    assert metrics.compute_survivability_window(path, fire) == \
+        metrics.compute_survivability_window(path, fire, state=state)
+    assert state.spread_timeline() == _fire_sim.build_spread_timeline(fire)
+
+
+def test_simulate_spread_matches_stepwise_model():
+    rooms = [
+        _fire_sim.Room("A", 0.7, ["B"], fuel_level="high"),
+        _fire_sim.Room("B", 0.0, ["A", "C"], has_stairwell=True),
+        _fire_sim.Room("C", 0.2, ["B"]),
+    ]
+    spread = _fire_sim.simulate_spread(rooms, time_steps_min=20)
+    room_map = {r.name: r for r in rooms}
+
+    for i, room in enumerate(rooms):
+        rate = _fire_sim.compute_room_spread_rate(room, [room_map[a] for a in room.has_door_to])
+        current = room.fire_intensity
+        for t in range(1, 21):
+            current = min(1.0, current + rate)
+            assert spread.intensities[i, t] == current
+
+
+def test_survivability_atlas_latest_departure():
+    # Exit <- Hall <- Office, with the hall catching fire before the office
+    rooms = [
+        {"name": "Exit", "adjacent": ["Hall"], "is_exterior": True},
+        {"name": "Hall", "adjacent": ["Exit", "Office"]},
+        {"name": "Office", "adjacent": ["Hall"]},
+    ]
+    fire = {"severity": 3, "fire_locations": [{"label": "Hall", "intensity": 0.5}]}
+    state = metrics.build_hazard_state(fire, None, rooms)
+    atlas = metrics.compute_survivability_atlas(state).to_dict()
+
+    assert atlas["rooms"] == ["Exit", "Hall", "Office"]
+    assert atlas["egress_seconds"] == [0.0, 15.0, 30.0]
+    assert atlas["nearest_exit"] == ["Exit", "Exit", "Exit"]
+    hall_danger = atlas["time_to_danger_min"][1]
+    assert hall_danger == 2
+    # Office occupants must be through the hall before it turns dangerous
+    assert atlas["latest_safe_departure_min"][2] == hall_danger - 0.25
+    assert atlas["viable"] == [True, True, True]
+
+
+def test_survivability_atlas_room_already_on_fire_is_not_viable():
+    rooms = [
+        {"name": "Exit", "adjacent": ["Hall"], "is_exterior": True},
+        {"name": "Hall", "adjacent": ["Exit", "Office"]},
+        {"name": "Office", "adjacent": ["Hall"]},
+    ]
+    fire = {"severity": 9, "fire_locations": [{"label": "Office", "intensity": 1.0}]}
+    state = metrics.build_hazard_state(fire, None, rooms)
+    atlas = metrics.compute_survivability_atlas(state).to_dict()
+
+    assert atlas["time_to_danger_min"][2] == 0
+    assert atlas["viable"][2] is False
+    # Same verdict as the per-path window for a walk out of that room
+    window = metrics.compute_survivability_window(["Office", "Hall", "Exit"], fire, state=state)
+    assert window.viable is False
+
+
+def test_score_paths_matches_single_path_metrics():
+    fire, structural = _payload()
+    fire["fire_locations"].append({"label": "C1300", "intensity": 0.7})
+    state = metrics.build_hazard_state(fire, structural)
+    paths = [
+        ["Lobby", "C1300", "1302"],
+        [],
+        ["Lobby", "C1300", "C1200", "C1300", "1304"],
+        ["Nowhere"],
+        ["West_Exit", "C1200", "1210"],
+    ]
+    scores = metrics.score_paths(paths, state)
+
+    for i, path in enumerate(paths):
+        heat = metrics.compute_heat_exposure(path, fire, structural, state=state)
+        surv = metrics.compute_survivability_window(path, fire, state=state)
+        assert scores["heat_exposure"][i] == heat.total_score
+        expected_minutes = -1 if surv.minutes_remaining is None else surv.minutes_remaining
+        assert scores["minutes_remaining"][i] == expected_minutes
+        assert scores["viable"][i] == surv.viable
+
+
+def test_heat_dose_integrates_growth_along_walk():
+    rooms = [
+        {"name": "Exit", "adjacent": ["Hall"], "is_exterior": True},
+        {"name": "Hall", "adjacent": ["Exit"]},
+    ]
+    fire = {"severity": 0, "fire_locations": [{"label": "Hall", "intensity": 0.4}]}
+    state = metrics.build_hazard_state(fire, None, rooms)
+    rate = state.spread.intensities[1, 1] - state.spread.intensities[1, 0]
+    step = metrics.ROOM_TRAVERSAL_SEC / 60
+
+    dose = metrics.compute_heat_dose([["Hall"], ["Exit", "Hall"], []], state)
+    # Hall entered at t=0 vs t=step: the later entry sees the grown fire
+    assert dose[0] == round(0.4 * step + rate * step**2 / 2, 4)
+    assert dose[1] > dose[0]
+    assert dose[2] == 0.0
+
+    # Walks past the simulation horizon hold the last simulated intensity
+    late = metrics.compute_heat_dose([["Hall"]], state, departure_min=metrics.SIM_HORIZON_MIN + 5)
+    assert late[0] == round(state.spread.intensities[1, -1] * step, 4)
@@ -0,0 +1,86 @@
+"""Tests for the pooled Azure OpenAI client: concurrency cap, 429 backoff, counters."""
+from __future__ import annotations
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import httpx
+from openai import AsyncAzureOpenAI
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.services import openai_inference  # noqa: E402
+
+
+def _sse(content: str) -> str:
+    chunk = {"id": "c", "object": "chat.completion.chunk", "created": 0, "model": "m"}
+    events = [
+        {**chunk, "choices": [{"index": 0, "delta": {"content": content}, "finish_reason": "stop"}]},
+        {**chunk, "choices": [], "usage": {"prompt_tokens": 100, "completion_tokens": 7, "total_tokens": 107}},
+    ]
+    return "".join(f"data: {json.dumps(e)}\n\n" for e in events) + "data: [DONE]\n\n"
+
+
+def _setup(monkeypatch, handler, max_concurrency=2):
+    monkeypatch.setattr(openai_inference, "get_settings", lambda: SimpleNamespace(azure_openai_max_concurrency=max_concurrency))
+    monkeypatch.setattr(openai_inference, "get_inference_cache", lambda: None)
+    monkeypatch.setattr(openai_inference, "BACKOFF_BASE", 0.01)
+    monkeypatch.setattr(openai_inference, "_counters", dict.fromkeys(openai_inference._counters, 0))
+    monkeypatch.setattr(openai_inference, "_latencies", openai_inference.deque(maxlen=10))
+    monkeypatch.setattr(openai_inference, "_pool_loop", None)
+    monkeypatch.setattr(openai_inference, "_client", None)
+
+    def client():
+        openai_inference._ensure_pool_loop()
+        if openai_inference._client is None:
+            openai_inference._client = AsyncAzureOpenAI(
+                api_key="k", azure_endpoint="https://example.test", api_version="v", max_retries=0,
+                http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+            )
+        return openai_inference._client
+
+    monkeypatch.setattr(openai_inference, "_get_client", client)
+
+
+def test_rate_limit_retried_after_server_delay(monkeypatch):
+    attempts = []
+
+    def handler(request):
+        attempts.append(request)
+        if len(attempts) == 1:
+            return httpx.Response(429, headers={"retry-after-ms": "20"}, json={"error": {"message": "slow down"}})
+        return httpx.Response(200, text=_sse('{"severity": 4}'), headers={"content-type": "text/event-stream"})
+
+    _setup(monkeypatch, handler)
+    result = asyncio.run(openai_inference.call_openai_vision("aGk=", "image/jpeg", "prompt"))
+
+    assert result == {"severity": 4}
+    stats = openai_inference.openai_stats()
+    assert (stats["requests"], stats["rate_limited"], stats["retries"]) == (2, 1, 1)
+    assert (stats["prompt_tokens"], stats["completion_tokens"]) == (100, 7)
+    assert stats["latency_p50_seconds"] is not None and stats["in_flight"] == 0
+
+
+def test_in_flight_requests_capped(monkeypatch):
+    state = {"in_flight": 0, "peak": 0}
+
+    async def handler(request):
+        state["in_flight"] += 1
+        state["peak"] = max(state["peak"], state["in_flight"])
+        await asyncio.sleep(0.01)
+        state["in_flight"] -= 1
+        return httpx.Response(200, text=_sse('{"severity": 1}'), headers={"content-type": "text/event-stream"})
+
+    _setup(monkeypatch, handler, max_concurrency=2)
+
+    async def run():
+        return await asyncio.gather(*(
+            openai_inference.call_openai_vision("aGk=", "image/jpeg", f"prompt {i}") for i in range(6)
+        ))
+
+    results = asyncio.run(run())
+    assert results == [{"severity": 1}] * 6
+    assert state["peak"] == 2
@@ -0,0 +1,174 @@
+"""Tests for RedisClient against an in-memory Redis (fakeredis)."""
+from __future__ import annotations
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.redis_client import RedisClient  # noqa: E402
+from src.services import metrics  # noqa: E402
+
+_fallback = metrics._load_module("fallback", metrics._wm_src)
+
+
+def _client() -> RedisClient:
+    server = fakeredis.FakeServer()
+    client = RedisClient()
+    client._client = fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+    client._binary = fakeredis.FakeAsyncRedis(server=server)
+    return client
+
+
+def _metrics(cost: float, minutes: int | None, heat: float) -> dict:
+    return {
+        "optimized_path": {"total_cost": cost},
+        "survivability": {"minutes_remaining": minutes},
+        "heat_exposure": {"total_score": heat},
+    }
+
+
+def test_metrics_written_through_on_team_result(monkeypatch):
+    from src.services import metrics_refresh
+    from src.services.compute_pool import ComputePool
+
+    client = _client()
+    monkeypatch.setattr(metrics_refresh, "redis_client", client)
+    monkeypatch.setattr(metrics_refresh, "compute_pool", ComputePool(workers=0))
+
+    async def run():
+        assert await client.get_cached_metrics("sim1") is None
+
+        # Storing a result only invalidates; the recompute is scheduled separately
+        fire = _fallback.get_fallback_fire_severity("f")
+        await client.set_team_result("sim1", "fire_severity", fire)
+        assert await client.get_result_revision("sim1") == 1
+        assert await client.get_cached_metrics("sim1") is None
+        await metrics_refresh.schedule_metrics_refresh("sim1")
+        first = await client.get_cached_metrics("sim1")
+        assert first is not None and first["revision"] == 1
+
+        await client.set_team_result("sim1", "structural", _fallback.get_fallback_structural("f"))
+        assert await metrics_refresh.refresh_metrics("sim1") is not None
+        second = await client.get_cached_metrics("sim1")
+        assert second["revision"] == 2
+
+        # Series points are per frame and come from the pipeline, not from refreshes
+        assert (await client.get_metrics_series("sim1"))["seq"] == []
+        assert await metrics_refresh.record_frame_metrics("sim1", 0, fire, None) == 1
+        assert (await client.get_metrics_series("sim1"))["frame"] == [0]
+
+        # Non-metric teams don't bump the revision
+        await client.set_team_result("sim1", "evacuation", {"civilian_exits": []})
+        assert (await client.get_cached_metrics("sim1"))["revision"] == 2
+
+        assert await client.get_metrics_cache_stats() == {"hits": 3, "misses": 2}
+
+    asyncio.run(run())
+
+
+def test_stale_snapshot_is_not_served():
+    async def run():
+        client = _client()
+        await client.set_team_result("sim2", "fire_severity", _fallback.get_fallback_fire_severity("f"))
+        await client._client.incr(client._key("sim2", "result_rev"))
+
+        assert await client.get_cached_metrics("sim2") is None
+        # A compute that started before the bump must not overwrite the newer revision
+        assert not await client.set_cached_metrics("sim2", 1, {"stale": True})
+
+    asyncio.run(run())
+
+
+def test_metrics_series_ring_buffer(monkeypatch):
+    from src import redis_client as module
+
+    monkeypatch.setattr(module, "METRICS_SERIES_CAPACITY", 4)
+
+    async def run():
+        client = _client()
+        empty = await client.get_metrics_series("sim3")
+        assert empty["seq"] == []
+
+        for i in range(6):
+            await client.append_metrics_point("sim3", _metrics(1.5 + i, None if i == 2 else i, 0.25 * i))
+
+        series = await client.get_metrics_series("sim3")
+        # Capacity 4: the two oldest points were overwritten
+        assert series["seq"] == [3, 4, 5, 6]
+        assert series["path_cost"] == [3.5, 4.5, 5.5, 6.5]
+        assert series["survivability_min"] == [None, 3.0, 4.0, 5.0]
+        assert series["heat_exposure"] == [0.5, 0.75, 1.0, 1.25]
+        assert series["frame"] == [None] * 4
+
+        incremental = await client.get_metrics_series("sim3", since=5)
+        assert incremental["seq"] == [6]
+        # A limit pages forward from ``since``, oldest first
+        assert (await client.get_metrics_series("sim3", limit=2))["seq"] == [3, 4]
+        assert (await client.get_metrics_series("sim3", since=3, limit=2))["seq"] == [4, 5]
+        assert (await client.get_metrics_series("sim3", since=4, limit=8))["seq"] == [5, 6]
+
+        await client.append_metrics_point("sim3", _metrics(1.0, 1, 0.0), frame=7)
+        assert (await client.get_metrics_series("sim3", since=6))["frame"] == [7]
+
+    asyncio.run(run())
+
+
+def test_team_partial_fields_published():
+    async def run():
+        client = _client()
+        pubsub = client._client.pubsub()
+        await pubsub.subscribe("simulation:sim4:updates")
+        await pubsub.get_message(timeout=1)  # subscribe confirmation
+
+        await client.set_team_partial("sim4", "fire_severity", {"severity": 7})
+        await client.set_team_partial("sim4", "fire_severity", {"smoke_density": "heavy"})
+
+        assert await client.get_team_partial("sim4", "fire_severity") == {"severity": 7, "smoke_density": "heavy"}
+        message = await pubsub.get_message(timeout=1)
+        assert json.loads(message["data"]) == {"event": "team_partial:fire_severity", "data": {"severity": 7}}
+        await pubsub.aclose()
+
+    asyncio.run(run())
+
+
+def test_upstream_results_pushed_to_waiters():
+    async def run():
+        server = fakeredis.FakeServer()
+        local, remote = RedisClient(), RedisClient()
+        for client in (local, remote):
+            client._client = fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+            client._binary = fakeredis.FakeAsyncRedis(server=server)
+
+        fire = {"severity": 7}
+        await local.set_team_result("sim1", "fire_severity", fire)
+        loop = asyncio.get_running_loop()
+
+        # Stored before the wait: read up front. Same process: resolved directly.
+        started = loop.time()
+        waiter = asyncio.create_task(local.wait_for_team_results("sim1", ["fire_severity", "structural"], 5.0))
+        await asyncio.sleep(0.05)
+        await local.set_team_result("sim1", "structural", {"overall_integrity": "stable"})
+        results = await waiter
+        assert results == {"fire_severity": fire, "structural": {"overall_integrity": "stable"}}
+        assert loop.time() - started < 1.0
+        assert local._team_waiters == {} and local._watched == {}
+
+        # Another process: delivered over the simulation's updates channel
+        waiter = asyncio.create_task(remote.wait_for_team_results("sim2", ["evacuation"], 5.0))
+        await asyncio.sleep(0.05)
+        started = loop.time()
+        await local.set_team_result("sim2", "evacuation", {"civilian_routes": []})
+        assert await waiter == {"evacuation": {"civilian_routes": []}}
+        assert loop.time() - started < 2.0
+
+        # Nothing lands: partial results after the timeout
+        assert await local.wait_for_team_results("sim3", ["personnel"], 0.1) == {}
+
+    asyncio.run(run())
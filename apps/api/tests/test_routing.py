@@ -0,0 +1,60 @@
+"""Tests for vehicle route ETAs."""
+from __future__ import annotations
+
+import asyncio
+import sys
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.services import routing  # noqa: E402
+from src.services.compute_pool import ComputePool  # noqa: E402
+
+ORIGIN = {"lat": 40.1138, "lng": -88.2249}
+DESTINATION = {"lat": 40.1020, "lng": -88.2272}
+
+
+def test_departure_is_taken_in_network_local_time():
+    utc_rush = datetime(2026, 10, 12, 13, 30, tzinfo=timezone.utc)
+    local = routing._local_departure(utc_rush, "America/Chicago")
+    assert (local.hour, local.minute) == (8, 30)
+    assert routing._local_departure(datetime(2026, 10, 12, 8, 30), "America/Chicago").utcoffset() == local.utcoffset()
+    assert routing._local_departure(None, "America/Chicago").tzinfo is not None
+
+
+def test_straight_line_fallback_ignores_time_of_day(monkeypatch):
+    settings = SimpleNamespace(traffic_profiles_path=None, traffic_timezone="America/Chicago")
+    monkeypatch.setattr(routing, "get_settings", lambda: settings)
+
+    async def eta(departure):
+        return await routing.optimize_vehicle_route(ORIGIN, DESTINATION, "fire_truck", departure)
+
+    rush = asyncio.run(eta(datetime(2026, 10, 12, 8, 0)))
+    night = asyncio.run(eta(datetime(2026, 10, 12, 3, 0)))
+    straight = routing._haversine_meters((ORIGIN["lat"], ORIGIN["lng"]), (DESTINATION["lat"], DESTINATION["lng"]))
+    assert rush["estimated_time_seconds"] == night["estimated_time_seconds"] == int(straight / 20 * 1.2)
+    assert rush["eta_source"] == "straight_line"
+    assert rush["departure_time"] == "2026-10-12T08:00:00-05:00"
+
+
+def test_profiled_route_runs_off_the_event_loop(monkeypatch):
+    settings = SimpleNamespace(traffic_profiles_path="profiles.npz", traffic_timezone="America/Chicago")
+    monkeypatch.setattr(routing, "get_settings", lambda: settings)
+    monkeypatch.setattr(routing, "compute_pool", ComputePool(workers=0))
+    monkeypatch.setattr(routing, "_get_speed_profiles", lambda path: path)
+    solved_on = []
+
+    def profile_route(profiles, origin, destination, departure):
+        solved_on.append(threading.current_thread())
+        assert profiles == "profiles.npz" and departure.hour == 8
+        return 600.0, [origin, destination]
+
+    monkeypatch.setattr(routing, "_profile_route", profile_route)
+
+    route = asyncio.run(routing.optimize_vehicle_route(ORIGIN, DESTINATION, "police", datetime(2026, 10, 12, 8, 0)))
+    assert route["eta_source"] == "speed_profiles"
+    assert route["estimated_time_seconds"] == int(600.0 * 1.1)
+    assert solved_on and solved_on[0] is not threading.main_thread()
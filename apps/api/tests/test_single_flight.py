@@ -0,0 +1,61 @@
+"""Tests for single-flight coalescing of agent instance inference calls."""
+from __future__ import annotations
+
+import asyncio
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.services import cloud_inference, orchestrator  # noqa: E402
+from src.services.single_flight import SingleFlight  # noqa: E402
+
+
+def test_concurrent_calls_share_one_flight():
+    calls = []
+
+    async def call():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        if len(calls) > 1:
+            raise RuntimeError("boom")
+        return {"severity": 5}
+
+    async def run():
+        flights = SingleFlight()
+        results = await asyncio.gather(*(flights.do("k", call) for _ in range(3)))
+        assert results == [{"severity": 5}] * 3
+        assert len(calls) == 1
+
+        # Settled calls are not remembered, and failures reach every follower
+        failed = await asyncio.gather(*(flights.do("k", call) for _ in range(2)), return_exceptions=True)
+        assert all(isinstance(r, RuntimeError) for r in failed)
+        assert flights.stats() == {"calls": 2, "coalesced": 3, "in_flight": 0}
+
+    asyncio.run(run())
+
+
+@pytest.mark.parametrize("diverse, quorum, expected_calls", [(False, None, 1), (True, None, 3), (False, 2, 3)])
+def test_team_instances_coalesce_unless_diverse(monkeypatch, diverse, quorum, expected_calls):
+    calls = []
+
+    async def fake_remote(team_type, frame_path, context=None, frame_id="unknown"):
+        calls.append(frame_id)
+        await asyncio.sleep(0.01)
+        return {"severity_score": 0.4, "frame_id": frame_id, "frame_refs": [frame_id]}
+
+    monkeypatch.setattr(orchestrator, "get_settings", lambda: SimpleNamespace(inference_mode="cloud"))
+    monkeypatch.setattr(cloud_inference, "analyze_remote", fake_remote)
+    # A quorum needs independent samples, or the instances trivially agree
+    team = orchestrator.Team(orchestrator.TeamType.FIRE_SEVERITY, diverse_samples=diverse, quorum=quorum)
+
+    async def run():
+        return await asyncio.gather(*(i.analyze_independent("frame.jpg") for i in team.instances))
+
+    results = asyncio.run(run())
+    assert len(calls) == expected_calls
+    assert [r["frame_id"] for r in results] == [f"fire_severity_{i}_frame.jpg" for i in range(3)]
+    assert len({id(r) for r in results}) == 3
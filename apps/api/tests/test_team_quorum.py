@@ -0,0 +1,105 @@
+"""Tests for early-quorum team completion."""
+from __future__ import annotations
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.redis_client import RedisClient  # noqa: E402
+from src.services import orchestrator  # noqa: E402
+
+FIRE = orchestrator.TeamType.FIRE_SEVERITY
+
+
+@pytest.fixture
+def client(monkeypatch):
+    client = RedisClient()
+    server = fakeredis.FakeServer()
+    client._client = fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+    client._binary = fakeredis.FakeAsyncRedis(server=server)
+    monkeypatch.setattr(orchestrator, "redis_client", client)
+    return client
+
+
+def _instances(monkeypatch, behaviour: dict[str, tuple[float, int]]) -> list[str]:
+    """Make instance ``fire_severity_<i>`` sleep and report the given (delay, severity)."""
+    finished = []
+
+    async def analyze_local(self, frame_path):
+        delay, severity = behaviour[self.instance_id]
+        await asyncio.sleep(delay)
+        finished.append(self.instance_id)
+        return {"frame_id": f"{self.instance_id}_{frame_path}", "severity": severity, "frame_refs": [frame_path]}
+
+    monkeypatch.setattr(orchestrator.AgentInstance, "_analyze_local", analyze_local)
+    return finished
+
+
+def test_quorum_publishes_without_waiting_for_the_slowest(monkeypatch, client):
+    finished = _instances(monkeypatch, {
+        "fire_severity_0": (0.0, 6), "fire_severity_1": (0.01, 6), "fire_severity_2": (5.0, 9),
+    })
+    team = orchestrator.Team(FIRE, quorum=2)
+
+    consensus = asyncio.run(asyncio.wait_for(team.run_hybrid("sim", ["f0.jpg"]), 1.0))
+    assert consensus["severity"] == 6
+    assert consensus["consensus_metadata"]["num_instances"] == 2
+    assert consensus["consensus_metadata"]["quorum"] == {"required": 2, "pending_instances": 0}
+    assert finished == ["fire_severity_0", "fire_severity_1"]
+
+    # Two finished but disagreeing instances are no quorum: the third decides
+    finished = _instances(monkeypatch, {
+        "fire_severity_0": (0.0, 2), "fire_severity_1": (0.01, 9), "fire_severity_2": (0.05, 9),
+    })
+    consensus = asyncio.run(orchestrator.Team(FIRE, quorum=2).run_hybrid("sim2", ["f0.jpg"]))
+    assert consensus["consensus_metadata"]["num_instances"] == 3
+    assert consensus["severity"] == 9
+
+
+def test_late_instances_update_the_published_consensus(monkeypatch, client):
+    _instances(monkeypatch, {
+        "fire_severity_0": (0.0, 6), "fire_severity_1": (0.01, 6), "fire_severity_2": (0.1, 7),
+    })
+    team = orchestrator.Team(FIRE, quorum=2, late_updates=True)
+
+    async def run():
+        independent = await team.analyze_frame("sim", "f0.jpg")
+        assert [r is None for r in independent] == [False, False, True]
+        merged = await team.merge_frame("sim", independent, {})
+        published = await team.complete("sim", merged)
+        await asyncio.sleep(0.2)
+        return published, await client.get_team_result("sim", FIRE.value)
+
+    published, stored = asyncio.run(run())
+    assert published["consensus_metadata"]["num_instances"] == 2
+    assert published["consensus_metadata"]["quorum"]["pending_instances"] == 1
+    assert stored["consensus_metadata"]["num_instances"] == 3
+    assert stored["consensus_metadata"]["quorum"]["pending_instances"] == 0
+    assert stored["severity"] == 6
+
+
+def test_failed_instances_do_not_block_quorum(monkeypatch, client):
+    async def analyze_local(self, frame_path):
+        delay, severity = {"fire_severity_0": (0.0, None), "fire_severity_1": (0.01, 6), "fire_severity_2": (0.02, 6)}[
+            self.instance_id
+        ]
+        await asyncio.sleep(delay)
+        if severity is None:
+            raise RuntimeError("backend exploded")
+        return {"frame_id": f"{self.instance_id}_{frame_path}", "severity": severity, "frame_refs": [frame_path]}
+
+    monkeypatch.setattr(orchestrator.AgentInstance, "_analyze_local", analyze_local)
+
+    consensus = asyncio.run(orchestrator.Team(FIRE, quorum=2).run_hybrid("sim", ["f0.jpg"]))
+    assert consensus["severity"] == 6
+    assert consensus["consensus_metadata"]["num_instances"] == 2
+
+    # With three instances and a quorum of three, one failure makes it unreachable
+    with pytest.raises(RuntimeError, match="exploded"):
+        asyncio.run(orchestrator.Team(FIRE, quorum=3).run_hybrid("sim2", ["f0.jpg"]))
@@ -137,7 +137,7 @@ export function useAnalysis() {
         JSON.stringify({
           frame_path: framePath,
           frame_id: frameId,
-          simulation_id: simulationId ?? "ws_session",
+          simulation_id: simulationId,
         })
       );
     },
@@ -17,6 +17,7 @@ from __future__ import annotations
 import base64
 import json
 from datetime import datetime, timezone
+from pathlib import Path
 from typing import Any
 
 import modal
@@ -26,9 +27,17 @@ app = modal.App("orca-vision")
 # Gemini Flash - super cheap, fast, good vision
 MODEL_ID = "gemini-2.0-flash"
 
-image = modal.Image.debian_slim(python_version="3.11").pip_install(
-    "google-genai>=1.0.0",
-    "pillow>=10.0.0",
+_REPO = Path(__file__).resolve().parents[3]
+
+image = (
+    modal.Image.debian_slim(python_version="3.11")
+    .pip_install(
+        "google-genai>=1.0.0",
+        "pillow>=10.0.0",
+    )
+    # Shared response parser and the schemas it coerces to
+    .add_local_file(_REPO / "packages" / "world-models" / "src" / "json_extract.py", "/root/json_extract.py")
+    .add_local_dir(_REPO / "shared" / "schemas", "/root/schemas")
 )
 
 
@@ -84,26 +93,13 @@ Respond with ONLY valid JSON (no markdown, no explanation):
 }"""
 
 
-def _parse_json(text: str) -> dict[str, Any]:
-    """Parse JSON from model response."""
-    raw = text.strip()
-    # Remove markdown fences
-    if "```json" in raw:
-        raw = raw.split("```json")[1].split("```")[0]
-    elif "```" in raw:
-        parts = raw.split("```")
-        if len(parts) >= 2:
-            raw = parts[1]
-
-    # Find JSON object
-    start = raw.find("{")
-    end = raw.rfind("}") + 1
-    if start != -1 and end > start:
-        raw = raw[start:end]
+def _parse_json(text: str, schema: str | None = None) -> dict[str, Any]:
+    """Parse (and if needed repair) JSON from model response, coerced to a shared schema."""
+    from json_extract import JSONExtractionError, extract_json, load_schema
 
     try:
-        return json.loads(raw)
-    except json.JSONDecodeError as e:
+        return extract_json(text, load_schema(schema) if schema else None)
+    except JSONExtractionError as e:
         return {"error": f"JSON parse failed: {e}", "raw": text[:500]}
 
 
@@ -151,7 +147,7 @@ def analyze_with_gemini(image_base64: str, prompt: str) -> str:
 def analyze_fire_severity(frame_base64: str, frame_id: str = "unknown") -> dict[str, Any]:
     """Analyze frame for fire severity using Gemini."""
     raw = analyze_with_gemini.remote(frame_base64, FIRE_SEVERITY_PROMPT)
-    result = _parse_json(raw)
+    result = _parse_json(raw, "fire_severity")
 
     result["frame_id"] = frame_id
     result["timestamp"] = datetime.now(timezone.utc).isoformat()
@@ -176,7 +172,7 @@ def analyze_structural(
     prompt = STRUCTURAL_PROMPT.format(fire_context=fire_ctx_str)
 
     raw = analyze_with_gemini.remote(frame_base64, prompt)
-    result = _parse_json(raw)
+    result = _parse_json(raw, "structural")
 
     result["frame_id"] = frame_id
     result["timestamp"] = datetime.now(timezone.utc).isoformat()
@@ -1,11 +1,14 @@
 from __future__ import annotations
 
+import heapq
 import math
+from datetime import datetime
 from typing import Any
 
 import networkx as nx
 
 from .graph import build_graph, build_building_graph, apply_fire_data, apply_structural_data
+from .traffic import SpeedProfiles
 
 
 class RouteSolver:
@@ -17,6 +20,66 @@ class RouteSolver:
         except Exception:
             return 9999
 
+    def solve_time_dependent(
+        self,
+        profiles: SpeedProfiles,
+        origin: int,
+        destination: int,
+        departure: datetime,
+    ) -> dict[str, Any]:
+        """Fastest vehicle route using historical per-edge speeds.
+
+        Time-dependent Dijkstra: each edge is costed with the speed of the
+        time-of-week bucket in which the vehicle enters it, so a route that
+        crosses into rush hour picks up the slower speeds on the way.
+
+        Args:
+            profiles: Loaded speed profiles (road network + speeds)
+            origin: Origin node index
+            destination: Destination node index
+            departure: Departure timestamp
+
+        Returns:
+            Dict with node path, eta_seconds and distance_meters.
+        """
+        n_nodes = len(profiles.indptr) - 1
+        arrival = [math.inf] * n_nodes
+        parent_edge = [-1] * n_nodes
+        arrival[origin] = 0.0
+        heap: list[tuple[float, int]] = [(0.0, origin)]
+
+        while heap:
+            elapsed, node = heapq.heappop(heap)
+            if node == destination:
+                break
+            if elapsed > arrival[node]:
+                continue
+            bucket = profiles.bucket_at(departure, elapsed)
+            for edge in profiles.out_edges(node):
+                nxt = int(profiles.edge_v[edge])
+                t = elapsed + profiles.travel_seconds(int(edge), bucket)
+                if t < arrival[nxt]:
+                    arrival[nxt] = t
+                    parent_edge[nxt] = int(edge)
+                    heapq.heappush(heap, (t, nxt))
+
+        if math.isinf(arrival[destination]):
+            return {"path": [], "eta_seconds": float("inf"), "distance_meters": 0.0}
+
+        path = [destination]
+        distance = 0.0
+        while path[-1] != origin:
+            edge = parent_edge[path[-1]]
+            distance += float(profiles.length_m[edge])
+            path.append(int(profiles.edge_u[edge]))
+        path.reverse()
+
+        return {
+            "path": path,
+            "eta_seconds": round(arrival[destination], 1),
+            "distance_meters": round(distance, 1),
+        }
+
     def solve(self, origin: str, destination: str) -> nx.DiGraph | None:
         """Find path on the basic stub graph."""
         graph = build_graph()
@@ -53,6 +116,13 @@ class RouteSolver:
         if structural_data:
             graph = apply_structural_data(graph, structural_data)
 
+        return self.solve_on_graph(graph, origin, destination)
+
+    def solve_on_graph(self, graph: nx.DiGraph, origin: str, destination: str) -> dict[str, Any]:
+        """Safest path on a graph that already carries fire/structural weights.
+
+        Lets callers that hold a prepared hazard graph skip the rebuild.
+        """
         if origin not in graph.nodes or destination not in graph.nodes:
             return {
                 "path": [],
@@ -63,8 +133,7 @@ class RouteSolver:
             }
 
         try:
-            path = nx.dijkstra_path(graph, origin, destination, weight="weight")
-            cost = nx.dijkstra_path_length(graph, origin, destination, weight="weight")
+            cost, path = nx.single_source_dijkstra(graph, origin, destination, weight="weight")
         except nx.NetworkXNoPath:
             return {
                 "path": [],
@@ -1,7 +1,189 @@
+"""Historical traffic speed profiles for time-dependent vehicle routing.
+
+Profiles are stored in a compact columnar file that is memory-mapped on load:
+
+    header   magic, version, n_nodes, n_edges, n_buckets, bucket_minutes
+    node_lat float32[n_nodes]
+    node_lng float32[n_nodes]
+    edge_u   int32[n_edges]      source node index
+    edge_v   int32[n_edges]      target node index
+    length_m float32[n_edges]
+    speeds   float16[n_buckets, n_edges]   km/h, one row per time-of-week bucket
+
+Speeds are laid out bucket-major so a single route query (which almost always
+stays inside one or two buckets) reads one contiguous row. Every lookup is a
+plain array index, so edge relaxation stays O(1).
+"""
 from __future__ import annotations
 
+import struct
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+PROFILE_MAGIC = b"ORCATSP1"
+PROFILE_VERSION = 1
+MINUTES_PER_WEEK = 7 * 24 * 60
+DEFAULT_BUCKET_MINUTES = 15
+FREE_FLOW_KPH = 50.0
+MIN_SPEED_KPH = 1.0
+
+_HEADER = struct.Struct("<8sIIIII")
+_ALIGN = 64
+
 
 def traffic_delay_factor(hour_of_day: int) -> float:
+    """Global rush-hour multiplier by hour of day, for callers without speed profiles."""
     if hour_of_day in {7, 8, 17, 18}:
         return 1.5
     return 1.0
+
+
+def seconds_of_week(when: datetime) -> float:
+    """Seconds since Monday 00:00 of ``when``'s week."""
+    return when.weekday() * 86_400 + when.hour * 3_600 + when.minute * 60 + when.second + when.microsecond / 1e6
+
+
+def time_of_week_bucket(when: datetime, bucket_minutes: int = DEFAULT_BUCKET_MINUTES) -> int:
+    """Map a timestamp to its time-of-week bucket (Monday 00:00 is bucket 0)."""
+    return int(seconds_of_week(when) // (bucket_minutes * 60))
+
+
+def _aligned(offset: int) -> int:
+    return (offset + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+def _column_layout(n_nodes: int, n_edges: int, n_buckets: int) -> list[tuple[str, np.dtype, tuple[int, ...], int]]:
+    """Return (name, dtype, shape, offset) for every column in the file."""
+    columns = [
+        ("node_lat", np.dtype("<f4"), (n_nodes,)),
+        ("node_lng", np.dtype("<f4"), (n_nodes,)),
+        ("edge_u", np.dtype("<i4"), (n_edges,)),
+        ("edge_v", np.dtype("<i4"), (n_edges,)),
+        ("length_m", np.dtype("<f4"), (n_edges,)),
+        ("speeds", np.dtype("<f2"), (n_buckets, n_edges)),
+    ]
+    layout = []
+    offset = _aligned(_HEADER.size)
+    for name, dtype, shape in columns:
+        layout.append((name, dtype, shape, offset))
+        offset = _aligned(offset + dtype.itemsize * int(np.prod(shape)))
+    return layout
+
+
+def save_speed_profiles(
+    path: str | Path,
+    node_coords: np.ndarray,
+    edge_u: np.ndarray,
+    edge_v: np.ndarray,
+    length_m: np.ndarray,
+    speeds_kph: np.ndarray,
+    bucket_minutes: int = DEFAULT_BUCKET_MINUTES,
+) -> None:
+    """Write a speed profile file.
+
+    Args:
+        path: Destination file
+        node_coords: (n_nodes, 2) array of (lat, lng)
+        edge_u, edge_v: Source/target node indices per edge
+        length_m: Edge length in meters
+        speeds_kph: (n_buckets, n_edges) historical speeds in km/h
+        bucket_minutes: Width of each time-of-week bucket
+    """
+    node_coords = np.asarray(node_coords, dtype=np.float32).reshape(-1, 2)
+    speeds_kph = np.asarray(speeds_kph)
+    n_nodes, n_edges = len(node_coords), len(edge_u)
+    n_buckets = MINUTES_PER_WEEK // bucket_minutes
+    if speeds_kph.shape != (n_buckets, n_edges):
+        raise ValueError(f"speeds must have shape ({n_buckets}, {n_edges}), got {speeds_kph.shape}")
+
+    data = {
+        "node_lat": node_coords[:, 0],
+        "node_lng": node_coords[:, 1],
+        "edge_u": edge_u,
+        "edge_v": edge_v,
+        "length_m": length_m,
+        "speeds": speeds_kph,
+    }
+    layout = _column_layout(n_nodes, n_edges, n_buckets)
+    with open(path, "wb") as fh:
+        fh.write(_HEADER.pack(PROFILE_MAGIC, PROFILE_VERSION, n_nodes, n_edges, n_buckets, bucket_minutes))
+        for name, dtype, shape, offset in layout:
+            fh.seek(offset)
+            fh.write(np.ascontiguousarray(data[name], dtype=dtype).reshape(shape).tobytes())
+        end = layout[-1][3] + layout[-1][1].itemsize * int(np.prod(layout[-1][2]))
+        fh.truncate(end)
+
+
+@dataclass
+class SpeedProfiles:
+    """Memory-mapped road network with per-edge, per-bucket historical speeds."""
+    node_lat: np.ndarray
+    node_lng: np.ndarray
+    edge_u: np.ndarray
+    edge_v: np.ndarray
+    length_m: np.ndarray
+    speeds: np.ndarray
+    bucket_minutes: int
+    # CSR adjacency over edges sorted by source node
+    indptr: np.ndarray
+    edge_order: np.ndarray
+
+    @classmethod
+    def load(cls, path: str | Path) -> "SpeedProfiles":
+        """Memory-map a profile file. Only the CSR index is materialized in RAM."""
+        with open(path, "rb") as fh:
+            magic, version, n_nodes, n_edges, n_buckets, bucket_minutes = _HEADER.unpack(
+                fh.read(_HEADER.size)
+            )
+        if magic != PROFILE_MAGIC or version != PROFILE_VERSION:
+            raise ValueError(f"Not a speed profile file: {path}")
+
+        cols = {
+            name: np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=shape)
+            for name, dtype, shape, offset in _column_layout(n_nodes, n_edges, n_buckets)
+        }
+        edge_order = np.argsort(cols["edge_u"], kind="stable").astype(np.int32)
+        counts = np.bincount(cols["edge_u"], minlength=n_nodes)
+        indptr = np.zeros(n_nodes + 1, dtype=np.int64)
+        np.cumsum(counts, out=indptr[1:])
+        return cls(
+            node_lat=cols["node_lat"],
+            node_lng=cols["node_lng"],
+            edge_u=cols["edge_u"],
+            edge_v=cols["edge_v"],
+            length_m=cols["length_m"],
+            speeds=cols["speeds"],
+            bucket_minutes=bucket_minutes,
+            indptr=indptr,
+            edge_order=edge_order,
+        )
+
+    @property
+    def n_buckets(self) -> int:
+        return self.speeds.shape[0]
+
+    def bucket_at(self, when: datetime, offset_seconds: float = 0.0) -> int:
+        """Bucket index for ``when`` advanced by ``offset_seconds``."""
+        return int((seconds_of_week(when) + offset_seconds) // (self.bucket_minutes * 60)) % self.n_buckets
+
+    def edge_speed_kph(self, edge: int, bucket: int) -> float:
+        """Historical speed for one edge in one bucket. O(1)."""
+        speed = float(self.speeds[bucket, edge])
+        return speed if speed >= MIN_SPEED_KPH else MIN_SPEED_KPH
+
+    def travel_seconds(self, edge: int, bucket: int) -> float:
+        """Seconds to traverse ``edge`` when entering it during ``bucket``."""
+        return float(self.length_m[edge]) * 3.6 / self.edge_speed_kph(edge, bucket)
+
+    def out_edges(self, node: int) -> np.ndarray:
+        """Edge indices leaving ``node``."""
+        return self.edge_order[self.indptr[node]:self.indptr[node + 1]]
+
+    def nearest_node(self, lat: float, lng: float) -> int:
+        """Snap a coordinate to the closest network node (equirectangular distance)."""
+        dlat = self.node_lat - lat
+        dlng = (self.node_lng - lng) * np.cos(np.radians(lat))
+        return int(np.argmin(dlat * dlat + dlng * dlng))
@@ -0,0 +1,76 @@
+"""Tests for historical speed profiles and time-dependent vehicle routing."""
+from __future__ import annotations
+
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+# Add parent of src/ so we can import src as a package (relative imports work)
+PKG_PARENT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PKG_PARENT))
+
+
+def _write_diamond(path: Path, rush_bucket: int | None = None):
+    """0 -> 1 -> 3 (short) and 0 -> 2 -> 3 (long). Optionally jam the short side."""
+    from src.traffic import MINUTES_PER_WEEK, DEFAULT_BUCKET_MINUTES, save_speed_profiles
+
+    coords = np.array([[40.0, -88.0], [40.01, -88.0], [40.0, -88.02], [40.01, -88.02]])
+    edge_u = np.array([0, 1, 0, 2])
+    edge_v = np.array([1, 3, 2, 3])
+    length = np.array([1000.0, 1000.0, 1500.0, 1500.0])
+    n_buckets = MINUTES_PER_WEEK // DEFAULT_BUCKET_MINUTES
+    speeds = np.full((n_buckets, 4), 36.0)
+    if rush_bucket is not None:
+        speeds[rush_bucket, :2] = 6.0
+    save_speed_profiles(path, coords, edge_u, edge_v, length, speeds)
+
+
+def test_time_of_week_bucket():
+    from src.traffic import time_of_week_bucket
+
+    assert time_of_week_bucket(datetime(2026, 10, 12, 0, 0)) == 0  # Monday
+    assert time_of_week_bucket(datetime(2026, 10, 12, 8, 20)) == 33
+    assert time_of_week_bucket(datetime(2026, 10, 18, 23, 59)) == 671  # Sunday
+
+
+def test_profiles_roundtrip_memmap(tmp_path):
+    from src.traffic import SpeedProfiles
+
+    path = tmp_path / "speeds.tsp"
+    _write_diamond(path)
+    profiles = SpeedProfiles.load(path)
+
+    assert isinstance(profiles.speeds, np.memmap)
+    assert profiles.speeds.shape == (672, 4)
+    assert profiles.travel_seconds(0, 10) == 100.0  # 1 km at 36 km/h
+    assert sorted(profiles.out_edges(0).tolist()) == [0, 2]
+    assert profiles.nearest_node(40.0099, -88.0001) == 1
+
+    # The offset counts from the departure itself, not from its bucket's start
+    departure = datetime(2026, 10, 12, 8, 14, 50)
+    assert profiles.bucket_at(departure) == 32
+    assert profiles.bucket_at(departure, 13 * 60) == 33  # 08:27:50
+    assert profiles.bucket_at(datetime(2026, 10, 18, 23, 50), 15 * 60) == 0  # wraps to Monday
+
+
+def test_time_dependent_route_avoids_jam(tmp_path):
+    from src.optimizer import RouteSolver
+    from src.traffic import SpeedProfiles, time_of_week_bucket
+
+    rush = datetime(2026, 10, 12, 8, 0)
+    free = datetime(2026, 10, 12, 3, 0)
+    path = tmp_path / "speeds.tsp"
+    _write_diamond(path, rush_bucket=time_of_week_bucket(rush))
+    profiles = SpeedProfiles.load(path)
+    solver = RouteSolver()
+
+    off_peak = solver.solve_time_dependent(profiles, 0, 3, free)
+    assert off_peak["path"] == [0, 1, 3]
+    assert off_peak["eta_seconds"] == 200.0
+
+    peak = solver.solve_time_dependent(profiles, 0, 3, rush)
+    assert peak["path"] == [0, 2, 3]
+    assert peak["eta_seconds"] == 300.0
+    assert peak["distance_meters"] == 3000.0
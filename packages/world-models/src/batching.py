@@ -0,0 +1,211 @@
+"""Adaptive micro-batching in front of Ollama's /api/generate.
+
+Callers submit one request each and block for its result. A collector thread
+gathers queued requests into a batch — up to ``max_batch_size``, waiting at
+most ``max_wait_ms`` for stragglers — and hands it off to be sent to Ollama
+at once (it runs them together across its OLLAMA_NUM_PARALLEL slots); the
+results are scattered back to the waiting callers.
+
+Hand-off doesn't wait for the batch to finish: the collector goes straight
+back to the queue, so a request arriving while a batch is generating uses
+one of Ollama's idle slots instead of waiting a whole generation. Requests
+in flight across all batches are capped at ``max_in_flight`` (the slot count).
+
+The wait window adapts to load: when requests arrive further apart than the
+window, holding the first one back would only add latency, so it is
+dispatched immediately.
+
+Stdlib only: shipped into the Modal container next to modal_app.py, and
+testable against any local HTTP server that mimics /api/generate.
+"""
+from __future__ import annotations
+
+import json
+import queue
+import threading
+import time
+from bisect import bisect_left
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any
+from urllib.request import Request, urlopen
+
+# Upper bounds (ms) of the queue-wait histogram buckets; the last is open-ended
+QUEUE_WAIT_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+# Weight of the newest inter-arrival gap in the moving average
+ARRIVAL_SMOOTHING = 0.2
+
+
+class MicroBatcher:
+    """Collect concurrent requests into batches for a batch ``dispatch`` function.
+
+    Args:
+        dispatch: Takes a list of requests, returns one result (or Exception)
+            per request in the same order
+        max_batch_size: Most requests dispatched together
+        max_wait_ms: Longest a request is held waiting for a batch to fill
+        max_in_flight: Most requests being dispatched at once, across batches
+            (default: ``max_batch_size``)
+    """
+
+    def __init__(
+        self,
+        dispatch: Callable[[list[Any]], list[Any]],
+        max_batch_size: int = 4,
+        max_wait_ms: float = 10.0,
+        max_in_flight: int | None = None,
+    ):
+        self.dispatch = dispatch
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.max_in_flight = max_in_flight or max_batch_size
+        # One permit per request being dispatched; the collector takes them as it batches
+        self._slots = threading.Semaphore(self.max_in_flight)
+        self._dispatchers = ThreadPoolExecutor(max_workers=self.max_in_flight, thread_name_prefix="micro-batch")
+        self._queue: queue.Queue[tuple[Any, Future, float]] = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._closed = False
+        self._last_arrival: float | None = None
+        self._arrival_gap_ms = float("inf")
+        self._batch_sizes: dict[int, int] = {}
+        self._wait_counts = [0] * (len(QUEUE_WAIT_BUCKETS_MS) + 1)
+        self._requests = 0
+        self._batches = 0
+
+    def submit(self, request: Any, timeout: float | None = None) -> Any:
+        """Queue ``request`` and block until its batch has been dispatched."""
+        now = time.monotonic()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("MicroBatcher is closed")
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+                self._thread.start()
+            if self._last_arrival is not None:
+                gap = (now - self._last_arrival) * 1000
+                if self._arrival_gap_ms == float("inf"):
+                    self._arrival_gap_ms = gap
+                else:
+                    self._arrival_gap_ms += ARRIVAL_SMOOTHING * (gap - self._arrival_gap_ms)
+            self._last_arrival = now
+
+        future: Future = Future()
+        self._queue.put((request, future, now))
+        return future.result(timeout=timeout)
+
+    def close(self) -> None:
+        """Stop the collector thread once the queue drains; batches in flight still finish."""
+        with self._lock:
+            self._closed = True
+        self._queue.put(None)  # type: ignore[arg-type]
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self._dispatchers.shutdown(wait=False)
+
+    def window_ms(self) -> float:
+        """Current batching window: the full wait only if another request is likely to arrive in it."""
+        return self.max_wait_ms if self._arrival_gap_ms < self.max_wait_ms else 0.0
+
+    def stats(self) -> dict[str, Any]:
+        """Batch-size and queue-wait histograms."""
+        with self._lock:
+            labels = [f"<={b}" for b in QUEUE_WAIT_BUCKETS_MS] + [f">{QUEUE_WAIT_BUCKETS_MS[-1]}"]
+            return {
+                "requests": self._requests,
+                "batches": self._batches,
+                "mean_batch_size": round(self._requests / self._batches, 3) if self._batches else 0.0,
+                "batch_size_hist": dict(sorted(self._batch_sizes.items())),
+                "queue_wait_ms_hist": dict(zip(labels, self._wait_counts)),
+                "window_ms": self.window_ms(),
+            }
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # Collector thread
+    # ─────────────────────────────────────────────────────────────────────────
+
+    def _collect(self) -> list[tuple[Any, Future, float]] | None:
+        """Next batch, holding one slot per request in it; None once closed."""
+        self._slots.acquire()
+        first = self._queue.get()
+        if first is None:
+            self._slots.release()
+            return None
+        batch = [first]
+        deadline = time.monotonic() + self.window_ms() / 1000
+        # A batch only grows into slots that are free now
+        while len(batch) < self.max_batch_size and self._slots.acquire(blocking=False):
+            # Always take what's already queued; only block inside the window
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                self._slots.release()
+                break
+            if item is None:
+                self._queue.put(None)  # type: ignore[arg-type]
+                self._slots.release()
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect()
+            if batch is None:
+                return
+            started = time.monotonic()
+            with self._lock:
+                self._requests += len(batch)
+                self._batches += 1
+                self._batch_sizes[len(batch)] = self._batch_sizes.get(len(batch), 0) + 1
+                for _, _, queued_at in batch:
+                    self._wait_counts[bisect_left(QUEUE_WAIT_BUCKETS_MS, (started - queued_at) * 1000)] += 1
+
+            self._dispatchers.submit(self._dispatch, batch)
+
+    def _dispatch(self, batch: list[tuple[Any, Future, float]]) -> None:
+        try:
+            try:
+                results = self.dispatch([request for request, _, _ in batch])
+            except Exception as exc:
+                results = [exc] * len(batch)
+            for (_, future, _), result in zip(batch, results):
+                if isinstance(result, BaseException):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+        finally:
+            self._slots.release(len(batch))
+
+
+def ollama_generate(base_url: str, payload: dict[str, Any], timeout: float) -> dict[str, Any]:
+    """POST one request to Ollama's /api/generate and return the decoded body."""
+    req = Request(
+        f"{base_url}/api/generate",
+        data=json.dumps(payload).encode(),
+        headers={"Content-Type": "application/json"},
+        method="POST",
+    )
+    with urlopen(req, timeout=timeout) as resp:
+        return json.loads(resp.read())
+
+
+def ollama_dispatcher(base_url: str, timeout: float, max_batch_size: int) -> Callable[[list[dict]], list[Any]]:
+    """Batch dispatch function sending every payload in a batch to Ollama concurrently.
+
+    Batches in flight share one pool of ``max_batch_size`` connections, the
+    batcher's default ``max_in_flight``.
+    """
+    pool = ThreadPoolExecutor(max_workers=max_batch_size, thread_name_prefix="ollama-batch")
+
+    def call(payload: dict[str, Any]) -> Any:
+        try:
+            return ollama_generate(base_url, payload, timeout)
+        except Exception as exc:
+            return exc
+
+    def dispatch(payloads: list[dict[str, Any]]) -> list[Any]:
+        return list(pool.map(call, payloads))
+
+    return dispatch
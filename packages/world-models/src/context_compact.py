@@ -0,0 +1,150 @@
+"""Token-budgeted rendering of upstream team results for downstream prompts.
+
+Downstream teams see upstream results inside their prompt. Dumping the whole
+result (pretty-printed, with pre-screen heat maps, timestamps and every
+detected object) makes prompt size — and so prefill time — grow with the
+upstream payload. ``compact_context`` renders only the requested fields:
+
+- in the caller's order, with nested keys sorted, compact separators, floats
+  rounded and long strings clipped, so the same result always renders to the
+  same bytes (prefix caching, inference-cache hits);
+- under a token budget: lists are capped first, then the lowest-value field
+  (last in the caller's list) is shrunk — halved if it's a list, else
+  dropped — until the summary fits.
+
+Rendered summaries are cached by the content of the selected fields, so every
+instance in a team reuses one render. Identity fields are not a safe key: a
+team consensus carries its first instance's ``frame_id`` and ``timestamp``
+while its values change as more instances arrive.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+import os
+import threading
+from collections import OrderedDict
+from collections.abc import Sequence
+from typing import Any
+
+# Default budget for one upstream result, in (estimated) tokens
+CONTEXT_TOKEN_BUDGET = int(os.environ.get("ORCA_CONTEXT_TOKEN_BUDGET", "256"))
+# JSON is punctuation-heavy: ~3 characters per token for Llama/GPT tokenizers
+CHARS_PER_TOKEN = 3.0
+MAX_LIST_ITEMS = 5
+MAX_STRING_CHARS = 120
+FLOAT_DIGITS = 2
+CACHE_SIZE = 512
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count of rendered context, without a model tokenizer."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def _compact(value: Any) -> Any:
+    """Round floats, clip strings, drop empty values and sort nested keys."""
+    if isinstance(value, float):
+        return round(value, FLOAT_DIGITS)
+    if isinstance(value, str):
+        return value if len(value) <= MAX_STRING_CHARS else value[:MAX_STRING_CHARS - 3] + "..."
+    if isinstance(value, dict):
+        return {k: _compact(v) for k, v in sorted(value.items()) if v not in (None, "", [], {})}
+    if isinstance(value, (list, tuple)):
+        return [_compact(v) for v in value]
+    return value
+
+
+def _render(summary: dict[str, Any]) -> str:
+    return json.dumps(summary, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def _fit(summary: dict[str, Any], budget: int) -> str:
+    """Shrink ``summary`` (ordered most to least valuable) until it fits ``budget``."""
+    for key, value in summary.items():
+        if isinstance(value, list) and len(value) > MAX_LIST_ITEMS:
+            summary[key] = value[:MAX_LIST_ITEMS]
+    text = _render(summary)
+
+    # Shrink the lowest-value field: halve it if it's a list, else drop it;
+    # the most valuable field is never dropped
+    while estimate_tokens(text) > budget:
+        key = next(reversed(summary), None)
+        value = summary.get(key)
+        if isinstance(value, list) and len(value) > 1:
+            summary[key] = value[: len(value) // 2]
+        elif len(summary) > 1:
+            del summary[key]
+        else:
+            break
+        text = _render(summary)
+    return text
+
+
+def _content_key(result: dict[str, Any], fields: Sequence[str]) -> str:
+    """Hash of the selected fields' values; only these can change the render."""
+    selected = [result.get(f) for f in fields]
+    canonical = json.dumps(selected, sort_keys=True, separators=(",", ":"), default=str).encode()
+    return hashlib.blake2b(canonical, digest_size=16).hexdigest()
+
+
+class ContextCompactor:
+    """Renders upstream results to compact summaries, caching by selected content."""
+
+    def __init__(self, budget: int = CONTEXT_TOKEN_BUDGET, max_entries: int = CACHE_SIZE):
+        self.budget = budget
+        self._cache: OrderedDict[tuple, str] = OrderedDict()
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "tokens_in": 0, "tokens_out": 0}
+
+    def render(
+        self,
+        result: dict[str, Any] | None,
+        fields: Sequence[str],
+        budget: int | None = None,
+    ) -> str:
+        """Compact JSON of ``fields`` of ``result`` (most valuable first) within ``budget`` tokens."""
+        result = result or {}
+        budget = self.budget if budget is None else budget
+        key = (_content_key(result, fields), tuple(fields), budget)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self._counters["hits"] += 1
+                return cached
+
+        summary = {f: _compact(result[f]) for f in fields if result.get(f) is not None}
+        text = _fit(summary, budget)
+        with self._lock:
+            self._counters["misses"] += 1
+            self._counters["tokens_in"] += estimate_tokens(_render(result)) if result else 0
+            self._counters["tokens_out"] += estimate_tokens(text)
+            self._cache[key] = text
+            if len(self._cache) > self._max_entries:
+                self._cache.popitem(last=False)
+        return text
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {**self._counters, "budget": self.budget, "entries": len(self._cache)}
+
+
+# Shared by every agent instance in the process
+_compactor = ContextCompactor()
+
+
+def compact_context(
+    result: dict[str, Any] | None,
+    fields: Sequence[str],
+    budget: int | None = None,
+) -> str:
+    """Render ``fields`` of an upstream result for a prompt; see ``ContextCompactor.render``."""
+    return _compactor.render(result, fields, budget)
+
+
+def context_stats() -> dict[str, Any]:
+    """Render-cache hits/misses and estimated tokens before/after compaction."""
+    return _compactor.stats()
@@ -3,6 +3,8 @@ from __future__ import annotations
 from dataclasses import dataclass, field
 from typing import Any
 
+import numpy as np
+
 from .building_gen import siebel_center_rooms
 
 
@@ -22,6 +24,7 @@ FUEL_ACCELERATION = {
 }
 VERTICAL_SPREAD_MULTIPLIER = 1.8  # stairwells accelerate vertical spread
 SMOKE_SPREAD_RATE = 2.0          # smoke moves faster than fire (rooms/min)
+DANGER_THRESHOLD = 0.6           # intensity above which a room is impassable
 FLASHOVER_THRESHOLD = 0.8        # intensity above which flashover risk exists
 
 
@@ -71,50 +74,69 @@ def compute_room_spread_rate(room: Room, adjacent_rooms: list[Room]) -> float:
     return rate
 
 
-def predict_fire_spread(
-    rooms: list[Room],
-    time_steps_min: int = 10,
-) -> list[SpreadPrediction]:
-    """Predict fire spread across rooms over time. Returns per-room predictions.
+@dataclass
+class SpreadArrays:
+    """Per-minute intensity for every room, in the order of the input room list."""
+    intensities: np.ndarray  # (n_rooms, time_steps_min + 1); column 0 is the current state
 
-    This is deterministic and rule-based:
-    - Fire grows at BASE_SPREAD_RATE * fuel_multiplier per minute
-    - Fire spreads through doorways at DOOR_ADJACENCY_FACTOR rate
-    - Stairwells multiply vertical spread by VERTICAL_SPREAD_MULTIPLIER
-    - High fuel loads (furniture, paper) accelerate spread
+    @property
+    def time_steps_min(self) -> int:
+        return self.intensities.shape[1] - 1
+
+    def first_crossing(self, threshold: float) -> np.ndarray:
+        """Minute at which each room first exceeds ``threshold`` (-1 = not within horizon)."""
+        above = self.intensities > threshold
+        return np.where(above.any(axis=1), above.argmax(axis=1), -1)
+
+    @property
+    def time_to_danger(self) -> np.ndarray:
+        return self.first_crossing(DANGER_THRESHOLD)
+
+    @property
+    def time_to_flashover(self) -> np.ndarray:
+        return self.first_crossing(FLASHOVER_THRESHOLD)
+
+    def horizon(self, time_steps_min: int) -> "SpreadArrays":
+        """View of the first ``time_steps_min`` minutes."""
+        return SpreadArrays(self.intensities[:, :time_steps_min + 1])
+
+
+def simulate_spread(rooms: list[Room], time_steps_min: int = 10) -> SpreadArrays:
+    """Run the spread model for all rooms at once.
+
+    Spread rate depends only on a room's fuel, geometry and its neighbours'
+    current intensity, so it is constant over the horizon and the timeline is
+    a clipped running sum of that rate.
     """
     room_map = {r.name: r for r in rooms}
+    rates = np.array([
+        compute_room_spread_rate(
+            room,
+            [room_map[adj_name] for adj_name in room.has_door_to if adj_name in room_map],
+        )
+        for room in rooms
+    ], dtype=np.float64).reshape(-1)
+    current = np.array([r.fire_intensity for r in rooms], dtype=np.float64)
+
+    steps = np.empty((len(rooms), time_steps_min + 1), dtype=np.float64)
+    steps[:, 0] = current
+    steps[:, 1:] = rates[:, None]
+    intensities = np.minimum(1.0, np.cumsum(steps, axis=1))
+    intensities[:, 0] = current
+    return SpreadArrays(intensities)
+
+
+def spread_predictions(rooms: list[Room], spread: SpreadArrays) -> list[SpreadPrediction]:
+    """Summarize simulated spread arrays into per-room predictions."""
+    room_map = {r.name: r for r in rooms}
+    last = spread.time_steps_min
+    time_to_danger = spread.time_to_danger
+    time_to_flashover = spread.time_to_flashover
     predictions: list[SpreadPrediction] = []
 
-    for room in rooms:
+    for i, room in enumerate(rooms):
         adjacent = [room_map[adj_name] for adj_name in room.has_door_to if adj_name in room_map]
 
-        intensities = [room.fire_intensity]
-        current = room.fire_intensity
-
-        for _ in range(time_steps_min):
-            rate = compute_room_spread_rate(
-                Room(
-                    name=room.name,
-                    fire_intensity=current,
-                    has_door_to=room.has_door_to,
-                    has_stairwell=room.has_stairwell,
-                    fuel_level=room.fuel_level,
-                    is_exterior=room.is_exterior,
-                ),
-                adjacent,
-            )
-            current = min(1.0, current + rate)
-            intensities.append(current)
-
-        time_to_danger = None
-        time_to_flashover = None
-        for t, intensity in enumerate(intensities):
-            if time_to_danger is None and intensity > 0.6:
-                time_to_danger = t
-            if time_to_flashover is None and intensity > FLASHOVER_THRESHOLD:
-                time_to_flashover = t
-
         risk_factors = []
         if room.fuel_level == "high":
             risk_factors.append("high fuel load accelerates spread")
@@ -128,41 +150,43 @@ def predict_fire_spread(
         predictions.append(SpreadPrediction(
             room_name=room.name,
             current_intensity=room.fire_intensity,
-            predicted_intensity_5min=intensities[min(5, len(intensities) - 1)],
-            predicted_intensity_10min=intensities[min(10, len(intensities) - 1)],
-            time_to_danger_min=time_to_danger,
-            time_to_flashover_min=time_to_flashover,
+            predicted_intensity_5min=float(spread.intensities[i, min(5, last)]),
+            predicted_intensity_10min=float(spread.intensities[i, min(10, last)]),
+            time_to_danger_min=int(time_to_danger[i]) if time_to_danger[i] >= 0 else None,
+            time_to_flashover_min=int(time_to_flashover[i]) if time_to_flashover[i] >= 0 else None,
             risk_factors=risk_factors,
         ))
 
     return predictions
 
 
-def build_spread_timeline(
-    fire_severity_data: dict[str, Any],
-    building_layout: dict[str, Any] | None = None,
-) -> list[dict[str, Any]]:
-    """Convert fire severity analysis + building layout into spread timeline predictions.
+def predict_fire_spread(
+    rooms: list[Room],
+    time_steps_min: int = 10,
+) -> list[SpreadPrediction]:
+    """Predict fire spread across rooms over time. Returns per-room predictions.
 
-    This bridges vision model output (fire_severity schema) into the rule-based spread model.
+    This is deterministic and rule-based:
+    - Fire grows at BASE_SPREAD_RATE * fuel_multiplier per minute
+    - Fire spreads through doorways at DOOR_ADJACENCY_FACTOR rate
+    - Stairwells multiply vertical spread by VERTICAL_SPREAD_MULTIPLIER
+    - High fuel loads (furniture, paper) accelerate spread
+    """
+    return spread_predictions(rooms, simulate_spread(rooms, time_steps_min))
 
-    Args:
-        fire_severity_data: Output from analyze_fire_severity() matching fire_severity.json schema
-        building_layout: Optional building layout with room connectivity. If None, uses default layout.
 
-    Returns:
-        List of per-room spread predictions as dicts for JSON serialization.
+def rooms_from_fire_data(
+    fire_severity_data: dict[str, Any],
+    rooms_data: list[dict[str, Any]],
+) -> list[Room]:
+    """Seed spread-model rooms from a fire severity payload.
+
+    Matches detected fire locations and fuel sources to rooms by label.
     """
     severity = fire_severity_data.get("severity", 0)
     fire_locations = fire_severity_data.get("fire_locations", [])
     fuel_sources = fire_severity_data.get("fuel_sources", [])
 
-    # Build default rooms if no layout provided
-    if building_layout and "rooms" in building_layout:
-        rooms_data = building_layout["rooms"]
-    else:
-        rooms_data = _default_building_rooms()
-
     rooms: list[Room] = []
     for rd in rooms_data:
         # Determine fuel level from detected fuel sources near this room
@@ -192,8 +216,11 @@ def build_spread_timeline(
             fuel_level=room_fuel,
             is_exterior=rd.get("is_exterior", False),
         ))
+    return rooms
 
-    predictions = predict_fire_spread(rooms)
+
+def predictions_to_timeline(predictions: list[SpreadPrediction]) -> list[dict[str, Any]]:
+    """Serialize spread predictions for JSON responses."""
     return [
         {
             "room": p.room_name,
@@ -208,6 +235,31 @@ def build_spread_timeline(
     ]
 
 
+def build_spread_timeline(
+    fire_severity_data: dict[str, Any],
+    building_layout: dict[str, Any] | None = None,
+) -> list[dict[str, Any]]:
+    """Convert fire severity analysis + building layout into spread timeline predictions.
+
+    This bridges vision model output (fire_severity schema) into the rule-based spread model.
+
+    Args:
+        fire_severity_data: Output from analyze_fire_severity() matching fire_severity.json schema
+        building_layout: Optional building layout with room connectivity. If None, uses default layout.
+
+    Returns:
+        List of per-room spread predictions as dicts for JSON serialization.
+    """
+    # Build default rooms if no layout provided
+    if building_layout and "rooms" in building_layout:
+        rooms_data = building_layout["rooms"]
+    else:
+        rooms_data = _default_building_rooms()
+
+    rooms = rooms_from_fire_data(fire_severity_data, rooms_data)
+    return predictions_to_timeline(predict_fire_spread(rooms))
+
+
 def _default_building_rooms() -> list[dict[str, Any]]:
     """Siebel Center for Computer Science — real floor plan layout."""
     return siebel_center_rooms()
@@ -0,0 +1,280 @@
+"""Content-addressed cache for vision model results.
+
+Entries are keyed by a hash of the image bytes, the whitespace-normalized
+prompt, the model and the backend, so the same frame sent with the same
+prompt is only ever inferred once per TTL — across demo reruns, repeated
+simulations and every agent instance in a team.
+
+Two tiers:
+    memory  LRU of serialized results (bounded by entry count)
+    disk    optional SQLite file (bounded by total payload bytes), shared
+            across processes and restarts; the byte total is kept by
+            triggers, so bounding it costs no table scan
+
+Async callers use ``aget``/``aput``, which run the SQLite tier on a worker
+thread instead of the event loop.
+
+Stdlib only, so it can also be shipped into the Modal container next to
+modal_app.py.
+"""
+from __future__ import annotations
+
+import asyncio
+import base64
+import binascii
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = 512
+DEFAULT_TTL_SECONDS = 24 * 3600
+DEFAULT_MAX_DISK_BYTES = 256 * 1024 * 1024
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Collapse whitespace so cosmetic prompt edits don't split the cache."""
+    return " ".join(prompt.split())
+
+
+def inference_key(image: bytes | str, prompt: str, model: str, backend: str) -> str:
+    """Content address for one inference call.
+
+    Args:
+        image: Raw image bytes, or the base64 string sent to the backend
+        prompt: Prompt text (whitespace-normalized before hashing)
+        model: Model identifier
+        backend: Backend name (e.g. "ollama", "modal", "cloud", "azure_openai")
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    if isinstance(image, str):
+        try:
+            image = base64.b64decode(image, validate=True)
+        except (binascii.Error, ValueError):
+            image = image.encode()
+    h = hashlib.sha256()
+    h.update(hashlib.sha256(image).digest())
+    for part in (normalize_prompt(prompt), model, backend):
+        h.update(b"\x00")
+        h.update(part.encode())
+    return h.hexdigest()
+
+
+class InferenceCache:
+    """Two-tier (memory LRU + optional SQLite) cache of JSON-serializable results.
+
+    Results are stored serialized, so callers always get a private copy they
+    can annotate (frame_id, timestamp, ...) without touching the cached entry.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        disk_path: str | Path | None = None,
+        max_disk_bytes: int = DEFAULT_MAX_DISK_BYTES,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_disk_bytes = max_disk_bytes
+        self._memory: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+        self._db: sqlite3.Connection | None = None
+        if disk_path:
+            self._open_disk(Path(disk_path))
+
+    def _open_disk(self, path: Path) -> None:
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS inference_cache ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL,"
+                " expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS inference_cache_accessed ON inference_cache (accessed_at)")
+            db.execute("CREATE INDEX IF NOT EXISTS inference_cache_expires ON inference_cache (expires_at)")
+            # Running payload total, kept by triggers so every process sharing the file sees it
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS inference_cache_size ("
+                " id INTEGER PRIMARY KEY CHECK (id = 0), total INTEGER NOT NULL)"
+            )
+            db.execute(
+                "INSERT OR IGNORE INTO inference_cache_size"
+                " SELECT 0, COALESCE(SUM(size), 0) FROM inference_cache"
+            )
+            for name, event, delta in (
+                ("insert", "INSERT", "NEW.size"),
+                ("delete", "DELETE", "-OLD.size"),
+                ("update", "UPDATE OF size", "NEW.size - OLD.size"),
+            ):
+                db.execute(
+                    f"CREATE TRIGGER IF NOT EXISTS inference_cache_size_{name} AFTER {event} ON inference_cache"
+                    f" BEGIN UPDATE inference_cache_size SET total = total + {delta}; END"
+                )
+        except sqlite3.Error as exc:
+            logger.warning("Inference cache disk tier unavailable (%s): %s", path, exc)
+            return
+        self._db = db
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # Lookup / store
+    # ─────────────────────────────────────────────────────────────────────────
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        """Return a copy of the cached result, or None on miss/expiry."""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._memory.move_to_end(key)
+                    self._counters["memory_hits"] += 1
+                    return json.loads(value)
+                del self._memory[key]
+
+            value = self._disk_get(key, now)
+            if value is not None:
+                self._counters["disk_hits"] += 1
+                self._memory_put(key, value, now + self.ttl_seconds)
+                return json.loads(value)
+
+            self._counters["misses"] += 1
+            return None
+
+    def put(self, key: str, result: dict[str, Any]) -> None:
+        """Store ``result`` under ``key`` in both tiers."""
+        value = json.dumps(result, separators=(",", ":"))
+        expires_at = time.time() + self.ttl_seconds
+        with self._lock:
+            self._memory_put(key, value, expires_at)
+            self._disk_put(key, value, expires_at)
+            self._counters["stores"] += 1
+
+    async def aget(self, key: str) -> dict[str, Any] | None:
+        """``get`` for event-loop callers: a disk-backed lookup runs on a worker thread."""
+        if self._db is None:
+            return self.get(key)
+        return await asyncio.to_thread(self.get, key)
+
+    async def aput(self, key: str, result: dict[str, Any]) -> None:
+        """``put`` for event-loop callers: a disk-backed store runs on a worker thread."""
+        if self._db is None:
+            self.put(key, result)
+        else:
+            await asyncio.to_thread(self.put, key, result)
+
+    def clear(self) -> None:
+        """Drop every entry (both tiers) and reset counters."""
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM inference_cache")
+            for name in self._counters:
+                self._counters[name] = 0
+
+    def stats(self) -> dict[str, Any]:
+        """Hit/miss counters and tier sizes."""
+        with self._lock:
+            stats: dict[str, Any] = dict(self._counters)
+            stats["memory_entries"] = len(self._memory)
+            if self._db is not None:
+                stats["disk_entries"] = self._db.execute("SELECT COUNT(*) FROM inference_cache").fetchone()[0]
+                stats["disk_bytes"] = self._disk_bytes()
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = round((lookups - stats["misses"]) / lookups, 3) if lookups else 0.0
+        return stats
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # Tiers (called with the lock held)
+    # ─────────────────────────────────────────────────────────────────────────
+
+    def _memory_put(self, key: str, value: str, expires_at: float) -> None:
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self._counters["evictions"] += 1
+
+    def _disk_get(self, key: str, now: float) -> str | None:
+        if self._db is None:
+            return None
+        try:
+            row = self._db.execute(
+                "SELECT value, expires_at FROM inference_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] <= now:
+                self._db.execute("DELETE FROM inference_cache WHERE key = ?", (key,))
+                return None
+            self._db.execute("UPDATE inference_cache SET accessed_at = ? WHERE key = ?", (now, key))
+            return row[0]
+        except sqlite3.Error as exc:
+            logger.warning("Inference cache disk read failed: %s", exc)
+            return None
+
+    def _disk_bytes(self) -> int:
+        return self._db.execute("SELECT total FROM inference_cache_size").fetchone()[0]
+
+    def _disk_put(self, key: str, value: str, expires_at: float) -> None:
+        if self._db is None:
+            return
+        now = time.time()
+        try:
+            # An upsert, not INSERT OR REPLACE: REPLACE deletes without firing the size trigger
+            self._db.execute(
+                "INSERT INTO inference_cache (key, value, size, expires_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?) ON CONFLICT (key) DO UPDATE SET"
+                " value = excluded.value, size = excluded.size,"
+                " expires_at = excluded.expires_at, accessed_at = excluded.accessed_at",
+                (key, value, len(value), expires_at, now),
+            )
+            self._db.execute("DELETE FROM inference_cache WHERE expires_at <= ?", (now,))
+            total = self._disk_bytes()
+            while total > self.max_disk_bytes:
+                row = self._db.execute(
+                    "SELECT key, size FROM inference_cache ORDER BY accessed_at LIMIT 1"
+                ).fetchone()
+                if row is None:
+                    break
+                self._db.execute("DELETE FROM inference_cache WHERE key = ?", (row[0],))
+                total -= row[1]
+                self._counters["evictions"] += 1
+        except sqlite3.Error as exc:
+            logger.warning("Inference cache disk write failed: %s", exc)
+
+
+_cache: InferenceCache | None = None
+
+
+def get_inference_cache() -> InferenceCache | None:
+    """Process-wide cache configured from the environment.
+
+    ORCA_INFERENCE_CACHE=0 disables caching. The disk tier is enabled by
+    pointing ORCA_INFERENCE_CACHE_PATH at a SQLite file.
+    """
+    global _cache
+    if os.environ.get("ORCA_INFERENCE_CACHE", "1") == "0":
+        return None
+    if _cache is None:
+        _cache = InferenceCache(
+            max_entries=int(os.environ.get("ORCA_INFERENCE_CACHE_ENTRIES", DEFAULT_MAX_ENTRIES)),
+            ttl_seconds=float(os.environ.get("ORCA_INFERENCE_CACHE_TTL", DEFAULT_TTL_SECONDS)),
+            disk_path=os.environ.get("ORCA_INFERENCE_CACHE_PATH") or None,
+            max_disk_bytes=int(os.environ.get("ORCA_INFERENCE_CACHE_MAX_BYTES", DEFAULT_MAX_DISK_BYTES)),
+        )
+    return _cache
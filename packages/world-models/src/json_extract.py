@@ -0,0 +1,242 @@
+"""Schema-guided JSON extraction from vision model responses.
+
+One parser for every backend (Ollama, Modal, Azure OpenAI, Gemini):
+
+1. Fast path: the response (or its fenced / brace-delimited body) decodes
+   as is — with orjson when it's installed, else the stdlib decoder.
+2. Repair: otherwise the object is re-scanned — markdown fences and chatter
+   around it dropped, trailing commas removed, and a truncated object (token
+   limit hit mid-answer) closed at its last complete value.
+3. Coercion: with a JSON schema from ``shared/schemas``, values the model
+   typed loosely ("0.8", "True", "High ") are converted to the schema's type
+   or enum member and numbers clamped to its bounds. Values that can't be
+   converted safely are left alone.
+
+Stdlib only (orjson optional): shipped into the Modal containers next to
+the apps that use it, together with the schema files.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # optional fast decoder
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+# How many cut points to try when closing a truncated object
+MAX_REPAIR_ATTEMPTS = 4
+_FENCE = re.compile(r"```[a-zA-Z]*\s*(.*?)(?:```|$)", re.DOTALL)
+_CLOSERS = {"{": "}", "[": "]"}
+
+_counters = {"fast": 0, "repaired": 0, "failed": 0}
+
+
+class JSONExtractionError(ValueError):
+    """No JSON object could be recovered from a model response."""
+
+
+def _loads(text: str) -> Any:
+    """Decode JSON; both decoders raise ValueError subclasses on bad input."""
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+def _candidates(raw: str) -> list[str]:
+    """The response itself, its fenced body, and the span from the first ``{`` to the last ``}``."""
+    text = raw.strip()
+    out = [text]
+    fenced = _FENCE.search(text)
+    if fenced:
+        text = fenced.group(1).strip()
+        out.append(text)
+    start, end = text.find("{"), text.rfind("}")
+    if start >= 0 and end > start:
+        out.append(text[start:end + 1])
+    return out
+
+
+def _repair(text: str) -> Any:
+    """Rebuild the first JSON object in ``text``, fixing trailing commas and truncation."""
+    start = text.find("{")
+    if start < 0:
+        raise JSONExtractionError("no JSON object in response")
+
+    out: list[str] = []
+    stack: list[str] = []  # pending closers
+    in_string = escaped = False
+    # (length of out, closers) after each complete member: where a truncated
+    # object can be cut and still be valid once closed
+    cut_points: list[tuple[int, str]] = []
+
+    for ch in text[start:]:
+        if in_string:
+            out.append(ch)
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+            continue
+
+        if ch == '"':
+            in_string = True
+        elif ch in _CLOSERS:
+            stack.append(_CLOSERS[ch])
+            out.append(ch)
+            if len(stack) == 1:  # an empty nested container is worse than dropping the member
+                cut_points.append((len(out), "}"))
+            continue
+        elif ch in "}]":
+            if not stack:
+                break
+            # Drop a trailing comma before the closer
+            while out and out[-1].isspace():
+                out.pop()
+            if out and out[-1] == ",":
+                out.pop()
+            out.append(stack.pop())
+            if not stack:
+                return _loads("".join(out))
+            continue
+        elif ch == ",":
+            cut_points.append((len(out), "".join(reversed(stack))))
+        out.append(ch)
+
+    # Truncated: first try closing everything where it stopped, then back off
+    # to the last complete members
+    body = "".join(out).rstrip()
+    attempts = [(body + ('"' if in_string else ""), "".join(reversed(stack)))]
+    attempts += [("".join(out[:n]), closers) for n, closers in reversed(cut_points)]
+    for prefix, closers in attempts[:MAX_REPAIR_ATTEMPTS]:
+        prefix = prefix.rstrip().rstrip(",")
+        try:
+            return _loads(prefix + closers)
+        except ValueError:
+            continue
+    raise JSONExtractionError("could not repair JSON object")
+
+
+def _coerce(value: Any, schema: dict[str, Any]) -> Any:
+    kind = schema.get("type")
+    if isinstance(kind, list):
+        kind = next((k for k in kind if k != "null"), None)
+
+    if value is None:
+        return [] if kind == "array" else None
+
+    if kind in ("number", "integer") and not isinstance(value, bool):
+        if isinstance(value, str):
+            try:
+                value = float(value.strip().rstrip("%"))
+            except ValueError:
+                return value
+        if isinstance(value, (int, float)):
+            if "minimum" in schema:
+                value = max(value, schema["minimum"])
+            if "maximum" in schema:
+                value = min(value, schema["maximum"])
+            return int(round(value)) if kind == "integer" else value
+        return value
+
+    if kind == "boolean":
+        if isinstance(value, str) and value.strip().lower() in ("true", "yes", "false", "no"):
+            return value.strip().lower() in ("true", "yes")
+        if isinstance(value, int) and value in (0, 1):
+            return bool(value)
+        return value
+
+    if kind == "string":
+        enum = schema.get("enum")
+        if enum and isinstance(value, str) and value not in enum:
+            normalized = re.sub(r"[\s\-]+", "_", value.strip().lower())
+            return next((e for e in enum if e == normalized), value)
+        return value
+
+    if kind == "array":
+        if isinstance(value, dict):
+            value = [value]
+        items = schema.get("items")
+        if isinstance(value, list) and isinstance(items, dict):
+            return [_coerce(v, items) for v in value]
+        return value
+
+    if kind == "object" and isinstance(value, dict):
+        return coerce_to_schema(value, schema)
+    return value
+
+
+def coerce_to_schema(obj: dict[str, Any], schema: dict[str, Any] | None) -> dict[str, Any]:
+    """Convert loosely typed values of ``obj`` to the types ``schema`` declares (in place)."""
+    if not schema:
+        return obj
+    properties = schema.get("properties", {})
+    extra = schema.get("additionalProperties")
+    for key, value in obj.items():
+        sub = properties.get(key, extra if isinstance(extra, dict) else None)
+        if sub is not None:
+            obj[key] = _coerce(value, sub)
+    return obj
+
+
+def extract_json(raw: str, schema: dict[str, Any] | None = None) -> dict[str, Any]:
+    """Recover the JSON object from a model response, coerced to ``schema`` if given.
+
+    Raises:
+        JSONExtractionError: nothing object-like could be recovered
+    """
+    result: Any = None
+    for candidate in _candidates(raw):
+        try:
+            result = _loads(candidate)
+        except ValueError:
+            continue
+        if isinstance(result, dict):
+            _counters["fast"] += 1
+            break
+    else:
+        try:
+            result = _repair(raw)
+        except ValueError as exc:
+            _counters["failed"] += 1
+            raise JSONExtractionError(str(exc)) from exc
+        if not isinstance(result, dict):
+            _counters["failed"] += 1
+            raise JSONExtractionError("response is not a JSON object")
+        _counters["repaired"] += 1
+        logger.debug("Repaired malformed model JSON (%d chars)", len(raw))
+    return coerce_to_schema(result, schema)
+
+
+def extraction_stats() -> dict[str, int]:
+    """How many responses decoded directly, needed repair, or were unrecoverable."""
+    return dict(_counters)
+
+
+def _schema_dirs() -> list[Path]:
+    here = Path(__file__).resolve().parent
+    dirs = [Path(os.environ["ORCA_SCHEMA_DIR"])] if os.environ.get("ORCA_SCHEMA_DIR") else []
+    dirs.append(here / "schemas")  # shipped next to this file in Modal images
+    dirs += [parent / "shared" / "schemas" for parent in here.parents]
+    return dirs
+
+
+@lru_cache(maxsize=None)
+def load_schema(name: str) -> dict[str, Any] | None:
+    """A schema from shared/schemas by name (without .json), or None if unavailable."""
+    for directory in _schema_dirs():
+        path = directory / f"{name}.json"
+        if path.is_file():
+            return json.loads(path.read_text())
+    logger.warning("Schema %s not found; model output will not be coerced", name)
+    return None
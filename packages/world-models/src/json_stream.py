@@ -0,0 +1,84 @@
+"""Incremental parsing of a JSON object streamed token by token.
+
+Vision models stream their answer a few characters at a time. Rather than
+waiting for the whole object, ``StreamingJSONObject`` tracks nesting and
+string state as chunks arrive and reports each top-level member as soon as
+its value is complete — e.g. ``"severity": 7`` once the following ``,`` or
+``}`` shows the number has ended.
+
+Anything before the first ``{`` (markdown fences, chatter) is skipped.
+"""
+from __future__ import annotations
+
+import json
+from typing import Any
+
+
+class StreamingJSONObject:
+    """Feed text chunks; get back top-level fields as they complete."""
+
+    def __init__(self) -> None:
+        self._text = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._member_start: int | None = None
+        self.fields: dict[str, Any] = {}
+        self.done = False
+
+    def feed(self, chunk: str) -> dict[str, Any]:
+        """Consume ``chunk`` and return the top-level fields it completed."""
+        if self.done or not chunk:
+            return {}
+        self._text += chunk
+        completed: dict[str, Any] = {}
+        text = self._text
+
+        for i in range(self._pos, len(text)):
+            ch = text[i]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == "\\":
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+
+            if ch == '"':
+                if self._depth > 0:
+                    self._in_string = True
+            elif ch in "{[":
+                self._depth += 1
+                if self._depth == 1:
+                    if ch != "{":
+                        self._depth = 0  # top-level array: not an object stream
+                        continue
+                    self._member_start = i + 1
+            elif ch in "}]" and self._depth > 0:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._close_member(i, completed)
+                    self.done = True
+                    self._pos = i + 1
+                    return completed
+            elif ch == "," and self._depth == 1:
+                self._close_member(i, completed)
+                self._member_start = i + 1
+
+        self._pos = len(text)
+        return completed
+
+    def _close_member(self, end: int, completed: dict[str, Any]) -> None:
+        if self._member_start is None:
+            return
+        member = self._text[self._member_start:end].strip()
+        if not member:
+            return
+        try:
+            parsed = json.loads("{" + member + "}")
+        except json.JSONDecodeError:
+            return  # malformed member; the final full parse decides what to do
+        self.fields.update(parsed)
+        completed.update(parsed)
@@ -1,6 +1,8 @@
 """Modal app for running Ollama vision inference on cloud GPUs.
 
-Self-contained — no local imports. Runs entirely inside the Modal container.
+Self-contained — no local imports at deploy time. Runs entirely inside the
+Modal container; inference_cache.py, batching.py and json_extract.py are
+shipped alongside and imported there.
 """
 
 from __future__ import annotations
@@ -9,6 +11,7 @@ import json
 import os
 import subprocess
 import time
+from pathlib import Path
 from typing import Any
 
 import modal
@@ -27,6 +30,9 @@ ollama_image = (
         "ollama serve & sleep 5 && ollama pull llama3.2-vision:11b; pkill ollama || true",
         gpu="H100",
     )
+    .add_local_file(Path(__file__).with_name("inference_cache.py"), "/root/inference_cache.py")
+    .add_local_file(Path(__file__).with_name("batching.py"), "/root/batching.py")
+    .add_local_file(Path(__file__).with_name("json_extract.py"), "/root/json_extract.py")
 )
 
 app = modal.App("orca-vision")
@@ -38,6 +44,11 @@ SCALEDOWN_WINDOW_SECONDS = int(os.environ.get("MODAL_SCALEDOWN_WINDOW_SECONDS",
 MAX_CONTAINERS = int(os.environ.get("MODAL_MAX_CONTAINERS", "2"))
 OLLAMA_NUM_PREDICT = int(os.environ.get("OLLAMA_NUM_PREDICT", "2048"))
 OLLAMA_KEEP_ALIVE = os.environ.get("OLLAMA_KEEP_ALIVE", "30m")
+# Micro-batching: requests held up to BATCH_WAIT_MS are sent to Ollama together,
+# which runs up to MAX_BATCH_SIZE of them at once in its parallel slots.
+MAX_BATCH_SIZE = int(os.environ.get("VISION_MAX_BATCH_SIZE", "4"))
+BATCH_WAIT_MS = float(os.environ.get("VISION_BATCH_WAIT_MS", "15"))
+OLLAMA_URL = "http://127.0.0.1:11434"
 
 
 @app.cls(
@@ -47,10 +58,12 @@ OLLAMA_KEEP_ALIVE = os.environ.get("OLLAMA_KEEP_ALIVE", "30m")
     timeout=600,
     max_containers=MAX_CONTAINERS,
 )
+@modal.concurrent(max_inputs=MAX_BATCH_SIZE * 2)
 class VisionModel:
     """Runs Ollama vision model inside a Modal container."""
 
     _proc: subprocess.Popen | None = None
+    _batcher: Any = None
 
     @modal.enter()
     def start_ollama(self) -> None:
@@ -59,6 +72,7 @@ class VisionModel:
             ["ollama", "serve"],
             stdout=subprocess.DEVNULL,
             stderr=subprocess.DEVNULL,
+            env={**os.environ, "OLLAMA_NUM_PARALLEL": str(MAX_BATCH_SIZE)},
         )
         from urllib.request import urlopen
         from urllib.error import URLError
@@ -89,18 +103,40 @@ class VisionModel:
         with urlopen(warmup_req, timeout=180) as resp:
             resp.read()
 
+        from batching import MicroBatcher, ollama_dispatcher
+
+        self._batcher = MicroBatcher(
+            ollama_dispatcher(OLLAMA_URL, INFERENCE_TIMEOUT_SECONDS, MAX_BATCH_SIZE),
+            max_batch_size=MAX_BATCH_SIZE,
+            max_wait_ms=BATCH_WAIT_MS,
+        )
+
     @modal.exit()
     def stop_ollama(self) -> None:
         """Terminate the Ollama server process."""
+        if self._batcher is not None:
+            self._batcher.close()
         if self._proc is not None:
             self._proc.terminate()
             self._proc.wait(timeout=10)
 
     def _run_inference(self, image_data_b64: str, prompt: str) -> dict[str, Any]:
-        """Core inference logic — calls Ollama locally. No Modal decorators."""
-        from urllib.request import Request, urlopen
+        """Core inference logic — calls Ollama locally. No Modal decorators.
+
+        Repeated (image, prompt) pairs are answered from the container's
+        inference cache without touching the GPU; everything else goes through
+        the micro-batcher together with concurrent requests.
+        """
+        from inference_cache import get_inference_cache, inference_key
 
-        payload = json.dumps({
+        cache = get_inference_cache()
+        key = inference_key(image_data_b64, prompt, OLLAMA_MODEL, "modal")
+        if cache is not None:
+            cached = cache.get(key)
+            if cached is not None:
+                return cached
+
+        payload = {
             "model": OLLAMA_MODEL,
             "prompt": prompt,
             "images": [image_data_b64],
@@ -111,16 +147,8 @@ class VisionModel:
                 "repeat_penalty": 1.3,
                 "temperature": 0.1,
             },
-        }).encode()
-
-        req = Request(
-            "http://127.0.0.1:11434/api/generate",
-            data=payload,
-            headers={"Content-Type": "application/json"},
-            method="POST",
-        )
-        with urlopen(req, timeout=INFERENCE_TIMEOUT_SECONDS) as resp:
-            body = json.loads(resp.read())
+        }
+        body = self._batcher.submit(payload)
 
         raw = body.get("response", "").strip()
         if not raw:
@@ -130,19 +158,27 @@ class VisionModel:
 
         # Not all prompts force JSON output; avoid 500s by returning raw content.
         try:
-            return self._parse_json_response(raw)
+            result = self._parse_json_response(raw)
         except Exception:
             return {
                 "raw_response": raw,
                 "model": OLLAMA_MODEL,
                 "parse_error": "response was not valid JSON",
             }
+        if cache is not None and "raw_response" not in result:
+            cache.put(key, result)
+        return result
 
     @modal.method()
     def analyze(self, image_data_b64: str, prompt: str) -> dict:
         """Modal RPC method for vision analysis (called via .remote())."""
         return self._run_inference(image_data_b64, prompt)
 
+    @modal.method()
+    def batch_stats(self) -> dict:
+        """Batch-size and queue-wait histograms for this container."""
+        return self._batcher.stats() if self._batcher is not None else {}
+
     @modal.fastapi_endpoint(method="POST")
     def web_analyze(self, item: dict) -> dict:
         """Public HTTP endpoint for vision analysis.
@@ -163,26 +199,17 @@ class VisionModel:
 
     @staticmethod
     def _parse_json_response(raw: str) -> dict:
-        """Parse JSON from model response, stripping markdown fences if present.
+        """Parse (and if needed repair) JSON from model response.
 
-        Falls back to wrapping raw text if JSON parsing fails.
+        Falls back to wrapping raw text if no JSON object can be recovered.
         """
-        text = raw
-        if text.startswith("```"):
-            lines = text.split("\n")
-            lines = lines[1:]
-            if lines and lines[-1].strip() == "```":
-                lines = lines[:-1]
-            text = "\n".join(lines)
-        start = text.find("{")
-        end = text.rfind("}") + 1
-        if start >= 0 and end > start:
-            try:
-                return json.loads(text[start:end])
-            except json.JSONDecodeError:
-                pass
-        # Model didn't return valid JSON — wrap the raw text
-        return {"raw_response": raw}
+        from json_extract import JSONExtractionError, extract_json
+
+        try:
+            return extract_json(raw)
+        except JSONExtractionError:
+            # Model didn't return usable JSON — wrap the raw text
+            return {"raw_response": raw}
 
 
 @app.local_entrypoint()
@@ -0,0 +1,210 @@
+"""CPU-only fire pre-screen run before a frame is sent to the vision LLM.
+
+Classifies pixels of a downsampled frame as flame- or smoke-coloured with
+simple RGB rules and builds a coarse grid "heat map" of flame coverage. This
+takes a few milliseconds with NumPy, so it runs on every frame:
+
+- frames with (almost) no flame or smoke pixels are answered directly with a
+  ``severity: 0`` result and never reach the LLM;
+- otherwise the candidate fire regions give a crop box, so the LLM looks at
+  the part of the frame that matters instead of the whole scene.
+
+The rules are deliberately conservative: a false "fire-free" skips the model,
+while a false candidate only costs one LLM call.
+"""
+from __future__ import annotations
+
+import io
+import time
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from PIL import Image
+
+# Working resolution; JPEGs are decoded straight to roughly this size
+SCREEN_SIZE = 128
+GRID = 8  # heat map is GRID x GRID cells
+
+# Flame: bright, red-dominant, R >= G > B (orange/yellow, not white)
+FLAME_MIN_RED = 175
+FLAME_MIN_RED_BLUE_GAP = 70
+# Smoke: low colour spread, mid brightness (grey)
+SMOKE_MAX_SPREAD = 30
+SMOKE_MIN_BRIGHTNESS = 60
+SMOKE_MAX_BRIGHTNESS = 200
+
+# Short-circuit thresholds (fractions of the frame)
+FIRE_FREE_MAX_FLAME = 0.001
+FIRE_FREE_MAX_SMOKE = 0.25
+HEAT_CELL_THRESHOLD = 0.02  # mean flame heat for a cell to count as a candidate
+# Crop only when the candidates cover less than this much of the frame
+CROP_MAX_AREA = 0.6
+CROP_PADDING = 1.0 / GRID
+
+
+@dataclass(frozen=True)
+class PrescreenResult:
+    """Colour statistics and candidate fire regions of one frame."""
+    flame_fraction: float
+    smoke_fraction: float
+    heat_map: np.ndarray  # (GRID, GRID) mean flame heat per cell, 0-1
+    regions: list[dict[str, Any]]  # normalized boxes of connected hot cells
+    elapsed_ms: float
+
+    @property
+    def fire_free(self) -> bool:
+        return (
+            not self.regions
+            and self.flame_fraction < FIRE_FREE_MAX_FLAME
+            and self.smoke_fraction < FIRE_FREE_MAX_SMOKE
+        )
+
+    @property
+    def crop_box(self) -> tuple[float, float, float, float] | None:
+        """Padded union of the candidate regions as (x0, y0, x1, y1), if worth cropping."""
+        if not self.regions:
+            return None
+        x0 = max(0.0, min(r["x0"] for r in self.regions) - CROP_PADDING)
+        y0 = max(0.0, min(r["y0"] for r in self.regions) - CROP_PADDING)
+        x1 = min(1.0, max(r["x1"] for r in self.regions) + CROP_PADDING)
+        y1 = min(1.0, max(r["y1"] for r in self.regions) + CROP_PADDING)
+        if (x1 - x0) * (y1 - y0) >= CROP_MAX_AREA:
+            return None
+        return (x0, y0, x1, y1)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "flame_fraction": round(self.flame_fraction, 4),
+            "smoke_fraction": round(self.smoke_fraction, 4),
+            "heat_map": np.round(self.heat_map, 3).tolist(),
+            "regions": self.regions,
+            "crop_box": self.crop_box,
+            "elapsed_ms": round(self.elapsed_ms, 2),
+        }
+
+
+def _open(image: bytes | str | Path | Image.Image) -> Image.Image | None:
+    if isinstance(image, Image.Image):
+        return image
+    try:
+        source = io.BytesIO(image) if isinstance(image, bytes) else Path(image)
+        img = Image.open(source)
+        img.draft("RGB", (SCREEN_SIZE, SCREEN_SIZE))  # JPEG: decode at reduced scale
+        img.load()
+        return img
+    except (OSError, ValueError):
+        return None
+
+
+def _hot_regions(hot: np.ndarray, heat: np.ndarray) -> list[dict[str, Any]]:
+    """4-connected components of hot grid cells, as normalized boxes."""
+    seen = np.zeros_like(hot)
+    regions = []
+    for start in zip(*np.nonzero(hot)):
+        if seen[start]:
+            continue
+        seen[start] = True
+        cells, todo = [], deque([start])
+        while todo:
+            r, c = todo.popleft()
+            cells.append((r, c))
+            for nr, nc in ((r - 1, c), (r + 1, c), (r, c - 1), (r, c + 1)):
+                if 0 <= nr < GRID and 0 <= nc < GRID and hot[nr, nc] and not seen[nr, nc]:
+                    seen[nr, nc] = True
+                    todo.append((nr, nc))
+        (r0, c0), (r1, c1) = np.min(cells, axis=0).tolist(), np.max(cells, axis=0).tolist()
+        regions.append({
+            "x0": c0 / GRID,
+            "y0": r0 / GRID,
+            "x1": (c1 + 1) / GRID,
+            "y1": (r1 + 1) / GRID,
+            "peak_heat": round(float(max(heat[cell] for cell in cells)), 3),
+            "cells": len(cells),
+        })
+    return sorted(regions, key=lambda r: r["peak_heat"], reverse=True)
+
+
+def prescreen_frame(image: bytes | str | Path | Image.Image) -> PrescreenResult | None:
+    """Screen a frame for fire colours. Returns None if the image can't be decoded."""
+    started = time.perf_counter()
+    img = _open(image)
+    if img is None:
+        return None
+    small = img.convert("RGB").resize((SCREEN_SIZE, SCREEN_SIZE), Image.Resampling.BILINEAR)
+    rgb = np.asarray(small, dtype=np.int16)
+    r, g, b = rgb[..., 0], rgb[..., 1], rgb[..., 2]
+
+    flame = (r >= FLAME_MIN_RED) & (r >= g) & (g > b) & (r - b >= FLAME_MIN_RED_BLUE_GAP)
+    spread = rgb.max(axis=-1) - rgb.min(axis=-1)
+    brightness = rgb.mean(axis=-1)
+    smoke = (
+        ~flame
+        & (spread <= SMOKE_MAX_SPREAD)
+        & (brightness >= SMOKE_MIN_BRIGHTNESS)
+        & (brightness <= SMOKE_MAX_BRIGHTNESS)
+    )
+
+    # Flame pixels weighted by brightness, averaged per grid cell
+    cell = SCREEN_SIZE // GRID
+    heat = (flame * (r / 255.0)).reshape(GRID, cell, GRID, cell).mean(axis=(1, 3))
+    regions = _hot_regions(heat >= HEAT_CELL_THRESHOLD, heat)
+
+    return PrescreenResult(
+        flame_fraction=float(flame.mean()),
+        smoke_fraction=float(smoke.mean()),
+        heat_map=heat,
+        regions=regions,
+        elapsed_ms=(time.perf_counter() - started) * 1000,
+    )
+
+
+def crop_to_box(image: bytes, box: tuple[float, float, float, float], quality: int = 90) -> bytes:
+    """Crop encoded image bytes to a normalized (x0, y0, x1, y1) box, as JPEG."""
+    img = Image.open(io.BytesIO(image)).convert("RGB")
+    w, h = img.size
+    x0, y0, x1, y1 = box
+    crop = img.crop((int(x0 * w), int(y0 * h), max(int(x1 * w), int(x0 * w) + 1), max(int(y1 * h), int(y0 * h) + 1)))
+    buf = io.BytesIO()
+    crop.save(buf, format="JPEG", quality=quality)
+    return buf.getvalue()
+
+
+def remap_fire_locations(result: dict[str, Any], box: tuple[float, float, float, float]) -> dict[str, Any]:
+    """Map fire_locations the model reported inside a crop back to full-frame coordinates.
+
+    Handles both top-level ``x``/``y`` (vision prompt) and nested
+    ``coordinates: {x, y}`` (cloud prompt / shared schema).
+    """
+    x0, y0, x1, y1 = box
+    for loc in result.get("fire_locations") or []:
+        if not isinstance(loc, dict):
+            continue
+        points = [loc]
+        if isinstance(loc.get("coordinates"), dict):
+            points.append(loc["coordinates"])
+        for point in points:
+            if isinstance(point.get("x"), (int, float)):
+                point["x"] = round(x0 + point["x"] * (x1 - x0), 4)
+            if isinstance(point.get("y"), (int, float)):
+                point["y"] = round(y0 + point["y"] * (y1 - y0), 4)
+        if isinstance(loc.get("radius"), (int, float)):
+            loc["radius"] = round(loc["radius"] * max(x1 - x0, y1 - y0), 4)
+    return result
+
+
+def fire_free_result(screen: PrescreenResult, frame_id: str = "unknown") -> dict[str, Any]:
+    """Fire severity result for a frame the pre-screen found no fire in (schema-compatible)."""
+    return {
+        "severity": 0,
+        "fire_locations": [],
+        "fuel_sources": [],
+        "smoke_density": "none" if screen.smoke_fraction < FIRE_FREE_MAX_SMOKE / 2 else "light",
+        "confidence": round(0.9 - screen.flame_fraction / FIRE_FREE_MAX_FLAME * 0.2, 3),
+        "frame_id": frame_id,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "prescreen": screen.to_dict(),
+    }
@@ -1,22 +1,68 @@
 from __future__ import annotations
 
+import asyncio
 import base64
+import copy
 import json
 import logging
 import os
+import time
+from collections.abc import Awaitable, Callable
+from contextlib import AbstractAsyncContextManager
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any
-from urllib.error import URLError
-from urllib.request import Request, urlopen
+from typing import Any, Protocol, runtime_checkable
 
+import httpx
+
+from .context_compact import compact_context, context_stats
 from .fallback import get_fallback_fire_severity, get_fallback_structural
+from .inference_cache import get_inference_cache, inference_key
+from .json_extract import JSONExtractionError, coerce_to_schema, extract_json, extraction_stats, load_schema
+from .json_stream import StreamingJSONObject
+from .prescreen import PrescreenResult, crop_to_box, fire_free_result, prescreen_frame, remap_fire_locations
+
+# Receives top-level result fields (e.g. {"severity": 7}) as soon as the
+# streaming model has finished generating them
+PartialCallback = Callable[[dict[str, Any]], Awaitable[None]]
+# (backend, capacity) -> async context manager holding one call slot
+SlotProvider = Callable[[str, int], AbstractAsyncContextManager[Any]]
+
+
+@runtime_checkable
+class EncodedFrame(Protocol):
+    """A frame the caller has already read and encoded (e.g. the API's frame store entries)."""
+
+    data: bytes
+    b64: str
+    media_type: str
+
+
+# A frame to analyze: an image path, raw image bytes, or an already-encoded frame
+Frame = bytes | str | EncodedFrame
 
 logger = logging.getLogger(__name__)
 
 VISION_BACKEND = os.environ.get("VISION_BACKEND", "ollama")
 OLLAMA_BASE_URL = os.environ.get("OLLAMA_BASE_URL", "http://localhost:11434")
 OLLAMA_MODEL = os.environ.get("OLLAMA_MODEL", "llama3.2-vision:11b")
+# CPU colour pre-screen: fire-free frames skip the model, others are cropped
+PRESCREEN_ENABLED = os.environ.get("VISION_PRESCREEN", "1") != "0"
+
+# Max in-flight calls per backend. A local Ollama serves one or two requests
+# at a time; extra callers queue here instead of piling onto the model.
+BACKEND_CONCURRENCY = {
+    "ollama": int(os.environ.get("OLLAMA_MAX_CONCURRENCY", "2")),
+    "modal": int(os.environ.get("MODAL_MAX_CONCURRENCY", "8")),
+}
+
+OLLAMA_TIMEOUT = 120.0
+PROBE_TIMEOUT = 2.0
+AVAILABILITY_TTL = 30.0  # seconds a successful probe is trusted
+BREAKER_FAILURE_THRESHOLD = 3
+BREAKER_RESET_SECONDS = 30.0
+# Fire result fields the structural prompt sees, most valuable first
+FIRE_CONTEXT_FIELDS = ("severity", "fire_locations", "smoke_density", "confidence", "fuel_sources")
 
 
 FIRE_SEVERITY_PROMPT = """Analyze this image of a building scene for fire conditions. You are an expert fire investigator.
@@ -62,8 +108,13 @@ Provide your analysis as JSON with these exact fields:
 Respond with ONLY valid JSON, no other text."""
 
 
-def _encode_image(frame: bytes | str) -> tuple[str, str]:
-    """Encode an image for the vision API. Returns (base64_data, media_type)."""
+def _encode_image(frame: Frame) -> tuple[str, str]:
+    """Encode an image for the vision API. Returns (base64_data, media_type).
+
+    Already-encoded frames are passed through.
+    """
+    if isinstance(frame, EncodedFrame):
+        return frame.b64, frame.media_type
     if isinstance(frame, str):
         path = Path(frame)
         suffix = path.suffix.lower()
@@ -82,121 +133,387 @@ def _encode_image(frame: bytes | str) -> tuple[str, str]:
         return data, "image/jpeg"
 
 
-def _call_vision_ollama(image_data: str, media_type: str, prompt: str) -> dict[str, Any]:
-    """Send image + prompt to Ollama and parse JSON response."""
-    payload = json.dumps({
+# ---------------------------------------------------------------------------
+# Backend connection pool, concurrency limits and circuit breaker
+# ---------------------------------------------------------------------------
+
+class VisionUnavailableError(RuntimeError):
+    """Raised instead of returning fallback data when the backend is down."""
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker for one vision backend.
+
+    Closed: calls go through. After ``failure_threshold`` consecutive failures
+    the breaker opens and callers go straight to fallback data. Once
+    ``reset_seconds`` have passed a single trial call is let through
+    (half-open); its outcome closes or re-opens the breaker. A trial that
+    ends without an outcome (cancelled, or an error that says nothing about
+    the backend) is released so the next call can try again; one that never
+    reports back lapses after another ``reset_seconds``.
+    """
+
+    def __init__(self, failure_threshold: int = BREAKER_FAILURE_THRESHOLD, reset_seconds: float = BREAKER_RESET_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at: float | None = None
+        self._trial_started: float | None = None
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_seconds:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        """Whether a call may go to the backend right now."""
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open":
+            now = time.monotonic()
+            if self._trial_started is None or now - self._trial_started >= self.reset_seconds:
+                self._trial_started = now
+                return True
+        return False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._trial_started = None
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._trial_started = None
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+
+    def release_trial(self) -> None:
+        """Give up a half-open trial without counting it either way."""
+        self._trial_started = None
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+_available_until: dict[str, float] = {}
+
+# The pooled client and semaphores belong to the event loop that created them;
+# they are rebuilt if a different loop (e.g. a fresh asyncio.run) shows up.
+_http_client: httpx.AsyncClient | None = None
+_semaphores: dict[str, asyncio.Semaphore] = {}
+_pool_loop: asyncio.AbstractEventLoop | None = None
+_slot_provider: SlotProvider | None = None
+
+
+def _breaker(backend: str) -> CircuitBreaker:
+    if backend not in _breakers:
+        _breakers[backend] = CircuitBreaker()
+    return _breakers[backend]
+
+
+def _transport_errors(backend: str) -> tuple[type[BaseException], ...]:
+    """Exceptions that mean ``backend`` could not be reached or refused the call.
+
+    Only these count as breaker failures; a reply that fails to parse shows
+    the backend is up.
+    """
+    errors: tuple[type[BaseException], ...] = (httpx.HTTPError, OSError, asyncio.TimeoutError)
+    if backend == "modal":
+        import modal.exception
+        errors += (modal.exception.Error,)
+    return errors
+
+
+def _ensure_pool_loop() -> None:
+    global _http_client, _pool_loop
+    loop = asyncio.get_running_loop()
+    if _pool_loop is not loop:
+        _http_client = None
+        _semaphores.clear()
+        _pool_loop = loop
+
+
+def _get_http_client() -> httpx.AsyncClient:
+    """Shared keep-alive client for HTTP vision backends."""
+    global _http_client
+    _ensure_pool_loop()
+    if _http_client is None or _http_client.is_closed:
+        limit = BACKEND_CONCURRENCY["ollama"]
+        _http_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(OLLAMA_TIMEOUT, connect=PROBE_TIMEOUT),
+            limits=httpx.Limits(max_connections=limit + 2, max_keepalive_connections=limit + 2),
+        )
+    return _http_client
+
+
+def set_slot_provider(provider: SlotProvider | None) -> None:
+    """Take backend slots from ``provider(backend, capacity)`` (e.g. an app-wide scheduler).
+
+    ``None`` restores the module's own per-backend semaphores.
+    """
+    global _slot_provider
+    _slot_provider = provider
+
+
+def _backend_slot(backend: str) -> AbstractAsyncContextManager[Any]:
+    """Async context manager bounding in-flight calls to ``backend``."""
+    capacity = BACKEND_CONCURRENCY.get(backend, 4)
+    if _slot_provider is not None:
+        return _slot_provider(backend, capacity)
+    _ensure_pool_loop()
+    if backend not in _semaphores:
+        _semaphores[backend] = asyncio.Semaphore(capacity)
+    return _semaphores[backend]
+
+
+async def close_http_client() -> None:
+    """Close the pooled backend client (call on server shutdown)."""
+    global _http_client
+    if _http_client is not None and not _http_client.is_closed:
+        await _http_client.aclose()
+    _http_client = None
+
+
+async def _call_vision_ollama(
+    image_data: str,
+    media_type: str,
+    prompt: str,
+    on_partial: PartialCallback | None = None,
+) -> dict[str, Any]:
+    """Stream image + prompt through Ollama over the pooled client and parse the JSON response.
+
+    Completed top-level fields are handed to ``on_partial`` while the rest of
+    the answer is still being generated.
+    """
+    payload = {
         "model": OLLAMA_MODEL,
         "prompt": prompt,
         "images": [image_data],
-        "stream": False,
-    }).encode()
-
-    req = Request(
-        f"{OLLAMA_BASE_URL}/api/generate",
-        data=payload,
-        headers={"Content-Type": "application/json"},
-        method="POST",
-    )
-    with urlopen(req, timeout=120) as resp:
-        body = json.loads(resp.read())
-
-    raw = body.get("response", "").strip()
+        "stream": True,
+    }
+    client = _get_http_client()
+    parser = StreamingJSONObject()
+    chunks: list[str] = []
+    async with _backend_slot("ollama"):
+        async with client.stream("POST", f"{OLLAMA_BASE_URL}/api/generate", json=payload) as resp:
+            resp.raise_for_status()
+            async for line in resp.aiter_lines():
+                if not line.strip():
+                    continue
+                chunk = json.loads(line).get("response", "")
+                chunks.append(chunk)
+                fields = parser.feed(chunk)
+                if fields and on_partial is not None:
+                    await on_partial(fields)
+
+    raw = "".join(chunks).strip()
     return _parse_json_response(raw)
 
 
 def _parse_json_response(raw: str) -> dict[str, Any]:
-    """Parse JSON from model response, stripping markdown fences if present."""
-    if raw.startswith("```"):
-        lines = raw.split("\n")
-        lines = lines[1:]  # remove opening fence
-        if lines and lines[-1].strip() == "```":
-            lines = lines[:-1]
-        raw = "\n".join(lines)
-    # Some models wrap in extra text — find the JSON object
-    start = raw.find("{")
-    end = raw.rfind("}") + 1
-    if start >= 0 and end > start:
-        raw = raw[start:end]
-    return json.loads(raw)
-
-
-async def _call_vision_modal(image_data: str, media_type: str, prompt: str) -> dict[str, Any]:
+    """Parse JSON from model response, repairing fences, chatter, trailing commas and truncation."""
+    return extract_json(raw)
+
+
+async def _call_vision_modal(
+    image_data: str,
+    media_type: str,
+    prompt: str,
+    on_partial: PartialCallback | None = None,
+) -> dict[str, Any]:
     """Send image + prompt to Modal-hosted Ollama for inference."""
     import modal
 
     VisionModel = modal.Cls.from_name("orca-vision", "VisionModel")
-    return await VisionModel().analyze.remote.aio(image_data, prompt)
+    async with _backend_slot("modal"):
+        return await VisionModel().analyze.remote.aio(image_data, prompt)
 
 
-async def _call_vision_async(image_data: str, media_type: str, prompt: str) -> dict[str, Any]:
-    """Route vision call to the configured backend (async for Modal)."""
-    if VISION_BACKEND == "modal":
-        return await _call_vision_modal(image_data, media_type, prompt)
-    return _call_vision_ollama(image_data, media_type, prompt)
+async def _call_vision_async(
+    image_data: str,
+    media_type: str,
+    prompt: str,
+    on_partial: PartialCallback | None = None,
+) -> dict[str, Any]:
+    """Route vision call to the configured backend, feeding the circuit breaker.
+
+    Results are served from the shared inference cache when the same image and
+    prompt have already been run on this backend and model — before the
+    backend is probed, so cached frames are still answered while it is down.
+
+    Raises:
+        VisionUnavailableError: cache miss and the backend is unreachable
+    """
+    cache = get_inference_cache()
+    key = inference_key(image_data, prompt, OLLAMA_MODEL, VISION_BACKEND)
+    if cache is not None:
+        cached = await cache.aget(key)
+        if cached is not None:
+            return cached
+    if not await _api_available():
+        raise VisionUnavailableError(f"Vision backend {VISION_BACKEND} unavailable")
+
+    call = _call_vision_modal if VISION_BACKEND == "modal" else _call_vision_ollama
+    breaker = _breaker(VISION_BACKEND)
+    try:
+        result = await call(image_data, media_type, prompt, on_partial)
+    except _transport_errors(VISION_BACKEND):
+        breaker.record_failure()
+        _available_until.pop(VISION_BACKEND, None)
+        raise
+    except BaseException:
+        breaker.release_trial()
+        raise
+    breaker.record_success()
+    if cache is not None and "raw_response" not in result and "error" not in result:
+        await cache.aput(key, result)
+    return result
 
 
 def _call_vision(image_data: str, media_type: str, prompt: str) -> dict[str, Any]:
     """Route vision call to the configured backend (sync, for non-server use)."""
-    if VISION_BACKEND == "modal":
-        import asyncio
-        return asyncio.get_event_loop().run_until_complete(
-            _call_vision_modal(image_data, media_type, prompt)
-        )
-    return _call_vision_ollama(image_data, media_type, prompt)
+    return asyncio.run(_call_vision_async(image_data, media_type, prompt))
+
 
+async def _api_available() -> bool:
+    """Check if the vision backend is reachable.
 
-def _api_available() -> bool:
-    """Check if the vision backend is reachable."""
+    A successful probe is cached for ``AVAILABILITY_TTL`` seconds and a failed
+    one trips the circuit breaker, so callers don't pay a probe round trip on
+    every frame and an unreachable backend is skipped until its reset window.
+    """
+    breaker = _breaker(VISION_BACKEND)
+    if not breaker.allow():
+        return False
     if VISION_BACKEND == "modal":
         return True  # Modal availability checked at call time; fallback handles errors
-    try:
-        urlopen(f"{OLLAMA_BASE_URL}/api/tags", timeout=2)
+    if _available_until.get(VISION_BACKEND, 0.0) > time.monotonic():
         return True
-    except (URLError, OSError):
-        return False
 
+    try:
+        resp = await _get_http_client().get(f"{OLLAMA_BASE_URL}/api/tags", timeout=PROBE_TIMEOUT)
+        resp.raise_for_status()
+    except httpx.HTTPError:
+        breaker.record_failure()
+        return False
+    except BaseException:
+        breaker.release_trial()
+        raise
+    breaker.record_success()
+    _available_until[VISION_BACKEND] = time.monotonic() + AVAILABILITY_TTL
+    return True
+
+
+async def _prescreen(frame: Frame) -> tuple[PrescreenResult | None, bytes | None]:
+    """Run the CPU pre-screen off the event loop. (None, None) if disabled or undecodable."""
+    if not PRESCREEN_ENABLED:
+        return None, None
+    try:
+        if isinstance(frame, EncodedFrame):
+            data = frame.data
+        elif isinstance(frame, str):
+            data = await asyncio.to_thread(Path(frame).read_bytes)
+        else:
+            data = frame
+    except OSError:
+        return None, None
+    screen = await asyncio.to_thread(prescreen_frame, data)
+    return (screen, data) if screen is not None else (None, None)
+
+
+def _remapped_partials(on_partial: PartialCallback, box: tuple[float, float, float, float]) -> PartialCallback:
+    """Wrap a partial-field callback so crop-relative fire locations reach it in frame coordinates."""
+    async def callback(fields: dict[str, Any]) -> None:
+        await on_partial(remap_fire_locations(copy.deepcopy(fields), box))
+    return callback
+
+
+async def analyze_fire_severity(
+    frame: Frame,
+    frame_id: str = "unknown",
+    on_partial: PartialCallback | None = None,
+    use_fallback: bool = True,
+) -> dict[str, Any]:
+    """Analyze a frame for fire severity. This is the Fire Severity Team brain.
 
-async def analyze_fire_severity(frame: bytes | str, frame_id: str = "unknown") -> dict[str, Any]:
-    """Analyze a frame for fire severity. This is the Fire Severity Team brain."""
-    if not _api_available():
-        logger.warning("Vision backend unavailable — using fallback fire severity data")
-        return get_fallback_fire_severity(frame_id)
+    Frames the CPU pre-screen finds clearly fire-free are answered with
+    severity 0 without calling the model; for the rest the model sees a crop
+    around the candidate fire regions and locations are mapped back to the
+    full frame.
+    """
+    screen, data = await _prescreen(frame)
+    if screen is not None and screen.fire_free:
+        logger.info("Pre-screen found no fire in %s (%.1f ms) — skipping vision model", frame_id, screen.elapsed_ms)
+        return fire_free_result(screen, frame_id)
 
     try:
-        image_data, media_type = _encode_image(frame)
-        result = await _call_vision_async(image_data, media_type, FIRE_SEVERITY_PROMPT)
+        box = screen.crop_box if screen is not None else None
+        if box is not None:
+            image_data = base64.standard_b64encode(crop_to_box(data, box)).decode()
+            media_type = "image/jpeg"
+            if on_partial is not None:
+                on_partial = _remapped_partials(on_partial, box)
+        else:
+            image_data, media_type = _encode_image(frame)
+        result = await _call_vision_async(image_data, media_type, FIRE_SEVERITY_PROMPT, on_partial)
+        coerce_to_schema(result, load_schema("fire_severity_analysis"))
+        if box is not None:
+            remap_fire_locations(result, box)
+        if screen is not None:
+            result["prescreen"] = screen.to_dict()
         result["frame_id"] = frame_id
         result["timestamp"] = datetime.now(timezone.utc).isoformat()
         return result
+    except VisionUnavailableError:
+        if not use_fallback:
+            raise
+        logger.warning("Vision backend unavailable — using fallback fire severity data")
+        return get_fallback_fire_severity(frame_id)
     except Exception as exc:
+        if not use_fallback:
+            raise
         logger.error("Vision call failed for fire severity: %s — using fallback", exc)
         return get_fallback_fire_severity(frame_id)
 
 
-async def analyze_structural(frame: bytes | str, fire_context: dict[str, Any] | None = None, frame_id: str = "unknown") -> dict[str, Any]:
+async def analyze_structural(
+    frame: Frame,
+    fire_context: dict[str, Any] | None = None,
+    frame_id: str = "unknown",
+    on_partial: PartialCallback | None = None,
+    use_fallback: bool = True,
+) -> dict[str, Any]:
     """Analyze a frame for structural integrity. This is the Structural Analysis Team brain."""
-    if not _api_available():
-        logger.warning("Vision backend unavailable — using fallback structural data")
-        return get_fallback_structural(frame_id)
-
     try:
         image_data, media_type = _encode_image(frame)
-        fire_ctx_str = json.dumps(fire_context, indent=2) if fire_context else '{"severity": 0, "fire_locations": []}'
+        fire_ctx_str = compact_context(fire_context, FIRE_CONTEXT_FIELDS) if fire_context else '{"severity": 0, "fire_locations": []}'
         prompt = STRUCTURAL_ANALYSIS_PROMPT.format(fire_context=fire_ctx_str)
-        result = await _call_vision_async(image_data, media_type, prompt)
+        result = await _call_vision_async(image_data, media_type, prompt, on_partial)
+        coerce_to_schema(result, load_schema("structural_analysis"))
         result["frame_id"] = frame_id
         result["timestamp"] = datetime.now(timezone.utc).isoformat()
         return result
+    except VisionUnavailableError:
+        if not use_fallback:
+            raise
+        logger.warning("Vision backend unavailable — using fallback structural data")
+        return get_fallback_structural(frame_id)
     except Exception as exc:
+        if not use_fallback:
+            raise
         logger.error("Vision call failed for structural: %s — using fallback", exc)
         return get_fallback_structural(frame_id)
 
 
 async def analyze_frame(
-    frame: bytes | str,
+    frame: Frame,
     team_type: str,
     context: dict[str, Any] | None = None,
     frame_id: str = "unknown",
+    on_partial: PartialCallback | None = None,
+    use_fallback: bool = True,
 ) -> dict[str, Any]:
     """Main entry point for agent teams. Routes to the appropriate analysis function.
 
@@ -205,15 +522,20 @@ async def analyze_frame(
         team_type: One of "fire_severity", "structural", "evacuation", "personnel"
         context: Results from other teams (from Redis). None for fire_severity team.
         frame_id: Identifier for the frame being analyzed.
+        on_partial: Optional async callback for early fields from streaming
+            vision backends (fire_severity and structural only).
+        use_fallback: Return pre-computed fallback data when the vision
+            backend is down or fails (default). When False the error is raised
+            instead, so a caller with other backends can route around it.
 
     Returns:
         Structured JSON matching the corresponding schema in shared/schemas/
     """
     if team_type == "fire_severity":
-        return await analyze_fire_severity(frame, frame_id)
+        return await analyze_fire_severity(frame, frame_id, on_partial, use_fallback)
     elif team_type == "structural":
         fire_ctx = context.get("fire_severity") if context else None
-        return await analyze_structural(frame, fire_ctx, frame_id)
+        return await analyze_structural(frame, fire_ctx, frame_id, on_partial, use_fallback)
     elif team_type == "evacuation":
         from .evacuation import compute_evacuation_routes
         fire_ctx = context.get("fire_severity") if context else None
@@ -74,7 +74,7 @@ def test_fallback_fire_severity():
     assert result["smoke_density"] == "moderate"
     assert 0 <= result["confidence"] <= 1
 
-    schema = load_schema("fire_severity")
+    schema = load_schema("fire_severity_analysis")
     errors = validate_keys(result, schema)
     assert not errors, f"Schema validation failed: {errors}"
     print("  [PASS] fallback fire severity")
@@ -462,10 +462,506 @@ def test_analyze_frame_routing():
             os.environ["ANTHROPIC_API_KEY"] = old_key
 
 
+# ---------------------------------------------------------------------------
+# Vision backend client
+# ---------------------------------------------------------------------------
+
+def test_vision_breaker_skips_unreachable_backend():
+    """Repeated probe failures open the breaker so later frames skip the probe."""
+    import asyncio
+    from src import vision
+
+    probes = {"n": 0}
+
+    def handler(request):
+        probes["n"] += 1
+        raise vision.httpx.ConnectError("refused", request=request)
+
+    vision._breakers.clear()
+    vision._available_until.clear()
+    client = vision.httpx.AsyncClient(transport=vision.httpx.MockTransport(handler))
+    original = vision._get_http_client
+    vision._get_http_client = lambda: client
+    try:
+        async def run():
+            return [await vision.analyze_fire_severity(b"\x00", f"f{i}") for i in range(6)]
+
+        results = asyncio.run(run())
+        assert all(r["severity"] == 7 for r in results), "Should use fallback data"
+        assert probes["n"] == vision.BREAKER_FAILURE_THRESHOLD
+        assert vision._breaker(vision.VISION_BACKEND).state == "open"
+        print("  [PASS] circuit breaker skips unreachable backend")
+    finally:
+        vision._get_http_client = original
+        vision._breakers.clear()
+
+
+def test_vision_breaker_trial_outcomes():
+    """Only transport errors count against the breaker; an abandoned trial is released."""
+    import asyncio
+    from src import vision
+
+    replies = {"body": "not json at all"}
+
+    async def handler(request):
+        if replies["body"] is None:
+            await asyncio.sleep(10)
+        return vision.httpx.Response(200, json={"response": replies["body"]})
+
+    vision._breakers.clear()
+    vision.get_inference_cache().clear()
+    original_backend, original_client = vision.VISION_BACKEND, vision._get_http_client
+    vision.VISION_BACKEND = "ollama"
+    try:
+        async def run():
+            client = vision.httpx.AsyncClient(transport=vision.httpx.MockTransport(handler))
+            vision._get_http_client = lambda: client
+            breaker = vision._breaker("ollama")
+
+            # Unparseable replies come from a reachable backend
+            for _ in range(vision.BREAKER_FAILURE_THRESHOLD):
+                try:
+                    await vision._call_vision_async("aW1n", "image/jpeg", "prompt")
+                except Exception:
+                    pass
+            assert breaker.state == "closed" and breaker.failures == 0
+
+            # A cancelled half-open trial (taken by the call itself) doesn't keep the backend disabled
+            breaker.opened_at = vision.time.monotonic() - breaker.reset_seconds
+            assert breaker.state == "half_open"
+            replies["body"] = None
+            call = asyncio.create_task(vision._call_vision_async("aW1n", "image/jpeg", "prompt 2"))
+            await asyncio.sleep(0.01)
+            call.cancel()
+            try:
+                await call
+            except asyncio.CancelledError:
+                pass
+            assert breaker.state == "half_open" and breaker.allow()
+
+        asyncio.run(run())
+        print("  [PASS] breaker counts only transport errors and releases abandoned trials")
+    finally:
+        vision.VISION_BACKEND, vision._get_http_client = original_backend, original_client
+        vision._breakers.clear()
+
+
+def test_vision_ollama_pooled_async_call():
+    """Ollama calls go through the shared async client, bounded per backend."""
+    import asyncio
+    from src import vision
+
+    state = {"in_flight": 0, "peak": 0, "tags": 0}
+
+    async def handler(request):
+        if request.url.path == "/api/tags":
+            state["tags"] += 1
+            return vision.httpx.Response(200, json={"models": []})
+        state["in_flight"] += 1
+        state["peak"] = max(state["peak"], state["in_flight"])
+        await asyncio.sleep(0.01)
+        state["in_flight"] -= 1
+        return vision.httpx.Response(200, json={"response": '```json\n{"severity": 3, "fire_locations": []}\n```'})
+
+    vision._breakers.clear()
+    vision._available_until.clear()
+    vision.get_inference_cache().clear()
+    original_backend, original_client = vision.VISION_BACKEND, vision._get_http_client
+    vision.VISION_BACKEND = "ollama"
+    try:
+        async def run():
+            client = vision.httpx.AsyncClient(transport=vision.httpx.MockTransport(handler))
+            vision._get_http_client = lambda: client
+            return await asyncio.gather(*(vision.analyze_fire_severity(b"\x00", f"f{i}") for i in range(6)))
+
+        results = asyncio.run(run())
+        assert [r["severity"] for r in results] == [3] * 6
+        assert state["peak"] <= vision.BACKEND_CONCURRENCY["ollama"]
+        assert state["tags"] <= 6
+        print("  [PASS] pooled async Ollama calls")
+    finally:
+        vision.VISION_BACKEND = original_backend
+        vision._get_http_client = original_client
+        vision._available_until.clear()
+        vision.get_inference_cache().clear()
+
+
+def test_streaming_json_fields_complete_early():
+    """Top-level fields are reported once complete, while later ones are still streaming."""
+    from src.json_stream import StreamingJSONObject
+
+    text = '```json\n{"severity": 7, "label": "a, {b} \\"c\\"", "fire_locations": [{"x": 0.5}], "smoke_density": "heavy"}\n```'
+    parser = StreamingJSONObject()
+    seen = []
+    for i, ch in enumerate(text):
+        for key in parser.feed(ch):
+            seen.append((key, i))
+
+    assert [k for k, _ in seen] == ["severity", "label", "fire_locations", "smoke_density"]
+    assert seen[0][1] == text.index(", ")  # severity is known at the first comma
+    assert parser.fields == json.loads(text.strip("`json\n"))
+    assert parser.done
+    print("  [PASS] streaming JSON fields complete early")
+
+
+def test_vision_ollama_streams_partial_fields():
+    """Streaming Ollama responses surface fields through on_partial before the final result."""
+    import asyncio
+    from src import vision
+
+    tokens = ['{"sever', 'ity": 6', ', "smoke_density": "li', 'ght"', ', "fire_locations": []', '}']
+    body = "\n".join(json.dumps({"response": t, "done": False}) for t in tokens) + "\n"
+
+    def handler(request):
+        assert json.loads(request.content)["stream"] is True
+        return vision.httpx.Response(200, text=body)
+
+    partials = []
+
+    async def on_partial(fields):
+        partials.append(fields)
+
+    original_client = vision._get_http_client
+    try:
+        async def run():
+            client = vision.httpx.AsyncClient(transport=vision.httpx.MockTransport(handler))
+            vision._get_http_client = lambda: client
+            return await vision._call_vision_ollama("aGk=", "image/jpeg", "prompt", on_partial)
+
+        result = asyncio.run(run())
+        assert partials == [{"severity": 6}, {"smoke_density": "light"}, {"fire_locations": []}]
+        assert result == {"severity": 6, "smoke_density": "light", "fire_locations": []}
+        print("  [PASS] Ollama streaming partial fields")
+    finally:
+        vision._get_http_client = original_client
+
+
+def test_inference_cache_tiers():
+    """Memory LRU evicts oldest; disk tier survives a new cache instance; TTL expires."""
+    import asyncio
+    import base64
+    import tempfile
+    from src.inference_cache import InferenceCache, inference_key
+
+    image = b"\x89PNG fake frame"
+    key = inference_key(image, "Analyze  this\nframe", "m", "ollama")
+    assert key == inference_key(base64.b64encode(image).decode(), "Analyze this frame", "m", "ollama")
+    assert key != inference_key(image, "Analyze this frame", "m", "modal")
+
+    db = Path(tempfile.mkdtemp()) / "cache.sqlite3"
+    cache = InferenceCache(max_entries=2, disk_path=db)
+    cache.put(key, {"severity": 4})
+    cache.put("k2", {"severity": 1})
+    cache.put("k3", {"severity": 2})
+    assert len(cache._memory) == 2 and key not in cache._memory
+
+    hit = cache.get(key)  # evicted from memory, served from disk
+    assert hit == {"severity": 4}
+    hit["frame_id"] = "mutated"
+    assert cache.get(key) == {"severity": 4}
+    stats = cache.stats()
+    assert (stats["memory_hits"], stats["disk_hits"], stats["misses"]) == (1, 1, 0)
+
+    assert InferenceCache(disk_path=db).get("k3") == {"severity": 2}
+    expired = InferenceCache(ttl_seconds=-1)
+    expired.put("k", {"severity": 1})
+    assert expired.get("k") is None
+
+    # The disk byte total follows overwrites and evictions without summing the table
+    small_db = Path(tempfile.mkdtemp()) / "small.sqlite3"
+    small = InferenceCache(disk_path=small_db, max_disk_bytes=30)
+    small.put("a", {"v": "x" * 10})
+    small.put("a", {"v": "y"})  # 9 bytes
+    asyncio.run(small.aput("b", {"v": "z" * 20}))  # 28 bytes: "a" is evicted
+    scanned = small._db.execute("SELECT COALESCE(SUM(size), 0) FROM inference_cache").fetchone()[0]
+    assert small.stats()["disk_bytes"] == scanned == 28
+    reopened = InferenceCache(disk_path=small_db)
+    assert reopened.stats()["disk_bytes"] == 28
+    assert asyncio.run(reopened.aget("a")) is None and asyncio.run(reopened.aget("b")) == {"v": "z" * 20}
+    print("  [PASS] inference cache tiers")
+
+
+def test_vision_cache_answers_while_backend_down():
+    """A cached frame is served without probing; a miss on a down backend falls back."""
+    import asyncio
+    from src import vision
+
+    probes = {"n": 0}
+
+    def handler(request):
+        probes["n"] += 1
+        raise vision.httpx.ConnectError("refused", request=request)
+
+    vision._breakers.clear()
+    vision._available_until.clear()
+    cache = vision.get_inference_cache()
+    cache.clear()
+    original_backend, original_client = vision.VISION_BACKEND, vision._get_http_client
+    client = vision.httpx.AsyncClient(transport=vision.httpx.MockTransport(handler))
+    vision.VISION_BACKEND = "ollama"
+    vision._get_http_client = lambda: client
+    try:
+        cache.put(vision.inference_key("aW1n", "prompt", vision.OLLAMA_MODEL, "ollama"), {"severity": 3})
+        assert asyncio.run(vision._call_vision_async("aW1n", "image/jpeg", "prompt")) == {"severity": 3}
+        assert probes["n"] == 0
+
+        try:
+            asyncio.run(vision._call_vision_async("aW1n", "image/jpeg", "other prompt"))
+        except vision.VisionUnavailableError:
+            pass
+        else:
+            raise AssertionError("a cache miss on a down backend should raise")
+        assert probes["n"] == 1
+        assert asyncio.run(vision.analyze_structural(b"\x00", frame_id="down"))["integrity_score"] == 6
+        print("  [PASS] cached frames are answered while the backend is down")
+    finally:
+        vision.VISION_BACKEND, vision._get_http_client = original_backend, original_client
+        vision._breakers.clear()
+        vision._available_until.clear()
+        cache.clear()
+
+
+def test_micro_batcher_against_stand_in_ollama():
+    """Concurrent requests are batched, dispatched together and scattered back in order."""
+    import threading
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from src.batching import MicroBatcher, ollama_dispatcher
+
+    state = {"in_flight": 0, "peak": 0}
+    lock = threading.Lock()
+
+    class StandInOllama(BaseHTTPRequestHandler):
+        def do_POST(self):
+            assert self.path == "/api/generate"
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            with lock:
+                state["in_flight"] += 1
+                state["peak"] = max(state["peak"], state["in_flight"])
+            time.sleep(0.05)
+            with lock:
+                state["in_flight"] -= 1
+            reply = json.dumps({"model": body["model"], "response": json.dumps({"echo": body["prompt"]}), "done": True})
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.end_headers()
+            self.wfile.write(reply.encode())
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInOllama)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    batcher = MicroBatcher(ollama_dispatcher(base_url, 5, 4), max_batch_size=4, max_wait_ms=20)
+    try:
+        with ThreadPoolExecutor(max_workers=10) as pool:
+            bodies = list(pool.map(
+                lambda i: batcher.submit({"model": "stand-in", "prompt": f"p{i}", "stream": False}),
+                range(10),
+            ))
+        assert [json.loads(b["response"])["echo"] for b in bodies] == [f"p{i}" for i in range(10)]
+
+        stats = batcher.stats()
+        assert stats["requests"] == 10
+        assert stats["batches"] < 10 and max(stats["batch_size_hist"]) <= 4
+        assert sum(stats["queue_wait_ms_hist"].values()) == 10
+        assert state["peak"] <= 4
+        print(f"  [PASS] micro-batching ({stats['batches']} batches for 10 requests)")
+    finally:
+        batcher.close()
+        server.shutdown()
+
+
+def test_micro_batcher_dispatches_while_a_batch_is_generating():
+    """A request arriving mid-generation takes a free slot instead of waiting for the batch."""
+    import threading
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+    from src.batching import MicroBatcher
+
+    release = threading.Event()
+    dispatched = []
+
+    def dispatch(requests):
+        dispatched.append(list(requests))
+        if requests == ["slow"]:
+            assert release.wait(5)
+        return [f"done {r}" for r in requests]
+
+    batcher = MicroBatcher(dispatch, max_batch_size=2, max_wait_ms=0, max_in_flight=2)
+    try:
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            slow = pool.submit(batcher.submit, "slow")
+            while not dispatched:
+                time.sleep(0.001)
+            assert batcher.submit("fast", timeout=2) == "done fast"
+            assert not slow.done()
+
+            # Both slots busy: the next request waits for one to free up
+            blocked_slow = pool.submit(batcher.submit, "slow")
+            while len(dispatched) < 3:
+                time.sleep(0.001)
+            queued = pool.submit(batcher.submit, "queued")
+            time.sleep(0.05)
+            assert not queued.done() and len(dispatched) == 3
+            release.set()
+            assert queued.result(2) == "done queued"
+            assert slow.result(2) == blocked_slow.result(2) == "done slow"
+        print("  [PASS] micro-batcher dispatches into free slots while a batch generates")
+    finally:
+        release.set()
+        batcher.close()
+
+
 # ---------------------------------------------------------------------------
 # Runner
 # ---------------------------------------------------------------------------
 
+# ---------------------------------------------------------------------------
+# Fire pre-screen
+# ---------------------------------------------------------------------------
+
+def test_prescreen_skips_quiet_frames_and_crops_fires():
+    """Fire-free frames never reach the model; fire frames are sent as a crop."""
+    import asyncio
+    import base64
+    import io
+    from PIL import Image
+    from src import vision
+
+    def jpeg(img):
+        buf = io.BytesIO()
+        img.save(buf, format="JPEG")
+        return buf.getvalue()
+
+    quiet = jpeg(Image.new("RGB", (640, 480), (40, 70, 140)))
+    fire_img = Image.new("RGB", (640, 480), (40, 70, 140))
+    fire_img.paste((255, 140, 20), (40, 40, 200, 160))  # flames in the top-left
+    fire = jpeg(fire_img)
+
+    screen = vision.prescreen_frame(fire)
+    assert screen.fire_free is False and len(screen.regions) == 1
+    x0, y0, x1, y1 = screen.crop_box
+    assert x0 == 0.0 and y0 == 0.0 and x1 <= 0.5 and y1 <= 0.5
+
+    sent = []
+
+    def handler(request):
+        if request.url.path == "/api/tags":
+            return vision.httpx.Response(200, json={"models": []})
+        sent.append(json.loads(request.content)["images"][0])
+        reply = {"severity": 6, "fire_locations": [{"label": "blob", "intensity": 0.9, "x": 0.5, "y": 0.5, "radius": 0.2}]}
+        return vision.httpx.Response(200, text=json.dumps({"response": json.dumps(reply), "done": True}))
+
+    vision._breakers.clear()
+    vision._available_until.clear()
+    vision.get_inference_cache().clear()
+    original_backend, original_client = vision.VISION_BACKEND, vision._get_http_client
+    vision.VISION_BACKEND = "ollama"
+    try:
+        async def run():
+            client = vision.httpx.AsyncClient(transport=vision.httpx.MockTransport(handler))
+            vision._get_http_client = lambda: client
+            return (
+                await vision.analyze_fire_severity(quiet, "quiet"),
+                await vision.analyze_fire_severity(fire, "fire"),
+            )
+
+        quiet_result, fire_result = asyncio.run(run())
+        assert quiet_result["severity"] == 0 and quiet_result["fire_locations"] == []
+        assert quiet_result["prescreen"]["flame_fraction"] == 0.0
+        assert len(sent) == 1, "Only the fire frame should reach the model"
+
+        crop = Image.open(io.BytesIO(base64.b64decode(sent[0])))
+        assert crop.size[0] <= 640 / 2 and crop.size[1] <= 480 / 2
+        loc = fire_result["fire_locations"][0]
+        assert abs(loc["x"] - (x0 + x1) / 2) < 1e-3 and abs(loc["y"] - (y0 + y1) / 2) < 1e-3
+        print("  [PASS] pre-screen skips quiet frames and crops fires")
+    finally:
+        vision.VISION_BACKEND = original_backend
+        vision._get_http_client = original_client
+        vision._available_until.clear()
+        vision.get_inference_cache().clear()
+
+
+def test_json_extraction_repairs_and_coerces():
+    """Fenced, chatty, trailing-comma and truncated responses parse; values follow the schema."""
+    from src.json_extract import JSONExtractionError, extract_json, load_schema
+
+    assert extract_json('Here you go:\n```json\n{"severity": 7, "tags": ["a", "b",],}\n```') == {
+        "severity": 7, "tags": ["a", "b"],
+    }
+    # Token limit hit mid-answer: keep the complete members, drop the partial one
+    truncated = '{"severity": 7, "fire_locations": [{"x": 0.5, "y": 0.2}, {"x": 0.'
+    assert extract_json(truncated) == {"severity": 7, "fire_locations": [{"x": 0.5, "y": 0.2}]}
+    assert extract_json('{"summary": "smoke in the stairw') == {"summary": "smoke in the stairw"}
+
+    # The schema vision.py and the OpenAI backend coerce FIRE_SEVERITY_PROMPT answers to
+    schema = load_schema("fire_severity_analysis")
+    assert schema is not None, "shared/schemas/fire_severity_analysis.json should be found"
+    result = extract_json(
+        '```json\n{"severity": "7.6", "smoke_density": "Zero visibility", "confidence": "1.4",'
+        ' "fire_locations": {"label": "kitchen", "intensity": "0.9", "x": "0.4", "y": 1.2, "radius": 0.2},'
+        ' "fuel_sources": [{"material": "wood", "flammability": "High"}]}\n```',
+        schema,
+    )
+    assert result["severity"] == 8 and isinstance(result["severity"], int)
+    assert result["smoke_density"] == "zero_visibility"
+    assert result["confidence"] == 1
+    assert result["fire_locations"] == [{"label": "kitchen", "intensity": 0.9, "x": 0.4, "y": 1, "radius": 0.2}]
+    assert result["fuel_sources"] == [{"material": "wood", "flammability": "high"}]
+
+    # Enums never swallow numbers: the cloud schema's string intensity leaves 0.9 alone
+    cloud = extract_json('{"fire_locations": {"zone_id": "Z1", "intensity": 0.9}}', load_schema("fire_severity"))
+    assert cloud["fire_locations"] == [{"zone_id": "Z1", "intensity": 0.9}]
+
+    try:
+        extract_json("I cannot analyze this image.")
+    except JSONExtractionError:
+        pass
+    else:
+        raise AssertionError("text without JSON should raise")
+    print("  [PASS] JSON extraction repairs and coerces model output")
+
+
+def test_context_compaction_fits_budget_and_is_stable():
+    """Upstream results render to the same small string, dropping low-value fields first."""
+    from src.context_compact import ContextCompactor, estimate_tokens
+
+    fire = {
+        "confidence": 0.87654,
+        "fire_locations": [
+            {"y": 0.25, "x": 0.5, "label": f"room {i}", "intensity": 0.912345, "radius": None}
+            for i in range(12)
+        ],
+        "severity": 7,
+        "prescreen": {"heat_map": [[0.0] * 8] * 8},
+        "frame_id": "f1",
+        "timestamp": "2025-01-01T00:00:00Z",
+    }
+    fields = ("severity", "fire_locations", "confidence")
+    compactor = ContextCompactor(budget=1000)
+
+    text = compactor.render(fire, fields)
+    assert text.startswith('{"severity":7,"fire_locations":[{"intensity":0.91,"label":"room 0","x":0.5,"y":0.25}')
+    assert "prescreen" not in text and "radius" not in text
+    assert json.loads(text)["confidence"] == 0.88
+    assert len(json.loads(text)["fire_locations"]) == 5, "lists are capped"
+
+    # Same content -> cached render; reordered dict -> same bytes
+    assert compactor.render(dict(reversed(list(fire.items()))), fields) == text
+    assert compactor.stats()["hits"] == 1
+
+    tight = compactor.render(fire, fields, budget=40)
+    summary = json.loads(tight)
+    assert estimate_tokens(tight) <= 40
+    assert "confidence" not in summary, "lowest-value field dropped first"
+    assert summary["severity"] == 7 and 1 <= len(summary["fire_locations"]) < 5
+    print("  [PASS] context compaction fits the budget with stable output")
+
+
 def main():
     print("\n=== ORCA Fire Intelligence Pipeline Tests ===\n")
 
@@ -497,6 +993,30 @@ def main():
             test_full_pipeline_fallback,
             test_vision_fallback_no_api_key,
             test_analyze_frame_routing,
+            test_vision_breaker_skips_unreachable_backend,
+            test_vision_breaker_trial_outcomes,
+            test_vision_ollama_pooled_async_call,
+        ]),
+        ("Streaming", [
+            test_streaming_json_fields_complete_early,
+            test_vision_ollama_streams_partial_fields,
+        ]),
+        ("Inference Cache", [
+            test_inference_cache_tiers,
+            test_vision_cache_answers_while_backend_down,
+        ]),
+        ("Micro-batching", [
+            test_micro_batcher_against_stand_in_ollama,
+            test_micro_batcher_dispatches_while_a_batch_is_generating,
+        ]),
+        ("Fire Pre-screen", [
+            test_prescreen_skips_quiet_frames_and_crops_fires,
+        ]),
+        ("JSON Extraction", [
+            test_json_extraction_repairs_and_coerces,
+        ]),
+        ("Context Compaction", [
+            test_context_compaction_fits_budget_and_is_stable,
         ]),
     ]
 
@@ -74,7 +74,7 @@ def test_house_fire_flames():
     print(f"    fuel_sources: {fire.get('fuel_sources', [])}")
 
     # Validate schema
-    schema = load_schema("fire_severity")
+    schema = load_schema("fire_severity_analysis")
     errors = validate_keys(fire, schema)
     assert not errors, f"Schema errors: {errors}"
 
@@ -125,7 +125,7 @@ def test_structure_fire_exterior():
     print(f"    smoke_density: {fire.get('smoke_density')}")
     print(f"    confidence: {fire.get('confidence')}")
 
-    schema = load_schema("fire_severity")
+    schema = load_schema("fire_severity_analysis")
     errors = validate_keys(fire, schema)
     assert not errors, f"Schema errors: {errors}"
 
@@ -166,7 +166,7 @@ def test_building_fire_buenos_aires():
     print(f"    smoke_density: {fire.get('smoke_density')}")
     print(f"    confidence: {fire.get('confidence')}")
 
-    schema = load_schema("fire_severity")
+    schema = load_schema("fire_severity_analysis")
     errors = validate_keys(fire, schema)
     assert not errors, f"Schema errors: {errors}"
 